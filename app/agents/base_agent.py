@@ -1,18 +1,81 @@
+import logging
+import time
 from abc import ABC, abstractmethod
-from ..services.genai_client import TCSGenAIClient
+from typing import AsyncIterator
+from ..config.settings import settings
+from ..services.genai_client import TCSGenAIClient, GenAIStreamError
+from ..services.prompt_builder import call_usage
+from ..services.registry import registry
+
+logger = logging.getLogger(__name__)
 
 class BaseAgent(ABC):
-    def __init__(self):
-        self.genai_client = TCSGenAIClient()
+    # Opt in to the exact-match response cache; only for prompts whose answer
+    # depends on nothing but the messages sent
+    cache_responses = False
+    # Shown to the customer instead of upstream error details
+    fallback_message = (
+        "Sorry, I'm having trouble reaching our assistant right now. "
+        "Please try again in a moment."
+    )
+    # Token budget for retrieved context in this agent's prompts; None uses
+    # PROMPT_CONTEXT_TOKEN_BUDGET
+    context_token_budget = None
+    
+    def __init__(self, genai_client: TCSGenAIClient = None):
+        # Agents share the process-wide client (and its connection pool) unless given one
+        self.genai_client = genai_client or registry.genai_client
+        self.last_usage = None
+    
+    @property
+    def context_budget(self) -> int:
+        return self.context_token_budget or settings.PROMPT_CONTEXT_TOKEN_BUDGET
     
     @abstractmethod
     def process(self, input_data: dict) -> dict:
         pass
     
     def call_genai(self, messages: list, temperature: float = 0.1) -> str:
-        response = self.genai_client.chat_completion(messages, temperature)
-        
+        started = time.perf_counter()
+        response = self.genai_client.chat_completion(messages, temperature, use_cache=self.cache_responses)
+        content = self._extract_content(response)
+        self._record_usage(messages, response, content, started)
+        return content
+    
+    async def acall_genai(self, messages: list, temperature: float = 0.1) -> str:
+        started = time.perf_counter()
+        response = await self.genai_client.achat_completion(messages, temperature, use_cache=self.cache_responses)
+        content = self._extract_content(response)
+        self._record_usage(messages, response, content, started)
+        return content
+    
+    async def astream_genai(self, messages: list, temperature: float = 0.1) -> AsyncIterator[str]:
+        started = time.perf_counter()
+        parts = []
+        try:
+            async for content in self.genai_client.astream_chat_completion(
+                messages, temperature, use_cache=self.cache_responses
+            ):
+                parts.append(content)
+                yield content
+        except GenAIStreamError as e:
+            logger.warning("GenAI stream failed: %s", e, extra={"agent": type(self).__name__})
+            yield self.fallback_message
+            return
+        self._record_usage(messages, {}, "".join(parts), started)
+    
+    def _record_usage(self, messages: list, response: dict, content: str, started: float) -> None:
+        """Record prompt/completion tokens and latency of a successful call, per agent"""
+        if "error" in response:
+            return
+        self.last_usage = call_usage(
+            messages, content, (time.perf_counter() - started) * 1000, response.get("usage")
+        )
+        registry.usage.record(type(self).__name__, self.last_usage)
+    
+    def _extract_content(self, response: dict) -> str:
         if "error" in response:
-            return f"Sorry, I encountered an error: {response['error']}"
+            logger.warning("GenAI call failed: %s", response["error"], extra={"agent": type(self).__name__})
+            return self.fallback_message
         
         return response['choices'][0]['message']['content']
\ No newline at end of file
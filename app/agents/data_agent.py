@@ -1,16 +1,18 @@
 from app.agents.base_agent import BaseAgent
 from app.config.prompts import DATA_COLLECTION_PROMPT
+from app.services.prompt_builder import PromptTemplate
+
+DATA_COLLECTION_TEMPLATE = PromptTemplate(
+    DATA_COLLECTION_PROMPT, system="You are a helpful data collection assistant."
+)
 
 class DataCollectionAgent(BaseAgent):
+    cache_responses = True
+    
     def process(self, current_data: dict, missing_fields: list) -> str:
-        prompt = DATA_COLLECTION_PROMPT.format(
-            current_data=str(current_data),
+        messages = DATA_COLLECTION_TEMPLATE.messages(
+            current_data=current_data,
             missing_fields=", ".join(missing_fields)
         )
         
-        messages = [
-            {"role": "system", "content": "You are a helpful data collection assistant."},
-            {"role": "user", "content": prompt}
-        ]
-        
         return self.call_genai(messages)
\ No newline at end of file
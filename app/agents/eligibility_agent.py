@@ -1,58 +1,290 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Tuple, Union
 from app.agents.base_agent import BaseAgent
+from app.services.cache import LRUCache
+from app.services.genai_client import TCSGenAIClient
 from app.services.knowledge_base import LoanEligibilityKnowledgeBase
-from app.config.prompts import ELIGIBILITY_PROMPT
+from app.services.registry import registry
+from app.services.resilience import CircuitBreaker
+from app.services.rules_engine import EligibilityDecision, get_rule_set
+from app.services.prompt_builder import PromptTemplate, fit_context
+from app.services.structured_output import IncrementalJSONParser, StructuredOutputError, parse_json_object
+from app.config.prompts import ELIGIBILITY_PROMPT, ELIGIBILITY_EXPLANATION_PROMPT, ELIGIBILITY_RESPONSE_SCHEMA
+from app.config.settings import settings
 from app.models.schemas import CustomerData, EligibilityResponse
 
+logger = logging.getLogger(__name__)
+
+# Explanation modes: how the LLM is involved in an eligibility check
+EXPLANATION_MODES = ("llm", "sync", "background", "lazy", "off")
+
+# Fields of EligibilityResponse the model is asked to produce
+RESPONSE_FIELDS = ("eligible", "reasons", "explanation", "next_steps", "confidence")
+
+ASSESSMENT_TEMPLATE = PromptTemplate(
+    ELIGIBILITY_PROMPT, system="You are a financial eligibility assessment expert."
+)
+EXPLANATION_TEMPLATE = PromptTemplate(
+    ELIGIBILITY_EXPLANATION_PROMPT, system="You are a financial eligibility assessment expert."
+)
+
+# Identity fields never leave the process for an explanation
+EXPLANATION_EXCLUDED_FIELDS = {"pan", "name", "date_of_birth", "aadhaar", "address"}
+
+@dataclass
+class ExplanationJob:
+    customer_data: CustomerData
+    decision: EligibilityDecision
+    status: str = "available"  # available (lazy) -> pending -> complete | failed
+    explanation: str = ""
+
 class EligibilityAgent(BaseAgent):
-    def __init__(self):
-        super().__init__()
-        self.knowledge_base = LoanEligibilityKnowledgeBase()
+    """Eligibility checks decided by the rules engine and explained by the LLM.
     
-    def process(self, customer_data: dict) -> EligibilityResponse:
-        validated_data = CustomerData(**customer_data)
-        
-        # Retrieve relevant rules
-        query = f"Eligibility for {validated_data.employment_type} with income {validated_data.monthly_income}"
-        relevant_rules = self.knowledge_base.retrieve_relevant_rules(query)
+    The decision and reason codes always come from the deterministic rule
+    set and are returned in milliseconds. The natural-language explanation
+    depends on the mode:
+    
+    - "sync": generated before returning
+    - "background": generated in a worker thread; fetch it by explanation_id
+    - "lazy": generated on the first get_explanation() for the id
+    - "off": never generated
+    - "llm": the original behaviour, where the LLM reads the rules and decides
+    
+    Explanations are skipped while the GenAI circuit breaker is open or too
+    many are already pending.
+    """
+    
+    def __init__(self, genai_client: TCSGenAIClient = None, knowledge_base: LoanEligibilityKnowledgeBase = None,
+                 mode: str = None):
+        super().__init__(genai_client)
+        self.knowledge_base = knowledge_base or registry.knowledge_base
+        self.mode = mode or settings.ELIGIBILITY_EXPLANATION_MODE
+        if self.mode not in EXPLANATION_MODES:
+            raise ValueError(f"Unknown explanation mode {self.mode!r}, expected one of {', '.join(EXPLANATION_MODES)}")
+        self.explanations = LRUCache(
+            max_entries=settings.ELIGIBILITY_EXPLANATION_MAX_ENTRIES,
+            ttl=settings.ELIGIBILITY_EXPLANATION_TTL_SECONDS
+        )
+        self.max_pending = settings.ELIGIBILITY_EXPLANATION_MAX_PENDING
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+    
+    def process(self, customer_data: Union[dict, CustomerData], mode: str = None) -> EligibilityResponse:
+        validated_data = customer_data if isinstance(customer_data, CustomerData) else CustomerData(**customer_data)
+        mode = mode or self.mode
+        if mode == "llm":
+            return self._assess_with_llm(validated_data)
         
-        # Prepare prompt
-        context = "\n".join(relevant_rules)
-        prompt = ELIGIBILITY_PROMPT.format(
-            context=context,
-            customer_data=validated_data.json()
+        decision = get_rule_set(validated_data.loan_type).evaluate(validated_data.dict())
+        response = EligibilityResponse(
+            eligible=decision.eligible,
+            reasons=decision.reasons,
+            reason_codes=decision.reason_codes,
+            explanation=self._summary(decision),
+            next_steps=decision.next_steps,
+            confidence=1.0,
+            explanation_status="skipped"
         )
+        if mode == "off" or self._overloaded():
+            return response
         
-        messages = [
-            {"role": "system", "content": "You are a financial eligibility assessment expert."},
-            {"role": "user", "content": prompt}
-        ]
+        explanation_id = self._explanation_id(validated_data, decision)
+        job = self.explanations.get(explanation_id)
+        # A failed explanation is tried again rather than served until it expires
+        if job is None or job.status == "failed":
+            job = ExplanationJob(validated_data, decision)
+            self.explanations.set(explanation_id, job)
+            if mode == "sync":
+                self._generate(job)
+            elif mode == "background":
+                self._submit(job)
         
-        # Get AI response
-        response = self.call_genai(messages)
+        response.explanation_id = explanation_id
+        response.explanation_status = job.status
+        if job.status == "complete":
+            response.explanation = job.explanation
+        return response
+    
+    def _explanation_id(self, customer_data: CustomerData, decision: EligibilityDecision) -> str:
+        # The prompt is built from the fields that leave the process and the
+        # decision; the decision also depends on excluded fields (age comes
+        # from date_of_birth), so it is part of the key. Applications that
+        # would get the same prompt share one explanation.
+        key = json.dumps({
+            "customer_data": customer_data.dict(exclude=EXPLANATION_EXCLUDED_FIELDS),
+            "eligible": decision.eligible,
+            "reason_codes": decision.reason_codes,
+            "passed": [outcome.message for outcome in decision.passed],
+            "failed": [outcome.message for outcome in decision.failed]
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    
+    def get_explanation(self, explanation_id: str) -> Optional[dict]:
+        """Return the explanation for an id, generating it now if it was deferred (lazy mode) or failed"""
+        job = self.explanations.get(explanation_id)
+        if job is None:
+            return None
+        if job.status == "available" or (job.status == "failed" and not self._overloaded()):
+            self._generate(job)
+        return {"explanation_id": explanation_id, "status": job.status, "explanation": job.explanation}
+    
+    def _summary(self, decision: EligibilityDecision) -> str:
+        if decision.eligible:
+            return f"You meet all the eligibility criteria for a {decision.loan_type}."
+        return (
+            f"You do not currently meet {len(decision.failed)} of the eligibility criteria "
+            f"for a {decision.loan_type}."
+        )
+    
+    def _explanation_messages(self, customer_data: CustomerData, decision: EligibilityDecision) -> list:
+        relevant_rules = self.knowledge_base.retrieve_for_applicant(
+            customer_data.loan_type,
+            customer_data.employment_type,
+            customer_data.monthly_income
+        )
+        return EXPLANATION_TEMPLATE.messages(
+            context=fit_context(relevant_rules, self.context_budget),
+            customer_data=customer_data.dict(exclude=EXPLANATION_EXCLUDED_FIELDS),
+            decision="Eligible" if decision.eligible else "Not Eligible",
+            reasons="\n".join(f"- {outcome.message}" for outcome in decision.failed or decision.passed)
+        )
+    
+    def _overloaded(self) -> bool:
+        if not settings.GENAI_BASE_URL:
+            return True
+        if self.genai_client.resilience.breaker.state == CircuitBreaker.OPEN:
+            return True
+        return self._pending >= self.max_pending
+    
+    def _submit(self, job: ExplanationJob) -> None:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=settings.ELIGIBILITY_EXPLANATION_WORKERS,
+                        thread_name_prefix="eligibility-explainer"
+                    )
+        job.status = "pending"
+        self._track_pending(1)
+        future = self._executor.submit(self._run, job)
+        future.add_done_callback(lambda _: self._track_pending(-1))
+    
+    def _generate(self, job: ExplanationJob) -> None:
+        self._track_pending(1)
+        try:
+            self._run(job)
+        finally:
+            self._track_pending(-1)
+    
+    def _track_pending(self, delta: int) -> None:
+        with self._lock:
+            self._pending += delta
+    
+    def _run(self, job: ExplanationJob) -> None:
+        job.status = "pending"
+        # A failed explanation never fails the check: the decision already stands
+        try:
+            # Retrieval happens here, off the decision path
+            messages = self._explanation_messages(job.customer_data, job.decision)
+            started = time.perf_counter()
+            response = self.genai_client.chat_completion(messages, use_cache=True)
+            if "error" in response:
+                logger.warning("Explanation failed: %s", response["error"], extra={"agent": "EligibilityAgent"})
+                job.status = "failed"
+            else:
+                job.explanation = self._extract_content(response)
+                job.status = "complete"
+                self._record_usage(messages, response, job.explanation, started)
+        except Exception:
+            logger.exception("Explanation failed", extra={"agent": "EligibilityAgent"})
+            job.status = "failed"
+    
+    def _assessment_messages(self, validated_data: CustomerData) -> list:
+        # Retrieve relevant rules
+        relevant_rules = self.knowledge_base.retrieve_for_applicant(
+            validated_data.loan_type,
+            validated_data.employment_type,
+            validated_data.monthly_income
+        )
         
+        # Prepare prompt, keeping the most relevant rules within the context budget
+        return ASSESSMENT_TEMPLATE.messages(
+            context=fit_context(relevant_rules, self.context_budget),
+            customer_data=validated_data.dict(),
+            schema=ELIGIBILITY_RESPONSE_SCHEMA
+        )
+    
+    def _assess_with_llm(self, validated_data: CustomerData) -> EligibilityResponse:
+        response = self.call_genai(self._assessment_messages(validated_data))
         return self._parse_response(response, validated_data)
     
-    def _parse_response(self, response: str, customer_data: CustomerData) -> EligibilityResponse:
-        # Simple parsing logic - in production, you'd want more sophisticated parsing
-        lines = response.split('\n')
-        eligible = any('eligible' in line.lower() for line in lines if 'not eligible' not in line.lower())
+    async def astream_assessment(self, customer_data: Union[dict, CustomerData]) -> AsyncIterator[Tuple[str, dict]]:
+        """Yield ("field", {"name", "value"}) events as the assessment is produced, then ("result", response).
         
-        reasons = []
-        explanation = ""
-        next_steps = []
+        In "llm" mode fields are parsed from the streamed JSON completion as
+        soon as each one is complete, so the decision arrives first. In the
+        rules modes the decision is available immediately.
+        """
+        validated_data = customer_data if isinstance(customer_data, CustomerData) else CustomerData(**customer_data)
+        if self.mode != "llm":
+            # "sync" mode retrieves and calls the LLM before returning
+            response = await asyncio.to_thread(self.process, validated_data)
+            yield "field", {"name": "eligible", "value": response.eligible}
+            yield "result", response.dict()
+            return
         
-        for line in lines:
-            if 'reason' in line.lower() or 'criteria' in line.lower():
-                reasons.append(line.strip())
-            elif 'step' in line.lower() or 'document' in line.lower():
-                next_steps.append(line.strip())
-            else:
-                explanation += line + "\n"
+        messages = await asyncio.to_thread(self._assessment_messages, validated_data)
+        parser = IncrementalJSONParser(max_repairs=settings.STRUCTURED_OUTPUT_MAX_REPAIRS)
+        async for content in self.astream_genai(messages):
+            for name, value in parser.feed(content):
+                # A decision that is not a boolean is replaced by the rules engine's, so it is not sent
+                if name in RESPONSE_FIELDS and (name != "eligible" or isinstance(value, bool)):
+                    yield "field", {"name": name, "value": value}
+        try:
+            fields = parser.close()
+        except StructuredOutputError:
+            # The fields already sent stand if they include the decision; otherwise the rules engine decides
+            fields = parser.fields if isinstance(parser.fields.get("eligible"), bool) else {}
+        yield "result", self._response_from_fields(fields, validated_data).dict()
+    
+    def _parse_response(self, response: str, customer_data: CustomerData) -> EligibilityResponse:
+        try:
+            fields = parse_json_object(response, settings.STRUCTURED_OUTPUT_MAX_REPAIRS)
+        except StructuredOutputError:
+            fields = {}
+        return self._response_from_fields(fields, customer_data)
+    
+    def _response_from_fields(self, fields: dict, customer_data: CustomerData) -> EligibilityResponse:
+        # Without a usable decision from the model, the rules engine decides
+        if not isinstance(fields.get("eligible"), bool):
+            logger.warning("Unusable structured output, falling back to the rules engine",
+                           extra={"agent": "EligibilityAgent"})
+            return self.process(customer_data, mode="off")
         
+        try:
+            confidence = min(max(float(fields.get("confidence", 0.5)), 0.0), 1.0)
+        except (TypeError, ValueError):
+            confidence = 0.5
         return EligibilityResponse(
-            eligible=eligible,
-            reasons=reasons,
-            explanation=explanation,
-            next_steps=next_steps,
-            confidence=0.8  # Placeholder
-        )
\ No newline at end of file
+            eligible=fields["eligible"],
+            reasons=_string_list(fields.get("reasons")),
+            explanation=str(fields.get("explanation") or ""),
+            next_steps=_string_list(fields.get("next_steps")),
+            confidence=confidence
+        )
+
+def _string_list(value) -> list:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    return [item if isinstance(item, str) else json.dumps(item) for item in value]
\ No newline at end of file
@@ -1,16 +1,22 @@
+from typing import AsyncIterator
 from app.agents.base_agent import BaseAgent
 from app.config.prompts import GUIDANCE_PROMPT
+from app.services.prompt_builder import PromptTemplate
+
+GUIDANCE_TEMPLATE = PromptTemplate(GUIDANCE_PROMPT, system="You are a financial guidance expert.")
 
 class GuidanceAgent(BaseAgent):
+    cache_responses = True
+    
     def process(self, eligibility_status: bool, customer_data: dict) -> str:
-        prompt = GUIDANCE_PROMPT.format(
+        return self.call_genai(self._build_messages(eligibility_status, customer_data))
+    
+    async def astream(self, eligibility_status: bool, customer_data: dict) -> AsyncIterator[str]:
+        async for content in self.astream_genai(self._build_messages(eligibility_status, customer_data)):
+            yield content
+    
+    def _build_messages(self, eligibility_status: bool, customer_data: dict) -> list:
+        return GUIDANCE_TEMPLATE.messages(
             eligibility_status="Eligible" if eligibility_status else "Not Eligible",
-            customer_data=str(customer_data)
-        )
-        
-        messages = [
-            {"role": "system", "content": "You are a financial guidance expert."},
-            {"role": "user", "content": prompt}
-        ]
-        
-        return self.call_genai(messages)
\ No newline at end of file
+            customer_data=customer_data
+        )
\ No newline at end of file
@@ -0,0 +1,147 @@
+LOAN_TYPE_MENU = "Please choose: 1️⃣ Personal Loan 2️⃣ Credit Card Loan"
+
+# Declarative conversation flow. Each step names a handler and the handler's
+# options; "next" is the step to move to on success. Fields with a "retry"
+# policy count failed attempts and lock the session once they run out.
+# Steps with an automatic handler (prefill, decision) take no input and run
+# in the same turn as the step before them. Prefill fields with a null label
+# are used but never echoed back in the chat.
+# The same structure can be supplied as JSON through CONVERSATION_FLOW_PATH.
+CONVERSATION_FLOW = {
+    "start": "greeting",
+    "retry_defaults": {
+        "max_attempts": 5,
+        "lockout_minutes": 30
+    },
+    "steps": {
+        "greeting": {
+            "handler": "message",
+            "reply": "Hi 👋 I can help you check your loan eligibility. " + LOAN_TYPE_MENU,
+            "next": "loan_type_selection"
+        },
+        "loan_type_selection": {
+            "handler": "choice",
+            "field": "loan_type",
+            "options": [
+                {"keywords": ["1", "personal"], "value": "Personal Loan",
+                 "reply": "Great! Let's start with your PAN card number.", "next": "pan_input"},
+                {"keywords": ["2", "credit card"], "value": "Credit Card Loan",
+                 "reply": "Great! Let's start with your PAN card number.", "next": "pan_input"}
+            ],
+            "invalid": LOAN_TYPE_MENU
+        },
+        "pan_input": {
+            "handler": "field",
+            "field": "pan",
+            "parser": "pan",
+            "reply": "Thanks. I've converted it to uppercase: {value} ✅ Please enter your full name.",
+            "invalid": "Invalid PAN format. Please enter a valid PAN number (e.g., ABCDE1234F). Attempt {attempts}/{max_attempts}",
+            "retry": {"lockout_message": "Too many failed PAN attempts. Please try again after {lockout_minutes} minutes."},
+            "next": "name_input"
+        },
+        "name_input": {
+            "handler": "field",
+            "field": "name",
+            "parser": "name",
+            "reply": "Registered name: {value} ✅ Please enter your Date of Birth (DD-MM-YYYY).",
+            "next": "dob_input"
+        },
+        "dob_input": {
+            "handler": "field",
+            "field": "date_of_birth",
+            "parser": "date",
+            "reply": "✅ DOB verified. Enter Aadhaar number (12 digits).",
+            "invalid": "Invalid date format. Please use DD-MM-YYYY. Attempt {attempts}/{max_attempts}",
+            "retry": {"lockout_message": "Too many failed DOB attempts. Please try again after {lockout_minutes} minutes."},
+            "next": "aadhaar_input"
+        },
+        "aadhaar_input": {
+            "handler": "field",
+            "field": "aadhaar",
+            "parser": "aadhaar",
+            "reply": "✅ Aadhaar verified.",
+            "invalid": "Invalid Aadhaar number. Please enter 12 digits. Attempt {attempts}/{max_attempts}",
+            "retry": {"lockout_message": "Too many failed Aadhaar attempts. Please try again after {lockout_minutes} minutes."},
+            "next": "prefill_lookup"
+        },
+        "prefill_lookup": {
+            "handler": "prefill",
+            "fields": {
+                "monthly_income": "Monthly income",
+                "existing_emis": "Existing EMIs",
+                "credit_score": None,
+                "employment_type": "Employment type",
+                "years_employed": "Years employed",
+                "address": None
+            },
+            "reply": "We found your details on file:\n{summary}\nReply YES to use these, along with the credit score and address we hold, and get your result now, or NO to enter them yourself.",
+            "next": "prefill_confirm",
+            "fallback_reply": "Now, we'll collect financial details. What is your monthly income?",
+            "fallback": "income_input"
+        },
+        "prefill_confirm": {
+            "handler": "choice",
+            "options": [
+                {"keywords": ["yes", "confirm", "correct"], "value": "yes", "reply": "", "next": "decision"},
+                {"keywords": ["no", "incorrect", "change", "edit"], "value": "no",
+                 "reply": "No problem. What is your monthly income?", "next": "income_input"}
+            ],
+            "invalid": "Please reply YES to use the details on file, or NO to enter them yourself."
+        },
+        "decision": {
+            "handler": "decision",
+            "next": "completed"
+        },
+        "income_input": {
+            "handler": "field",
+            "field": "monthly_income",
+            "parser": "float",
+            "reply": "How much are your total existing EMIs per month?",
+            "invalid": "Please enter a valid number for monthly income.",
+            "next": "emis_input"
+        },
+        "emis_input": {
+            "handler": "field",
+            "field": "existing_emis",
+            "parser": "float",
+            "reply": "What is your latest credit score (CIBIL)?",
+            "invalid": "Please enter a valid number for existing EMIs.",
+            "next": "credit_score_input"
+        },
+        "credit_score_input": {
+            "handler": "field",
+            "field": "credit_score",
+            "parser": "int",
+            "min": 300,
+            "max": 900,
+            "reply": "Are you Salaried or Self-Employed?",
+            "invalid": "Please enter a valid number for credit score.",
+            "out_of_range": "Please enter a valid credit score between 300 and 900.",
+            "next": "employment_type_input"
+        },
+        "employment_type_input": {
+            "handler": "choice",
+            "field": "employment_type",
+            "options": [
+                {"keywords": ["salaried"], "value": "Salaried",
+                 "reply": "How many years have you been employed?", "next": "employment_years_input"},
+                {"keywords": ["self"], "value": "Self-Employed",
+                 "reply": "How many years have you been in business?", "next": "employment_years_input"}
+            ],
+            "invalid": "Please specify: Salaried or Self-Employed?"
+        },
+        "employment_years_input": {
+            "handler": "field",
+            "field": "years_employed",
+            "parser": "float",
+            "reply": "Please enter your current address.",
+            "invalid": "Please enter a valid number for years employed.",
+            "next": "address_input"
+        },
+        "address_input": {
+            "handler": "eligibility",
+            "field": "address",
+            "next": "completed"
+        }
+    }
+}
\ No newline at end of file
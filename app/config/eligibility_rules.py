@@ -0,0 +1,103 @@
+DEFAULT_LOAN_TYPE = "Personal Loan"
+
+# Alternative spellings accepted for a loan type
+LOAN_TYPE_ALIASES = {
+    "personal": "Personal Loan",
+    "credit card": "Credit Card Loan",
+    "home": "Home Loan",
+}
+
+# How each kind of check is worded. "fail" becomes the reason shown to the
+# customer, "pass" is used when explaining a positive decision and
+# "describe" renders the rule for the knowledge base.
+RULE_TEXT = {
+    "AGE_OUT_OF_RANGE": {
+        "fail": "Age {value} is outside acceptable range ({min}-{max})",
+        "pass": "Age: {value} (within {min}-{max} range)",
+        "describe": "Age: {min} to {max} years",
+    },
+    "INCOME_BELOW_MINIMUM": {
+        "fail": "Income ₹{value} is below minimum requirement (₹{min:,})",
+        "pass": "Monthly income: ₹{value} (> ₹{min:,})",
+        "describe": "Minimum Income: ₹{min:,} per month",
+    },
+    "DEBT_RATIO_TOO_HIGH": {
+        "fail": "Debt-to-income ratio {value:.2f} exceeds maximum allowed ({max})",
+        "pass": "Existing EMIs: {value:.0%} of income (< {max:.0%})",
+        "describe": "Debt-to-Income Ratio: Existing EMIs should not exceed {max:.0%} of income",
+    },
+    "CREDIT_SCORE_TOO_LOW": {
+        "fail": "Credit score {value} is below preferred threshold ({min})",
+        "pass": "Credit score: {value} (> {min})",
+        "describe": "Credit Score: Minimum {min}",
+    },
+    "EMPLOYMENT_TOO_SHORT": {
+        "fail": "Employment duration {value} years is below minimum requirement ({min} year(s))",
+        "pass": "Employment: {value} years (>= {min} year(s))",
+        "describe": "Employment: Minimum {min} year(s) in current job/business",
+    },
+}
+
+# One declarative rule set per loan product. Each rule bounds one applicant
+# fact (age and debt_ratio are derived from date_of_birth and EMIs/income).
+ELIGIBILITY_RULES = {
+    "Personal Loan": {
+        "title": "Personal Loan Eligibility Criteria",
+        "rules": [
+            {"code": "AGE_OUT_OF_RANGE", "fact": "age", "min": 21, "max": 58},
+            {"code": "INCOME_BELOW_MINIMUM", "fact": "monthly_income", "min": 25000},
+            {"code": "EMPLOYMENT_TOO_SHORT", "fact": "years_employed", "min": 2},
+            {"code": "CREDIT_SCORE_TOO_LOW", "fact": "credit_score", "min": 750},
+            {"code": "DEBT_RATIO_TOO_HIGH", "fact": "debt_ratio", "max": 0.5},
+        ],
+        "documents": ["PAN", "Aadhaar", "Address Proof", "Income Proof"],
+        "next_steps": [
+            "Upload last 6 months' bank statements",
+            "Upload latest salary slips",
+            "Proceed to application form"
+        ],
+    },
+    "Credit Card Loan": {
+        "title": "Credit Card Eligibility Criteria",
+        "rules": [
+            {"code": "AGE_OUT_OF_RANGE", "fact": "age", "min": 21, "max": 60},
+            {"code": "INCOME_BELOW_MINIMUM", "fact": "monthly_income", "min": 15000},
+            {"code": "EMPLOYMENT_TOO_SHORT", "fact": "years_employed", "min": 1},
+            {"code": "CREDIT_SCORE_TOO_LOW", "fact": "credit_score", "min": 700},
+        ],
+        "documents": ["PAN", "Aadhaar", "Address Proof"],
+        "next_steps": [
+            "Upload latest salary slips",
+            "Proceed to application form"
+        ],
+    },
+    "Home Loan": {
+        "title": "Home Loan Eligibility Criteria",
+        "rules": [
+            {"code": "AGE_OUT_OF_RANGE", "fact": "age", "min": 21, "max": 65},
+            {"code": "INCOME_BELOW_MINIMUM", "fact": "monthly_income", "min": 30000},
+            {"code": "EMPLOYMENT_TOO_SHORT", "fact": "years_employed", "min": 3},
+            {"code": "CREDIT_SCORE_TOO_LOW", "fact": "credit_score", "min": 750},
+        ],
+        "notes": ["Property Valuation: Required"],
+        "documents": ["PAN", "Aadhaar", "Address Proof", "Income Proof", "Property Documents"],
+        "next_steps": [
+            "Upload last 6 months' bank statements",
+            "Upload property documents for valuation",
+            "Proceed to application form"
+        ],
+    },
+}
+
+GENERAL_ELIGIBILITY_RULES = [
+    "No active defaults or serious delinquencies",
+    "Stable employment/income history",
+    "Valid KYC documents",
+    "Indian residency required",
+]
+
+IMPROVEMENT_SUGGESTIONS = [
+    "Improve your credit score",
+    "Reduce your existing debt",
+    "Maintain stable employment"
+]
\ No newline at end of file
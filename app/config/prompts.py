@@ -8,13 +8,39 @@ Eligibility Rules:
 Customer Data:
 {customer_data}
 
-Please provide:
-1. Eligibility decision (Eligible/Not Eligible)
-2. Clear explanation based on the criteria
-3. Specific reasons for the decision
-4. Professional and empathetic tone
+Respond with a single JSON object and nothing else, with exactly these keys in this order:
+{schema}
 
-If any required information is missing, ask for it politely.
+Write the "explanation" in a professional and empathetic tone.
+"""
+
+# Keys of EligibilityResponse the model fills in; "eligible" comes first so the
+# decision can be streamed to the client before the rest is generated
+ELIGIBILITY_RESPONSE_SCHEMA = """{
+  "eligible": true or false,
+  "reasons": ["specific reason for the decision, citing the criterion", ...],
+  "explanation": "clear explanation of the decision based on the criteria",
+  "next_steps": ["next step for the customer", ...],
+  "confidence": number between 0 and 1
+}"""
+
+ELIGIBILITY_EXPLANATION_PROMPT = """
+You are a loan eligibility assistant for a financial institution.
+The eligibility decision below has already been made by our rules engine and is final.
+Explain it to the customer; do not change or question it.
+
+Eligibility Rules:
+{context}
+
+Customer Data:
+{customer_data}
+
+Decision: {decision}
+Criteria checked:
+{reasons}
+
+Please provide a short, clear explanation of the decision in a professional and empathetic tone.
+If the customer is not eligible, mention what they could improve.
 """
 
 GUIDANCE_PROMPT = """
@@ -8,5 +8,97 @@ class Settings:
     GENAI_BASE_URL = os.getenv("GENAI_BASE_URL")
     GENAI_MODEL = os.getenv("GENAI_MODEL")
     VERIFY_SSL = os.getenv("VERIFY_SSL", "false").lower() == "true"
+    GENAI_TIMEOUT_SECONDS = float(os.getenv("GENAI_TIMEOUT_SECONDS", "30"))
+    GENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("GENAI_CONNECT_TIMEOUT_SECONDS", "5"))
+    GENAI_MAX_CONNECTIONS = int(os.getenv("GENAI_MAX_CONNECTIONS", "20"))
+    GENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    GENAI_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("GENAI_KEEPALIVE_EXPIRY_SECONDS", "30"))
+
+    # GenAI resilience: concurrency limit, retries, circuit breaker, hedging (0 disables hedging)
+    GENAI_MAX_CONCURRENCY = int(os.getenv("GENAI_MAX_CONCURRENCY", "16"))
+    GENAI_QUEUE_TIMEOUT_SECONDS = float(os.getenv("GENAI_QUEUE_TIMEOUT_SECONDS", "10"))
+    GENAI_MAX_RETRIES = int(os.getenv("GENAI_MAX_RETRIES", "2"))
+    GENAI_BACKOFF_BASE_SECONDS = float(os.getenv("GENAI_BACKOFF_BASE_SECONDS", "0.5"))
+    GENAI_BACKOFF_MAX_SECONDS = float(os.getenv("GENAI_BACKOFF_MAX_SECONDS", "8"))
+    GENAI_BREAKER_FAILURE_THRESHOLD = int(os.getenv("GENAI_BREAKER_FAILURE_THRESHOLD", "5"))
+    GENAI_BREAKER_RESET_SECONDS = float(os.getenv("GENAI_BREAKER_RESET_SECONDS", "30"))
+    GENAI_HEDGE_AFTER_SECONDS = float(os.getenv("GENAI_HEDGE_AFTER_SECONDS", "0"))
+
+    # Batched embedding requests
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    EMBEDDING_BATCH_MAX_CHARS = int(os.getenv("EMBEDDING_BATCH_MAX_CHARS", "100000"))
+    EMBEDDING_BATCH_CONCURRENCY = int(os.getenv("EMBEDDING_BATCH_CONCURRENCY", "4"))
+
+    # Embedding cache (set EMBEDDING_CACHE_PATH empty to keep it in memory only)
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "10000"))
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.db")
+
+    # Chat completion response cache, only for temperature <= LLM_CACHE_MAX_TEMPERATURE
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+    LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.db")
+    LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.2"))
+
+    # Prompt building: retrieved-context budget per prompt and the tiktoken encoding used when installed
+    PROMPT_CONTEXT_TOKEN_BUDGET = int(os.getenv("PROMPT_CONTEXT_TOKEN_BUDGET", "600"))
+    PROMPT_TOKENIZER_ENCODING = os.getenv("PROMPT_TOKENIZER_ENCODING", "cl100k_base")
+
+    # Knowledge base vector index, one subdirectory per corpus/model hash
+    KB_INDEX_DIR = os.getenv("KB_INDEX_DIR", ".cache/kb_index")
+    RETRIEVAL_CACHE_MAX_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "1024"))
+    RETRIEVAL_CACHE_TTL_SECONDS = float(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "3600"))
+
+    # Eligibility explanations: llm, sync, background, lazy or off (see EligibilityAgent)
+    ELIGIBILITY_EXPLANATION_MODE = os.getenv("ELIGIBILITY_EXPLANATION_MODE", "background")
+    ELIGIBILITY_EXPLANATION_WORKERS = int(os.getenv("ELIGIBILITY_EXPLANATION_WORKERS", "4"))
+    ELIGIBILITY_EXPLANATION_MAX_PENDING = int(os.getenv("ELIGIBILITY_EXPLANATION_MAX_PENDING", "32"))
+    ELIGIBILITY_EXPLANATION_MAX_ENTRIES = int(os.getenv("ELIGIBILITY_EXPLANATION_MAX_ENTRIES", "4096"))
+    ELIGIBILITY_EXPLANATION_TTL_SECONDS = float(os.getenv("ELIGIBILITY_EXPLANATION_TTL_SECONDS", "3600"))
+    STRUCTURED_OUTPUT_MAX_REPAIRS = int(os.getenv("STRUCTURED_OUTPUT_MAX_REPAIRS", "3"))
+
+    # PII anonymizer: distinct PAN/Aadhaar hashes kept in memory
+    PII_HASH_MEMO_SIZE = int(os.getenv("PII_HASH_MEMO_SIZE", "65536"))
+
+    # Validation: parsed dates of birth and computed ages kept in memory
+    VALIDATION_CACHE_SIZE = int(os.getenv("VALIDATION_CACHE_SIZE", "4096"))
+
+    # Customer store for verification: a CSV/Parquet/SQLite file or a saved store directory
+    # (built-in synthetic customers when unset); files are indexed once into CUSTOMER_STORE_DIR
+    CUSTOMER_DATA_PATH = os.getenv("CUSTOMER_DATA_PATH", "")
+    CUSTOMER_DATA_TABLE = os.getenv("CUSTOMER_DATA_TABLE", "customers")
+    CUSTOMER_STORE_DIR = os.getenv("CUSTOMER_STORE_DIR", ".cache/customer_store")
+    # Fuzzy name matching: minimum score (0-1) for a name to match, and rows scored per search
+    NAME_MATCH_THRESHOLD = float(os.getenv("NAME_MATCH_THRESHOLD", "0.8"))
+    NAME_SEARCH_MAX_CANDIDATES = int(os.getenv("NAME_SEARCH_MAX_CANDIDATES", "2000"))
+
+    # Batch verification: request bytes buffered in memory before spilling to disk,
+    # longest accepted NDJSON line, and records verified per worker-thread hop
+    VERIFY_BATCH_SPOOL_BYTES = int(os.getenv("VERIFY_BATCH_SPOOL_BYTES", str(1 << 20)))
+    VERIFY_BATCH_MAX_LINE_BYTES = int(os.getenv("VERIFY_BATCH_MAX_LINE_BYTES", "65536"))
+    VERIFY_BATCH_CHUNK_RECORDS = int(os.getenv("VERIFY_BATCH_CHUNK_RECORDS", "500"))
+
+    # Session store
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+    SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", "sessions.db")
+    SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+    SESSION_IDLE_TTL_SECONDS = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "1800"))
+    SESSION_COMPLETED_TTL_SECONDS = float(os.getenv("SESSION_COMPLETED_TTL_SECONDS", "300"))
+    SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+    SESSION_SWEEP_INTERVAL_SECONDS = float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "60"))
+
+    # Conversation flow definition (JSON); the built-in flow is used when unset
+    CONVERSATION_FLOW_PATH = os.getenv("CONVERSATION_FLOW_PATH")
+    # Take financial details from the customer store once identity is verified, asking only to confirm them
+    CONVERSATION_PREFILL_ENABLED = os.getenv("CONVERSATION_PREFILL_ENABLED", "true").lower() == "true"
+
+    # Logging: JSON lines on stderr, written by a background thread. LOG_SAMPLE_RATES keeps a fraction
+    # of the sub-WARNING records per logger ("app.services.conversation_manager=0.1,app.main=0.5");
+    # records beyond LOG_QUEUE_SIZE waiting to be written are dropped rather than blocking requests
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_REDACT_PII = os.getenv("LOG_REDACT_PII", "true").lower() == "true"
 
 settings = Settings()
\ No newline at end of file
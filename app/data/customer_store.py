@@ -0,0 +1,474 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from app.services.name_matching import INITIAL_SCORE, name_tokens, phonetic_key, token_set_similarity, trigrams
+from app.services.validation import aadhaar_digits, is_valid_pan, parse_dob
+
+# Bump when the on-disk layout changes so saved stores are rebuilt
+STORE_FORMAT_VERSION = "3"
+
+# Record layout returned by the store, in order
+RECORD_FIELDS = (
+    "pan", "name", "father_name", "date_of_birth", "address", "aadhaar",
+    "monthly_income", "employment_type", "years_employed", "existing_emis", "credit_score"
+)
+TEXT_FIELDS = ("name", "father_name", "address")
+NUMERIC_FIELDS = ("monthly_income", "years_employed", "existing_emis", "credit_score")
+
+def read_records(path: str, table: str = "customers") -> Iterator[Dict[str, Any]]:
+    """Stream customer records from a CSV, Parquet or SQLite file"""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+    elif suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Loading customers from Parquet requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+    elif suffix in (".db", ".sqlite", ".sqlite3"):
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            for row in conn.execute(f'SELECT * FROM "{table}"'):
+                yield dict(row)
+        finally:
+            conn.close()
+    else:
+        raise ValueError(f"Unsupported customer data file {path!r}: expected .csv, .parquet or a SQLite database")
+
+class CustomerStore:
+    """Read-only, column-oriented customer table with secondary indexes.
+
+    Rows are sorted by PAN, so the primary index is a binary search over
+    the fixed-width PAN column. Aadhaar numbers (as integers) and dates of
+    birth (as YYYYMMDD integers) are indexed by a sorted copy of the column
+    with the row of each key, and names by an inverted index from
+    normalized token to rows. For fuzzy name search the distinct tokens are
+    in turn indexed by Soundex code and by trigram.
+    Free text is kept as one UTF-8 buffer plus offsets and employment type
+    as category codes, so there is no Python object per row.
+
+    All columns and indexes are plain numpy arrays: save() writes them as
+    .npy files and open() memory-maps them, so a worker starts without
+    parsing anything and the pages are shared between workers on a host.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any], path: str = None):
+        self.arrays = arrays
+        self.meta = meta
+        self.path = path
+        self.employment_types = meta["employment_types"]
+        self.rejected = meta.get("rejected", 0)
+
+    def __len__(self) -> int:
+        return len(self.arrays["pan"])
+
+    # Building
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "CustomerStore":
+        """Build a store from customer dicts; rows without a valid PAN are skipped, a repeated PAN keeps the last row"""
+        pans, aadhaars, dobs = [], [], []
+        texts = {name: [] for name in TEXT_FIELDS}
+        numbers = {name: [] for name in NUMERIC_FIELDS}
+        employment_codes, employment_types = [], {}
+        rejected = 0
+        for record in records:
+            pan = str(record.get("pan") or "").strip().upper()
+            if not is_valid_pan(pan, ignore_case=False):
+                rejected += 1
+                continue
+            pans.append(pan)
+            digits = aadhaar_digits(str(record.get("aadhaar") or ""))
+            aadhaars.append(int(digits) if digits else 0)
+            dob = parse_dob(str(record.get("date_of_birth") or "").strip())
+            dobs.append(dob.year * 10000 + dob.month * 100 + dob.day if dob else 0)
+            for name in TEXT_FIELDS:
+                texts[name].append(str(record.get(name) or "").encode("utf-8"))
+            for name in NUMERIC_FIELDS:
+                numbers[name].append(_to_float(record.get(name)))
+            employment_type = str(record.get("employment_type") or "")
+            employment_codes.append(employment_types.setdefault(employment_type, len(employment_types)))
+
+        pan_column = np.array(pans, dtype="S10")
+        order = np.argsort(pan_column, kind="stable")
+        sorted_pans = pan_column[order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[:-1] = sorted_pans[1:] != sorted_pans[:-1]
+        rows = order[keep]
+
+        arrays = {
+            "pan": pan_column[rows],
+            "aadhaar": np.array(aadhaars, dtype=np.uint64)[rows],
+            "dob": np.array(dobs, dtype=np.int32)[rows],
+            "employment_type": np.array(employment_codes, dtype=np.uint16)[rows]
+        }
+        for name in NUMERIC_FIELDS:
+            arrays[name] = np.array(numbers[name], dtype=np.float64)[rows]
+        for name in TEXT_FIELDS:
+            values = [texts[name][i] for i in rows.tolist()]
+            arrays[f"{name}_data"] = np.frombuffer(b"".join(values), dtype=np.uint8)
+            arrays[f"{name}_offsets"] = np.concatenate(([0], np.cumsum([len(v) for v in values], dtype=np.int64)))
+        for column in ("aadhaar", "dob"):
+            order = np.argsort(arrays[column], kind="stable")
+            arrays[f"{column}_keys"] = arrays[column][order]
+            arrays[f"{column}_rows"] = order.astype(np.int32)
+        arrays.update(_build_token_index([texts["name"][i].decode("utf-8") for i in rows.tolist()]))
+
+        meta = {
+            "format_version": STORE_FORMAT_VERSION,
+            "rows": int(rows.size),
+            "rejected": rejected + len(pans) - int(rows.size),
+            "employment_types": list(employment_types)
+        }
+        return cls(arrays, meta)
+
+    @classmethod
+    def from_file(cls, path: str, table: str = "customers") -> "CustomerStore":
+        return cls.from_records(read_records(path, table))
+
+    def save(self, path: str) -> None:
+        # Write to a scratch directory and rename it into place, so concurrent
+        # workers never open a half-written store
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        scratch = tempfile.mkdtemp(dir=target.parent)
+        try:
+            for name, array in self.arrays.items():
+                np.save(os.path.join(scratch, f"{name}.npy"), np.ascontiguousarray(array))
+            with open(os.path.join(scratch, "meta.json"), "w") as f:
+                json.dump(self.meta, f)
+            os.rename(scratch, target)
+        except OSError:
+            if not (target / "meta.json").exists():
+                raise
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    @classmethod
+    def open(cls, path: str) -> "CustomerStore":
+        """Memory-map a store written by save()"""
+        directory = Path(path)
+        with open(directory / "meta.json") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != STORE_FORMAT_VERSION:
+            raise ValueError(f"Customer store at {path} has format {meta.get('format_version')}, expected {STORE_FORMAT_VERSION}")
+        arrays = {file.stem: _load_array(file) for file in directory.glob("*.npy")}
+        return cls(arrays, meta, str(directory))
+
+    @classmethod
+    def open_or_build(cls, source: str, store_dir: str, table: str = "customers") -> "CustomerStore":
+        """Open the saved store for a data file, building and saving it on first use.
+
+        The store is keyed by the file's path, size and modification time, so
+        it is rebuilt whenever the data changes. A directory written by save()
+        may also be given as the source.
+        """
+        if (Path(source) / "meta.json").exists():
+            return cls.open(source)
+        stat = os.stat(source)
+        digest = hashlib.sha256(
+            f"{STORE_FORMAT_VERSION}\0{os.path.abspath(source)}\0{stat.st_size}\0{stat.st_mtime_ns}\0{table}".encode("utf-8")
+        )
+        path = Path(store_dir) / digest.hexdigest()[:16]
+        if (path / "meta.json").exists():
+            return cls.open(str(path))
+        store = cls.from_file(source, table)
+        store.save(str(path))
+        return cls.open(str(path))
+
+    # Lookups
+
+    def row_for_pan(self, pan: str) -> Optional[int]:
+        key = pan.upper()
+        if len(key) != 10 or not key.isascii():
+            return None
+        column = self.arrays["pan"]
+        key = key.encode("ascii")
+        row = int(np.searchsorted(column, key))
+        if row < len(column) and column[row] == key:
+            return row
+        return None
+
+    def rows_for_aadhaar(self, aadhaar: str) -> np.ndarray:
+        digits = aadhaar_digits(aadhaar)
+        if not digits or int(digits) == 0:
+            return np.zeros(0, dtype=np.int32)
+        return self._equal_rows("aadhaar", np.uint64(int(digits)))
+
+    def rows_for_dob(self, dob: str) -> np.ndarray:
+        parsed = parse_dob(dob)
+        if parsed is None:
+            return np.zeros(0, dtype=np.int32)
+        return self._equal_rows("dob", np.int32(parsed.year * 10000 + parsed.month * 100 + parsed.day))
+
+    def rows_for_name(self, name: str) -> np.ndarray:
+        """Rows whose name contains every token of the given name"""
+        postings = [self._token_rows(token) for token in set(name_tokens(name))]
+        if not postings:
+            return np.zeros(0, dtype=np.int32)
+        postings.sort(key=len)
+        rows = postings[0]
+        for other in postings[1:]:
+            if not rows.size:
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return np.asarray(rows)
+
+    def search_name(self, name: str, threshold: float, limit: int = 10,
+                    max_candidates: int = 2000) -> List[Tuple[int, float]]:
+        """Rows whose name scores at least threshold against the given name, best first.
+
+        Each query token (other than initials) is expanded to the similar
+        tokens of the vocabulary: same Soundex code, enough shared trigrams,
+        or a stored initial. A row's score averages its best pairs with the
+        query, as many as the shorter of the two names has tokens, so from a
+        row's token count follows how many query tokens it must have a
+        similar token for; a name shorter than the query may miss some.
+        Candidates are taken from the rarest expansions only as far as that
+        count requires, each gets an upper bound on its score from its
+        similar tokens' scores, and only those whose bound reaches threshold
+        are scored in full, so few rows are scored however many share a
+        common token.
+        """
+        query = name_tokens(name)
+        initials = sum(1 for token in query if len(token) == 1)
+        # Tokens scoring below floor are not expanded. Set so that a row of as
+        # many tokens as the query cannot score threshold with one of them
+        # below floor, nor any row with all of them below it; lowered by a
+        # hair so a token scoring exactly that much is expanded whatever the
+        # rounding
+        floor = max(0.0, threshold - (1 - threshold) * max(1, initials, len(query) - 1) - 1e-9)
+        offsets, postings = self.arrays["name_postings_offsets"], self.arrays["name_postings"]
+        expansions = []
+        for token, count in Counter(token for token in query if len(token) > 1).items():
+            similar = [(postings[offsets[i]:offsets[i + 1]], score) for i, score in self._similar_tokens(token, floor).items()]
+            expansions.append((sum(len(rows) for rows, _ in similar), similar, count))
+        if not expansions:
+            return []
+        expansions.sort(key=lambda expansion: expansion[0])
+
+        # needed[p]: query tokens a row making p pairs must have a similar token
+        # for, counting initials (which may meet an equal one) as found and
+        # any other pair as scoring below floor
+        total = sum(count for _, _, count in expansions)
+        needed = [total + 1] * (len(query) + 1)
+        for pairs in range(1, len(query) + 1):
+            for found in range(1, total + 1):
+                best = min(found + initials, pairs)
+                if best + (pairs - best) * floor >= threshold * pairs:
+                    needed[pairs] = found
+                    break
+        # Such a row has a similar token for one of the rarest expansions
+        # whose counts add up to more than total - needed[p]
+        seeds, remaining = [], total
+        for _, _, count in expansions:
+            seeds.append([pairs for pairs in range(1, len(query) + 1) if remaining >= needed[pairs]])
+            remaining -= count
+        token_counts = self.arrays["name_token_counts"]
+        candidates = []
+        for (_, similar, _), seed_pairs in zip(expansions, seeds):
+            if not seed_pairs:
+                break
+            rows = np.concatenate([rows for rows, _ in similar] or [postings[:0]])
+            if len(seed_pairs) < len(query):
+                rows = rows[np.isin(np.minimum(len(query), token_counts[rows]), seed_pairs)]
+            candidates.append(rows)
+        rows = np.unique(np.concatenate(candidates or [postings[:0]]))
+        if not rows.size:
+            return []
+
+        # Best score each query token can reach in each row: its closest
+        # similar token there, 1 for an initial, and below floor otherwise
+        best = np.full((rows.size, len(query)), floor)
+        best[:, :initials] = 1.0
+        column = initials
+        for _, similar, count in expansions:
+            reached = np.full(rows.size, floor)
+            for token_rows, score in similar:
+                if not token_rows.size:
+                    continue
+                positions = np.minimum(np.searchsorted(token_rows, rows), token_rows.size - 1)
+                found = token_rows[positions] == rows
+                reached[found] = np.maximum(reached[found], score)
+            best[:, column:column + count] = reached[:, None]
+            column += count
+        pairs = np.minimum(len(query), token_counts[rows]).astype(np.int64)
+        top = np.cumsum(-np.sort(-best, axis=1), axis=1)
+        bound = top[np.arange(rows.size), pairs - 1] / pairs
+        keep = bound >= threshold
+        rows, bound = rows[keep], bound[keep]
+        rows = rows[np.lexsort((rows, -bound))]
+
+        matches = []
+        for row in rows[:max_candidates].tolist():
+            tokens = name_tokens(self._text("name", row))
+            score = token_set_similarity(query, tokens)
+            if score >= threshold:
+                matches.append((score, -abs(len(tokens) - len(query)), row))
+        matches.sort(reverse=True)
+        return [(row, score) for score, _, row in matches[:limit]]
+
+    def _similar_tokens(self, token: str, floor: float) -> Dict[int, float]:
+        """Vocabulary ids of the tokens scoring at least floor against token, with their scores.
+
+        Scores equal token_similarity() but are computed from the indexes:
+        the trigram postings give each candidate's shared trigram count.
+        """
+        grams = trigrams(token)
+        shared = [self._posting("name_trigram", gram) for gram in grams]
+        ids, counts = np.unique(np.concatenate(shared), return_counts=True)
+        scores = 2 * counts / (len(grams) + self.arrays["name_token_grams"][ids])
+        # Tokens that sound alike move halfway towards 1
+        phonetic = self._posting("name_phonetic", phonetic_key(token))
+        positions = np.minimum(np.searchsorted(ids, phonetic), max(ids.size - 1, 0))
+        found = ids[positions] == phonetic if ids.size else np.zeros(phonetic.size, dtype=bool)
+        scores[positions[found]] = (1 + scores[positions[found]]) / 2
+        keep = scores >= floor
+        similar = dict(zip(ids[keep].tolist(), scores[keep].tolist()))
+        if floor <= 0.5:
+            similar.update(dict.fromkeys(phonetic[~found].tolist(), 0.5))
+        # A stored initial that could abbreviate the token
+        initial = self._vocabulary_id(token[0])
+        if initial is not None:
+            similar[initial] = INITIAL_SCORE
+        return similar
+
+    def _vocabulary_id(self, token: str) -> Optional[int]:
+        vocabulary = self.arrays["name_tokens"]
+        key = token.encode("utf-8")
+        i = int(np.searchsorted(vocabulary, key))
+        if i == len(vocabulary) or vocabulary[i] != key:
+            return None
+        return i
+
+    def _posting(self, index: str, key: str) -> np.ndarray:
+        keys = self.arrays[f"{index}_keys"]
+        key = key.encode("utf-8")
+        i = int(np.searchsorted(keys, key))
+        if i == len(keys) or keys[i] != key:
+            return np.zeros(0, dtype=np.int32)
+        offsets = self.arrays[f"{index}_offsets"]
+        return self.arrays[f"{index}_values"][offsets[i]:offsets[i + 1]]
+
+    def _equal_rows(self, column: str, key) -> np.ndarray:
+        # Sorted copy of the column alongside the row of each key
+        keys = self.arrays[f"{column}_keys"]
+        start = np.searchsorted(keys, key, side="left")
+        end = np.searchsorted(keys, key, side="right")
+        return np.array(self.arrays[f"{column}_rows"][start:end])
+
+    def _token_rows(self, token: str) -> np.ndarray:
+        i = self._vocabulary_id(token)
+        if i is None:
+            return np.zeros(0, dtype=np.int32)
+        offsets = self.arrays["name_postings_offsets"]
+        return self.arrays["name_postings"][offsets[i]:offsets[i + 1]]
+
+    # Rows
+
+    def record(self, row: int) -> Dict[str, Any]:
+        arrays = self.arrays
+        aadhaar = int(arrays["aadhaar"][row])
+        dob = int(arrays["dob"][row])
+        record = {
+            "pan": arrays["pan"][row].decode("ascii"),
+            "name": self._text("name", row),
+            "father_name": self._text("father_name", row),
+            "date_of_birth": f"{dob % 100:02d}-{dob // 100 % 100:02d}-{dob // 10000:04d}" if dob else None,
+            "address": self._text("address", row),
+            "aadhaar": f"{aadhaar:012d}" if aadhaar else None,
+            "employment_type": self.employment_types[int(arrays["employment_type"][row])] or None
+        }
+        for name in NUMERIC_FIELDS:
+            record[name] = _from_float(arrays[name][row])
+        return {name: record[name] for name in RECORD_FIELDS}
+
+    def records(self, rows: Iterable[int]) -> List[Dict[str, Any]]:
+        return [self.record(int(row)) for row in rows]
+
+    def _text(self, name: str, row: int) -> str:
+        offsets = self.arrays[f"{name}_offsets"]
+        return bytes(self.arrays[f"{name}_data"][offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": len(self),
+            "rejected": self.rejected,
+            "bytes": sum(array.nbytes for array in self.arrays.values()),
+            "path": self.path
+        }
+
+def _inverted(keys: List[bytes], values: List[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sorted distinct keys, and for each the sorted values it maps to (as one array plus offsets)"""
+    if not keys:
+        return np.zeros(0, dtype="S1"), np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32)
+    unique_keys, inverse = np.unique(np.array(keys, dtype="S"), return_inverse=True)
+    values = np.array(values, dtype=np.int32)
+    order = np.lexsort((values, inverse))
+    counts = np.bincount(inverse, minlength=len(unique_keys))
+    return unique_keys, np.concatenate(([0], np.cumsum(counts, dtype=np.int64))), values[order]
+
+def _build_token_index(names: List[str]) -> Dict[str, np.ndarray]:
+    """Inverted index from name token to rows, and fuzzy indexes over the distinct tokens"""
+    tokens, rows, counts = [], [], []
+    for row, name in enumerate(names):
+        row_tokens = name_tokens(name)
+        counts.append(len(row_tokens))
+        for token in set(row_tokens):
+            tokens.append(token.encode("utf-8"))
+            rows.append(row)
+    vocabulary, offsets, postings = _inverted(tokens, rows)
+    arrays = {
+        "name_tokens": vocabulary, "name_postings_offsets": offsets, "name_postings": postings,
+        # Tokens per name, repeats included, as token_set_similarity counts them
+        "name_token_counts": np.array(counts, dtype=np.uint16)
+    }
+
+    words = [token.decode("utf-8") for token in vocabulary.tolist()]
+    phonetic_keys = [phonetic_key(word).encode("utf-8") for word in words]
+    gram_keys, gram_ids = [], []
+    for i, word in enumerate(words):
+        for gram in trigrams(word):
+            gram_keys.append(gram.encode("utf-8"))
+            gram_ids.append(i)
+    for index, (keys, values) in {
+        "name_phonetic": (phonetic_keys, list(range(len(words)))),
+        "name_trigram": (gram_keys, gram_ids)
+    }.items():
+        arrays[f"{index}_keys"], arrays[f"{index}_offsets"], arrays[f"{index}_values"] = _inverted(keys, values)
+    arrays["name_token_grams"] = np.array([len(trigrams(word)) for word in words], dtype=np.uint16)
+    return arrays
+
+def _load_array(path: Path) -> np.ndarray:
+    try:
+        # A plain ndarray view of the mapping: np.memmap indexing goes through Python
+        return np.asarray(np.load(path, mmap_mode="r"))
+    except ValueError:
+        # Empty arrays cannot be memory-mapped
+        return np.load(path)
+
+def _to_float(value) -> float:
+    if value is None or value == "":
+        return float("nan")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+def _from_float(value):
+    value = float(value)
+    if value != value:
+        return None
+    return int(value) if value.is_integer() else value
\ No newline at end of file
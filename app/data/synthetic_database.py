@@ -1,5 +1,9 @@
-import json
-from typing import Dict, Optional
+import threading
+from typing import Dict, List, Optional
+from app.config.settings import settings
+from app.data.customer_store import CustomerStore
+from app.services.name_matching import name_similarity
+from app.services.validation import parse_dob
 
 # Synthetic customer database
 SYNTHETIC_CUSTOMERS = [
@@ -45,13 +49,52 @@ SYNTHETIC_CUSTOMERS = [
 ]
 
 class SyntheticDatabase:
-    def __init__(self):
-        self.customers = {customer["pan"]: customer for customer in SYNTHETIC_CUSTOMERS}
+    """Customer lookups for verification, backed by an indexed CustomerStore.
+    
+    The store is loaded from settings.CUSTOMER_DATA_PATH (CSV, Parquet,
+    SQLite or a saved store directory) on first use, or built from
+    SYNTHETIC_CUSTOMERS when no path is configured.
+    """
+    
+    def __init__(self, store: CustomerStore = None, name_threshold: float = None):
+        self._store = store
+        self._lock = threading.Lock()
+        self.name_threshold = settings.NAME_MATCH_THRESHOLD if name_threshold is None else name_threshold
+    
+    @property
+    def store(self) -> CustomerStore:
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    if settings.CUSTOMER_DATA_PATH:
+                        self._store = CustomerStore.open_or_build(
+                            settings.CUSTOMER_DATA_PATH, settings.CUSTOMER_STORE_DIR, settings.CUSTOMER_DATA_TABLE
+                        )
+                    else:
+                        self._store = CustomerStore.from_records(SYNTHETIC_CUSTOMERS)
+        return self._store
     
     def find_by_pan(self, pan: str) -> Optional[Dict]:
         """Find customer by PAN number (case-insensitive)"""
-        pan_upper = pan.upper()
-        return self.customers.get(pan_upper)
+        row = self.store.row_for_pan(pan)
+        return self.store.record(row) if row is not None else None
+    
+    def find_by_aadhaar(self, aadhaar: str) -> List[Dict]:
+        return self.store.records(self.store.rows_for_aadhaar(aadhaar))
+    
+    def find_by_dob(self, dob: str, limit: int = 100) -> List[Dict]:
+        return self.store.records(self.store.rows_for_dob(dob)[:limit])
+    
+    def find_by_name(self, name: str, limit: int = 100) -> List[Dict]:
+        """Customers whose name contains every word of the given name"""
+        return self.store.records(self.store.rows_for_name(name)[:limit])
+    
+    def find_similar_names(self, name: str, limit: int = 10) -> List[Dict]:
+        """Customers whose name fuzzily matches the given one, best first, with their score"""
+        matches = self.store.search_name(
+            name, self.name_threshold, limit, max_candidates=settings.NAME_SEARCH_MAX_CANDIDATES
+        )
+        return [{"customer": self.store.record(row), "score": round(score, 3)} for row, score in matches]
     
     def verify_customer(self, pan: str, name: str, dob: str, aadhaar: str = None) -> Dict:
         """Verify customer information against synthetic database"""
@@ -60,20 +103,18 @@ class SyntheticDatabase:
         if not customer:
             return {"verified": False, "message": "PAN not found in records"}
         
-        # Check name similarity (handle different name orders)
-        name_parts = set(name.upper().split())
-        customer_name_parts = set(customer["name"].upper().split())
-        name_match = name_parts.issubset(customer_name_parts) or customer_name_parts.issubset(name_parts)
+        # Score name similarity (any order, spelling variants, initials)
+        name_score = name_similarity(name, customer["name"])
+        name_match = name_score >= self.name_threshold
         
-        # Check DOB match
-        dob_match = dob == customer["date_of_birth"]
+        # Check DOB match (as dates, so 5-6-1990 matches 05-06-1990)
+        birth_date = parse_dob(dob)
+        dob_match = birth_date is not None and birth_date == parse_dob(customer["date_of_birth"])
         
         # Check Aadhaar if provided
         aadhaar_match = True
         if aadhaar and customer.get("aadhaar"):
-            aadhaar_clean = ''.join(filter(str.isdigit, aadhaar))
-            customer_aadhaar_clean = ''.join(filter(str.isdigit, customer["aadhaar"]))
-            aadhaar_match = aadhaar_clean == customer_aadhaar_clean
+            aadhaar_match = ''.join(filter(str.isdigit, aadhaar)) == customer["aadhaar"]
         
         verified = name_match and dob_match and (aadhaar_match if aadhaar else True)
         
@@ -82,6 +123,7 @@ class SyntheticDatabase:
             "customer": customer if verified else None,
             "details": {
                 "name_match": name_match,
+                "name_score": round(name_score, 3),
                 "dob_match": dob_match,
                 "aadhaar_match": aadhaar_match
             }
@@ -1,8 +1,25 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import logging
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.models.schemas import CustomerData, EligibilityResponse, ChatMessage, VerificationData
 from app.services.security import DataSecurity
 from app.services.conversation_manager import ConversationManager
+from app.services.registry import registry
+from app.agents.guidance_agent import GuidanceAgent
+from app.agents.eligibility_agent import EligibilityAgent
+from app.services.session_backends import SessionVersionConflict
+from app.services.rules_engine import get_rule_set
+from app.services.batch_eligibility import BatchInputError, columns_from_json, columns_from_ndjson, evaluate_batch_json
+from app.services.batch_verification import averify_lines, spool_body, verify_record
+from app.data.synthetic_database import synthetic_db
+from app.config.settings import settings
+from app.services.structured_logging import configure_logging, logging_stats, shutdown_logging
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Loan Eligibility Chatbot API", version="1.0.0")
 
@@ -16,23 +33,87 @@ app.add_middleware(
 
 # Initialize conversation manager
 conversation_manager = ConversationManager()
+guidance_agent = GuidanceAgent()
+eligibility_agent = EligibilityAgent()
+
+# Identity fields are never sent to the LLM
+GUIDANCE_EXCLUDED_FIELDS = {"pan", "name", "date_of_birth", "aadhaar", "address"}
+session_sweeper = None
+
+def sse(event: str, data: dict) -> str:
+    """One server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    global session_sweeper
+    session_sweeper = asyncio.create_task(
+        conversation_manager.sessions.run_sweeper(settings.SESSION_SWEEP_INTERVAL_SECONDS)
+    )
+
+@app.on_event("startup")
+async def start_services():
+    # Create the shared client/knowledge base and load (or build once) the
+    # rule index before serving, so no request pays for it
+    try:
+        await asyncio.to_thread(registry.startup)
+    except Exception as e:
+        logger.warning("Knowledge base warm-up failed, will retry on first use: %s", e)
+
+@app.on_event("startup")
+async def load_customer_store():
+    # Open (or index, the first time) the customer data before serving verifications
+    try:
+        await asyncio.to_thread(lambda: synthetic_db.store)
+    except Exception as e:
+        logger.warning("Customer store warm-up failed, will retry on first use: %s", e)
+
+@app.on_event("shutdown")
+async def stop_session_sweeper():
+    if session_sweeper:
+        session_sweeper.cancel()
+
+@app.on_event("shutdown")
+async def stop_services():
+    await registry.shutdown()
+
+@app.on_event("shutdown")
+async def stop_logging():
+    # Write out whatever is still queued
+    await asyncio.to_thread(shutdown_logging)
 
 @app.get("/")
 async def root():
     return {"message": "Loan Eligibility Chatbot API is running"}
 
+@app.get("/sessions/stats")
+async def session_stats():
+    return conversation_manager.sessions.stats()
+
+@app.get("/logs/stats")
+async def log_stats():
+    return logging_stats()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return registry.stats()
+
 @app.post("/chat")
 async def chat_endpoint(message: ChatMessage):
     try:
-        print(f"Received message: {message.message}, session_id: {message.session_id}")
+        logger.debug("Received message", extra={"session_id": message.session_id, "user_message": message.message})
         
-        # Process the message through conversation manager
-        response = conversation_manager.process_message(
-            message.message, 
+        # Process the message through conversation manager, off the event
+        # loop: session backends and the customer store do blocking I/O
+        response = await asyncio.to_thread(
+            conversation_manager.process_message,
+            message.message,
             message.session_id
         )
         
-        print(f"Response: {response['message'][:50]}..., step: {response['current_step']}")
+        logger.info("Chat reply", extra={
+            "session_id": response["session_id"], "step": response["current_step"], "completed": response["completed"]
+        })
         
         return {
             "response": response["message"],
@@ -40,80 +121,150 @@ async def chat_endpoint(message: ChatMessage):
             "current_step": response["current_step"],
             "completed": response.get("completed", False)
         }
+    except SessionVersionConflict:
+        raise HTTPException(status_code=409, detail="Session was updated concurrently, please retry")
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.exception("Chat request failed")
         raise HTTPException(status_code=500, detail=str(e))
-@app.post("/check-eligibility")
+@app.post("/chat/stream")
+async def chat_stream_endpoint(message: ChatMessage):
+    """Server-sent events version of /chat.
+
+    The conversation reply is sent first as a "message" event. When the
+    message completes the application and a GenAI backend is configured,
+    personalised guidance follows as "token" events as the model generates
+    it. A final "done" event closes the stream.
+    """
+    try:
+        response = await asyncio.to_thread(conversation_manager.process_message, message.message, message.session_id)
+    except SessionVersionConflict:
+        raise HTTPException(status_code=409, detail="Session was updated concurrently, please retry")
+    except Exception as e:
+        logger.exception("Chat request failed")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events():
+        yield sse("message", {
+            "response": response["message"],
+            "session_id": response["session_id"],
+            "current_step": response["current_step"],
+            "completed": response.get("completed", False)
+        })
+        if response.get("completed") and settings.GENAI_BASE_URL:
+            data = conversation_manager.get_session_data(response["session_id"])
+            customer_data = {k: v for k, v in data.items() if k not in GUIDANCE_EXCLUDED_FIELDS}
+            async for content in guidance_agent.astream(data.get("eligible", False), customer_data):
+                yield sse("token", {"content": content})
+        yield sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/check-eligibility", response_model=EligibilityResponse)
 async def check_eligibility(customer_data: CustomerData):
+    """Decide eligibility with the rules engine.
+
+    Depending on ELIGIBILITY_EXPLANATION_MODE the LLM explanation is included,
+    generated in the background, or generated on demand; in the last two
+    cases fetch it from /check-eligibility/explanations/{explanation_id}.
+    """
     try:
-        # This would use the eligibility agent in a real implementation
-        # For now, we'll do a simple check
-        age = conversation_manager.calculate_age(customer_data.date_of_birth)
-        
-        # Check eligibility criteria
-        eligible = True
-        reasons = []
-        
-        if age < 21 or age > 58:
-            eligible = False
-            reasons.append(f"Age {age} is outside acceptable range (21-58)")
-        
-        if customer_data.monthly_income < 25000:
-            eligible = False
-            reasons.append(f"Income ₹{customer_data.monthly_income} is below minimum requirement (₹25,000)")
-        
-        debt_ratio = customer_data.existing_emis / customer_data.monthly_income if customer_data.monthly_income > 0 else 1
-        if debt_ratio > 0.5:
-            eligible = False
-            reasons.append(f"Debt-to-income ratio {debt_ratio:.2f} exceeds maximum allowed (0.5)")
-        
-        if customer_data.credit_score < 750:
-            eligible = False
-            reasons.append(f"Credit score {customer_data.credit_score} is below preferred threshold (750)")
-        
-        if customer_data.years_employed < 1:
-            eligible = False
-            reasons.append(f"Employment duration {customer_data.years_employed} years is below minimum requirement (1 year)")
-        
-        explanation = "Based on our assessment of your financial profile and eligibility criteria."
-        
-        next_steps = [
-            "Upload last 6 months' bank statements",
-            "Upload latest salary slips",
-            "Proceed to application form"
-        ]
-        
-        return EligibilityResponse(
-            eligible=eligible,
-            reasons=reasons,
-            explanation=explanation,
-            next_steps=next_steps,
-            confidence=0.9
-        )
+        get_rule_set(customer_data.loan_type)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    try:
+        if eligibility_agent.mode in ("sync", "llm"):
+            return await asyncio.to_thread(eligibility_agent.process, customer_data)
+        return eligibility_agent.process(customer_data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/check-eligibility/stream")
+async def check_eligibility_stream(customer_data: CustomerData):
+    """Server-sent events version of /check-eligibility.
+
+    Each field of the assessment is sent as a "field" event as soon as it is
+    known, the decision ("eligible") first; the complete response follows as
+    a "result" event and a final "done" event closes the stream.
+    """
+    try:
+        get_rule_set(customer_data.loan_type)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def events():
+        async for event, data in eligibility_agent.astream_assessment(customer_data):
+            yield sse(event, data)
+        yield sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/check-eligibility/explanations/{explanation_id}")
+async def get_eligibility_explanation(explanation_id: str):
+    explanation = await asyncio.to_thread(eligibility_agent.get_explanation, explanation_id)
+    if explanation is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired explanation id")
+    return explanation
+
+@app.post("/check-eligibility/batch")
+async def check_eligibility_batch(request: Request):
+    """Score many applicants at once.
+
+    Send either a columnar JSON object ({"monthly_income": [...], ...}) or
+    NDJSON with one applicant per line (Content-Type: application/x-ndjson).
+    """
+    body = await request.body()
+    ndjson = request.headers.get("content-type", "").startswith("application/x-ndjson")
+
+    def evaluate() -> bytes:
+        if ndjson:
+            columns = columns_from_ndjson(body.decode("utf-8").splitlines())
+        else:
+            columns = columns_from_json(json.loads(body))
+        return evaluate_batch_json(columns)
+
+    # Parsing, scoring and serializing are CPU-bound; keep them off the event loop
+    try:
+        content = await asyncio.to_thread(evaluate)
+    except (BatchInputError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return Response(content=content, media_type="application/json")
+
 @app.post("/verify-user")
 async def verify_user(data: VerificationData):
     try:
-        # Validate PAN format
-        if not DataSecurity.validate_pan_format(data.pan):
-            return {"verified": False, "message": "Invalid PAN format"}
-        
-        # Validate Aadhaar format
-        if data.aadhaar and not DataSecurity.validate_aadhaar_format(data.aadhaar):
-            return {"verified": False, "message": "Invalid Aadhaar format"}
-        
-        # Validate date format
-        if not DataSecurity.validate_date_format(data.date_of_birth):
-            return {"verified": False, "message": "Invalid date format. Use DD-MM-YYYY"}
-        
-        # In a real application, you would verify against a database
-        # For this example, we'll assume verification is successful
-        return {"verified": True, "message": "User verified successfully"}
+        return verify_record(data.dict())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/verify-user/batch")
+async def verify_user_batch(request: Request):
+    """Verify many users at once against the customer store.
+
+    Send NDJSON with one VerificationData object per line (an optional "id"
+    is echoed back). Results stream back as NDJSON, one line per record in
+    input order. The upload is spooled to disk past VERIFY_BATCH_SPOOL_BYTES
+    and verified a chunk at a time, so memory stays bounded whatever the
+    batch size.
+    """
+    spool = await spool_body(request.stream())
+
+    async def results():
+        try:
+            async for chunk in averify_lines(spool):
+                yield chunk
+        finally:
+            spool.close()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,7 +1,6 @@
 from pydantic import BaseModel, Field, validator
 from typing import Optional
-import re
-from datetime import datetime
+from app.services import validation
 
 class CustomerData(BaseModel):
     pan: str = Field(..., description="PAN card number")
@@ -16,19 +15,17 @@ class CustomerData(BaseModel):
     loan_amount: Optional[float] = Field(None, description="Requested loan amount")
     loan_purpose: Optional[str] = Field(None, description="Purpose of loan")
     aadhaar: Optional[str] = Field(None, description="Aadhaar number")
+    loan_type: Optional[str] = Field("Personal Loan", description="Loan product to check eligibility for")
     
     @validator('pan')
     def validate_pan_format(cls, v):
-        pattern = r'^[A-Z]{5}[0-9]{4}[A-Z]{1}$'
-        if not re.match(pattern, v.upper()):
+        if not validation.is_valid_pan(v):
             raise ValueError('Invalid PAN format')
         return v.upper()
     
     @validator('date_of_birth')
     def validate_dob_format(cls, v):
-        try:
-            datetime.strptime(v, '%d-%m-%Y')
-        except ValueError:
+        if not validation.is_valid_date(v):
             raise ValueError('Date of birth must be in DD-MM-YYYY format')
         return v
     
@@ -41,9 +38,12 @@ class CustomerData(BaseModel):
 class EligibilityResponse(BaseModel):
     eligible: bool
     reasons: list[str]
+    reason_codes: list[str] = []
     explanation: str
     next_steps: list[str]
     confidence: float
+    explanation_id: Optional[str] = None
+    explanation_status: str = "complete"
 
 class ChatMessage(BaseModel):
     message: str
@@ -0,0 +1,161 @@
+import codecs
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Tuple
+from app.config.settings import settings
+
+# Both identifiers in one alternation, so text is scanned once. The patterns
+# are the original ones (Aadhaar allows one whitespace between digit groups);
+# they cannot start at the same character, so their order does not matter,
+# and the lookahead lets most positions fail on a single character test.
+PII_PATTERN = re.compile(
+    r"(?=[A-Z\d])(?:(?P<aadhaar>\d{4}\s?\d{4}\s?\d{4})|(?P<pan>[A-Z]{5}[0-9]{4}[A-Z]))"
+)
+# For free text typed by users (e.g. in logs), where a PAN may be lower-case
+PII_PATTERN_IGNORE_CASE = re.compile(PII_PATTERN.pattern, re.IGNORECASE)
+# Longest possible match ("1234 5678 9012"); anything shorter than this at
+# the end of a chunk may still grow and is held back
+MAX_MATCH_LENGTH = 14
+# Hash prefix lengths of the original implementation
+PAN_HASH_LENGTH = 10
+AADHAAR_HASH_LENGTH = 12
+# ASCII characters that can be part of a match, taken from the pattern's own
+# classes (str \s also matches \x1c-\x1f); shards are split on any other ASCII byte
+_MATCH_BYTES = frozenset(b for b in range(0x80) if re.match(r"[A-Z\d\s]", chr(b)))
+
+@lru_cache(maxsize=settings.PII_HASH_MEMO_SIZE)
+def _digest(token: str, length: int) -> str:
+    # Transcripts repeat the same PAN/Aadhaar many times; hash each once
+    return hashlib.sha256(token.encode()).hexdigest()[:length]
+
+def _replace(match: re.Match) -> str:
+    if match.lastgroup == "pan":
+        # Upper-cased so a PAN hashes the same however it was typed
+        return _digest(match.group().upper(), PAN_HASH_LENGTH)
+    return _digest(match.group(), AADHAAR_HASH_LENGTH)
+
+def anonymize(text: str, ignore_case: bool = False) -> str:
+    """Replace every PAN and Aadhaar number with a truncated SHA-256 of it.
+
+    PANs are matched in upper case only unless ignore_case is set.
+    """
+    return (PII_PATTERN_IGNORE_CASE if ignore_case else PII_PATTERN).sub(_replace, text)
+
+def anonymize_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """Anonymize text arriving in arbitrary chunks, yielding anonymized chunks.
+
+    The output is identical to anonymize() over the concatenated input: the
+    tail of each chunk that could be the start of a match is carried over
+    to the next one.
+    """
+    carry = ""
+    for chunk in chunks:
+        buffer = carry + chunk
+        # A match starting before `safe` has all the characters it could use
+        safe = len(buffer) - (MAX_MATCH_LENGTH - 1)
+        if safe <= 0:
+            carry = buffer
+            continue
+        pieces, position = [], 0
+        for match in PII_PATTERN.finditer(buffer):
+            if match.start() >= safe:
+                break
+            pieces.append(buffer[position:match.start()])
+            pieces.append(_replace(match))
+            position = match.end()
+        cut = max(safe, position)
+        pieces.append(buffer[position:cut])
+        carry = buffer[cut:]
+        yield "".join(pieces)
+    if carry:
+        yield anonymize(carry)
+
+def _read_chunks(file, chunk_size: int) -> Iterator[str]:
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+def anonymize_file(source: str, destination: str, chunk_size: int = 1 << 20, encoding: str = "utf-8") -> int:
+    """Stream-anonymize a text file in bounded memory; returns the number of bytes read"""
+    with open(source, "r", encoding=encoding, newline="") as src, \
+            open(destination, "w", encoding=encoding, newline="") as dst:
+        for chunk in anonymize_stream(_read_chunks(src, chunk_size)):
+            dst.write(chunk)
+    return os.path.getsize(source)
+
+def _shard_bounds(path: str, shards: int) -> List[Tuple[int, int]]:
+    """Split a file into byte ranges whose boundaries no match can span"""
+    size = os.path.getsize(path)
+    target = max(1, size // shards)
+    bounds, start = [], 0
+    with open(path, "rb") as f:
+        while start < size:
+            end = min(size, start + target)
+            f.seek(end)
+            # Move forward to an ASCII byte that cannot be part of a match
+            while end < size:
+                block = f.read(4096)
+                if not block:
+                    end = size
+                    break
+                offset = next((i for i, byte in enumerate(block) if byte < 0x80 and byte not in _MATCH_BYTES), None)
+                if offset is not None:
+                    end += offset
+                    break
+                end += len(block)
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+def _read_range(path: str, start: int, end: int, chunk_size: int, encoding: str) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield decoder.decode(data, final=remaining <= 0)
+
+def _anonymize_shard(args: Tuple[str, int, int, str, int, str]) -> str:
+    source, start, end, directory, chunk_size, encoding = args
+    part = os.path.join(directory, f"{start:016d}.part")
+    with open(part, "w", encoding=encoding, newline="") as dst:
+        for chunk in anonymize_stream(_read_range(source, start, end, chunk_size, encoding)):
+            dst.write(chunk)
+    return part
+
+def anonymize_file_parallel(source: str, destination: str, workers: int = None, chunk_size: int = 1 << 20,
+                            encoding: str = "utf-8") -> int:
+    """Anonymize a large file by sharding it across worker processes.
+
+    The output is identical to anonymize_file(). Returns the number of
+    bytes read.
+    """
+    workers = workers or os.cpu_count() or 1
+    bounds = _shard_bounds(source, workers)
+    if len(bounds) <= 1:
+        anonymize_file(source, destination, chunk_size, encoding)
+        return os.path.getsize(source)
+    directory = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(destination)))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(
+                _anonymize_shard, [(source, start, end, directory, chunk_size, encoding) for start, end in bounds]
+            ))
+        with open(destination, "wb") as dst:
+            for part in parts:
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, dst, 1 << 20)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return os.path.getsize(source)
\ No newline at end of file
@@ -0,0 +1,196 @@
+import json
+from datetime import datetime
+from json.encoder import encode_basestring
+from typing import Dict, Any, Iterable, List
+import numpy as np
+from app.services.rules_engine import get_rule_set, normalize_loan_type
+from app.services.validation import ages_on, parse_dates
+
+REQUIRED_COLUMNS = ["date_of_birth", "monthly_income", "existing_emis", "credit_score", "years_employed"]
+OPTIONAL_COLUMNS = ["pan", "loan_type"]
+
+class BatchInputError(ValueError):
+    pass
+
+def columns_from_json(payload: Dict[str, Any]) -> Dict[str, list]:
+    """Accept a columnar payload: {"monthly_income": [...], "credit_score": [...], ...}"""
+    if not isinstance(payload, dict):
+        raise BatchInputError("Columnar payload must be a JSON object of equal-length arrays")
+    missing = [name for name in REQUIRED_COLUMNS if name not in payload]
+    if missing:
+        raise BatchInputError(f"Missing columns: {', '.join(missing)}")
+    columns = {name: payload[name] for name in REQUIRED_COLUMNS + OPTIONAL_COLUMNS if name in payload}
+    not_arrays = [name for name, values in columns.items() if not isinstance(values, list)]
+    if not_arrays:
+        raise BatchInputError(f"Columns must be arrays: {', '.join(not_arrays)}")
+    if len({len(values) for values in columns.values()}) != 1:
+        raise BatchInputError("All columns must be arrays of the same length")
+    return columns
+
+def columns_from_ndjson(lines: Iterable[str]) -> Dict[str, list]:
+    """Accept one applicant JSON object per line and pivot it into columns"""
+    columns = {name: [] for name in REQUIRED_COLUMNS}
+    pans, loan_types = [], []
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise BatchInputError(f"Line {line_number} is not valid JSON")
+        if not isinstance(record, dict):
+            raise BatchInputError(f"Line {line_number} is not a JSON object")
+        for name in REQUIRED_COLUMNS:
+            if name not in record:
+                raise BatchInputError(f"Line {line_number} is missing '{name}'")
+            columns[name].append(record[name])
+        pans.append(record.get("pan"))
+        loan_types.append(record.get("loan_type"))
+    columns["pan"] = pans
+    columns["loan_type"] = loan_types
+    return columns
+
+def _numeric_column(values: list, name: str) -> np.ndarray:
+    try:
+        column = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        column = None
+    if column is None or column.ndim != 1:
+        raise BatchInputError(f"'{name}' must contain only numbers")
+    # null becomes NaN and NaN fails every comparison, so it would pass the rules unnoticed
+    if not np.isfinite(column).all():
+        raise BatchInputError(f"'{name}' must contain only finite numbers, not null, NaN or Infinity")
+    return column
+
+def _score(columns: Dict[str, list]) -> Dict[str, Any]:
+    # Column-wise decisions: canonical loan type, failed-rule bitmask and row validity
+    income = _numeric_column(columns["monthly_income"], "monthly_income")
+    emis = _numeric_column(columns["existing_emis"], "existing_emis")
+    credit_score = _numeric_column(columns["credit_score"], "credit_score")
+    years_employed = _numeric_column(columns["years_employed"], "years_employed")
+    n = len(income)
+    day, month, year, dob_valid = parse_dates(columns["date_of_birth"])
+    age = ages_on(datetime.now(), day, month, year)
+
+    score_valid = (credit_score >= 300) & (credit_score <= 900) & (credit_score == np.floor(credit_score))
+    row_valid = dob_valid & score_valid
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        debt_ratio = np.where(income > 0, emis / np.where(income > 0, income, 1), 1)
+    facts = {
+        "age": age,
+        "monthly_income": income,
+        "existing_emis": emis,
+        "debt_ratio": debt_ratio,
+        "credit_score": credit_score,
+        "years_employed": years_employed,
+    }
+
+    loan_types = columns.get("loan_type") or [None] * n
+    if any(loan_type is not None and not isinstance(loan_type, str) for loan_type in loan_types):
+        raise BatchInputError("Loan types must be strings")
+    try:
+        canonical = np.array([normalize_loan_type(loan_type) for loan_type in loan_types], dtype=object)
+    except ValueError as e:
+        raise BatchInputError(str(e))
+
+    # Failures are kept as a bitmask (bit i = rule i of the row's rule set);
+    # there are few distinct (loan type, mask) pairs, so each is decoded once
+    failures = np.zeros(n, dtype=np.int64)
+    group_codes = {}
+    for loan_type in set(canonical.tolist()):
+        rule_set = get_rule_set(loan_type)
+        rows = canonical == loan_type
+        group_codes[loan_type] = [rule.code for rule in rule_set.rules]
+        group_facts = {name: values[rows] for name, values in facts.items()}
+        group_failures = np.zeros(int(rows.sum()), dtype=np.int64)
+        for bit, (_, failed) in enumerate(rule_set.evaluate_columns(group_facts)):
+            group_failures |= failed.astype(np.int64) << bit
+        failures[rows] = group_failures
+    return {
+        "n": n,
+        "pans": columns.get("pan") or [None] * n,
+        "loan_types": canonical.tolist(),
+        "failures": failures.tolist(),
+        "row_valid": row_valid.tolist(),
+        "dob_valid": dob_valid.tolist(),
+        "group_codes": group_codes,
+        "eligible_count": int(((failures == 0) & row_valid).sum()),
+        "invalid_count": int((~row_valid).sum()),
+    }
+
+def _rows(scored: Dict[str, Any]) -> Iterable[tuple]:
+    """(row, pan, loan_type, eligible, reason_codes, error) per applicant.
+
+    There are few distinct (loan type, mask) pairs, so each is decoded once
+    and rows with the same pair share its reason-code list.
+    """
+    decoded = {}
+    group_codes = scored["group_codes"]
+    rows = zip(scored["pans"], scored["loan_types"], scored["failures"], scored["row_valid"], scored["dob_valid"])
+    for i, (pan, loan_type, mask, is_valid, dob_valid) in enumerate(rows):
+        if not is_valid:
+            error = "Date of birth must be in DD-MM-YYYY format" if not dob_valid \
+                else "Credit score must be between 300 and 900"
+            yield i, pan, loan_type, None, [], error
+            continue
+        key = (loan_type, mask)
+        if key not in decoded:
+            decoded[key] = [code for bit, code in enumerate(group_codes[loan_type]) if mask >> bit & 1]
+        yield i, pan, loan_type, mask == 0, decoded[key], None
+
+def evaluate_batch(columns: Dict[str, list]) -> Dict[str, Any]:
+    """Score every applicant at once with the same rule sets as /check-eligibility.
+
+    An optional "loan_type" column selects the rule set per row (Personal Loan
+    by default); rows are grouped by loan type and each group is evaluated as
+    a whole.
+    """
+    scored = _score(columns)
+    results = []
+    for i, pan, loan_type, eligible, reason_codes, error in _rows(scored):
+        result = {"row": i, "pan": pan, "loan_type": loan_type, "eligible": eligible, "reason_codes": reason_codes}
+        if error:
+            result["error"] = error
+        results.append(result)
+    return {
+        "count": scored["n"],
+        "eligible_count": scored["eligible_count"],
+        "invalid_count": scored["invalid_count"],
+        "results": results
+    }
+
+def _dumps(value: Any) -> str:
+    # The encoding FastAPI's JSONResponse uses
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+def _encode(value: Any) -> str:
+    return encode_basestring(value) if isinstance(value, str) else _dumps(value)
+
+def evaluate_batch_json(columns: Dict[str, list]) -> bytes:
+    """evaluate_batch() serialized straight to JSON.
+
+    Produces the same document as a JSONResponse of evaluate_batch(columns) but
+    writes each row from pre-encoded pieces instead of building and then
+    encoding a dict per applicant.
+    """
+    scored = _score(columns)
+    encoded: Dict[Any, str] = {}
+
+    def cached(value: Any) -> str:
+        key = (type(value), value if not isinstance(value, list) else tuple(value))
+        if key not in encoded:
+            encoded[key] = _dumps(value)
+        return encoded[key]
+
+    parts: List[str] = []
+    for i, pan, loan_type, eligible, reason_codes, error in _rows(scored):
+        error_part = f',"error":{cached(error)}' if error else ""
+        parts.append(
+            f'{{"row":{i},"pan":{_encode(pan)},"loan_type":{cached(loan_type)},'
+            f'"eligible":{cached(eligible)},"reason_codes":{cached(reason_codes)}{error_part}}}'
+        )
+    return (
+        f'{{"count":{scored["n"]},"eligible_count":{scored["eligible_count"]},'
+        f'"invalid_count":{scored["invalid_count"]},"results":[{",".join(parts)}]}}'
+    ).encode("utf-8")
\ No newline at end of file
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import tempfile
+from itertools import islice
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, Optional
+from app.config.settings import settings
+from app.data.synthetic_database import SyntheticDatabase, synthetic_db
+from app.services.security import DataSecurity
+
+def verify_record(record: Dict[str, Any], db: SyntheticDatabase = None) -> Dict[str, Any]:
+    """Check the formats of one record, then match it against the customer store.
+
+    The stored customer record is never returned, only whether and how
+    well the submitted details match it.
+    """
+    db = db or synthetic_db
+    pan, name = record.get("pan"), record.get("name")
+    date_of_birth, aadhaar = record.get("date_of_birth"), record.get("aadhaar")
+
+    if not isinstance(pan, str) or not DataSecurity.validate_pan_format(pan):
+        return {"verified": False, "message": "Invalid PAN format"}
+    if aadhaar and not (isinstance(aadhaar, str) and DataSecurity.validate_aadhaar_format(aadhaar)):
+        return {"verified": False, "message": "Invalid Aadhaar format"}
+    if not isinstance(date_of_birth, str) or not DataSecurity.validate_date_format(date_of_birth):
+        return {"verified": False, "message": "Invalid date format. Use DD-MM-YYYY"}
+    if not isinstance(name, str) or not name.strip():
+        return {"verified": False, "message": "Name is required"}
+
+    result = db.verify_customer(pan, name, date_of_birth, aadhaar)
+    if "details" not in result:
+        return {"verified": False, "message": result["message"]}
+    return {
+        "verified": result["verified"],
+        "message": "User verified successfully" if result["verified"] else "Details do not match our records",
+        "details": result["details"]
+    }
+
+async def spool_body(chunks: AsyncIterator[bytes], max_memory: int = None) -> BinaryIO:
+    """Buffer a streamed request body, in memory up to max_memory bytes and on disk beyond"""
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory or settings.VERIFY_BATCH_SPOOL_BYTES)
+    try:
+        async for chunk in chunks:
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+def _read_lines(file: BinaryIO, max_line_bytes: int) -> Iterator[Optional[bytes]]:
+    # Yields None for a line longer than max_line_bytes, without holding it in memory
+    while True:
+        line = file.readline(max_line_bytes + 1)
+        if not line:
+            return
+        if len(line) > max_line_bytes and not line.endswith(b"\n"):
+            while line and not line.endswith(b"\n"):
+                line = file.readline(max_line_bytes)
+            yield None
+            continue
+        yield line
+
+def verify_lines(file: BinaryIO, db: SyntheticDatabase = None, max_line_bytes: int = None) -> Iterator[str]:
+    """Verify NDJSON records read from file, yielding one NDJSON result per non-blank line, in order.
+
+    Each result carries the input line number, the record's "id" when it
+    has one, and the verify_record() outcome; malformed lines get an
+    "error" instead.
+    """
+    max_line_bytes = max_line_bytes or settings.VERIFY_BATCH_MAX_LINE_BYTES
+    for line_number, line in enumerate(_read_lines(file, max_line_bytes), 1):
+        if line is None:
+            result = {"line": line_number, "error": f"Line is longer than {max_line_bytes} bytes"}
+        elif not line.strip():
+            continue
+        else:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                result = {"line": line_number, "error": "Line is not a JSON object"}
+            else:
+                result = {"line": line_number}
+                if "id" in record:
+                    result["id"] = record["id"]
+                result.update(verify_record(record, db))
+        yield json.dumps(result) + "\n"
+
+async def averify_lines(file: BinaryIO, db: SyntheticDatabase = None, chunk_records: int = None) -> AsyncIterator[str]:
+    """verify_lines() off the event loop, chunk_records results at a time"""
+    chunk_records = chunk_records or settings.VERIFY_BATCH_CHUNK_RECORDS
+    results = verify_lines(file, db)
+    while True:
+        chunk = await asyncio.to_thread(lambda: list(islice(results, chunk_records)))
+        if not chunk:
+            return
+        yield "".join(chunk)
\ No newline at end of file
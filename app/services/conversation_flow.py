@@ -0,0 +1,145 @@
+import json
+import re
+from dataclasses import dataclass, field as dataclass_field
+from datetime import timedelta
+from typing import Dict, Any, Callable, Iterable, List, Optional
+from app.config.conversation_flow import CONVERSATION_FLOW
+from app.services.validation import aadhaar_digits, is_valid_date, is_valid_pan
+
+def parse_pan(message: str) -> str:
+    pan = message.strip().upper()
+    if not is_valid_pan(pan, ignore_case=False):
+        raise ValueError("Invalid PAN format")
+    return pan
+
+def parse_name(message: str) -> str:
+    return message.strip().title()
+
+def parse_date(message: str) -> str:
+    if not is_valid_date(message):
+        raise ValueError("Date must be in DD-MM-YYYY format")
+    return message.strip()
+
+def parse_aadhaar(message: str) -> str:
+    aadhaar = aadhaar_digits(message)
+    if aadhaar is None:
+        raise ValueError("Aadhaar must have 12 digits")
+    return aadhaar
+
+def parse_text(message: str) -> str:
+    return message.strip()
+
+# Parsers turn raw user input into a field value and raise ValueError on bad input
+PARSERS: Dict[str, Callable[[str], Any]] = {
+    "pan": parse_pan,
+    "name": parse_name,
+    "date": parse_date,
+    "aadhaar": parse_aadhaar,
+    "float": float,
+    "int": int,
+    "text": parse_text,
+}
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int
+    lockout: timedelta
+    lockout_message: str
+
+def words(text: str) -> str:
+    """Lower-cased letters and digits of text, one space between words"""
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+@dataclass
+class ChoiceOption:
+    keywords: List[str]
+    value: str
+    reply: str
+    next: str
+
+    def matches(self, message_words: str) -> bool:
+        """Whether a keyword appears in words(message) as whole words ("self" in "self-employed", not "no" in "not")"""
+        padded = f" {message_words} "
+        return any(f" {words(keyword)} " in padded for keyword in self.keywords)
+
+@dataclass
+class Step:
+    name: str
+    handler: Callable
+    field: Optional[str] = None
+    parser: Optional[Callable[[str], Any]] = None
+    reply: str = ""
+    invalid: str = ""
+    out_of_range: str = ""
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    next: Optional[str] = None
+    options: List[ChoiceOption] = dataclass_field(default_factory=list)
+    retry: Optional[RetryPolicy] = None
+    fields: Dict[str, str] = dataclass_field(default_factory=dict)
+    fallback: Optional[str] = None
+    fallback_reply: str = ""
+    automatic: bool = False
+
+def load_flow_config(path: str = None) -> Dict[str, Any]:
+    """Return the flow definition from a JSON file, or the built-in one"""
+    if not path:
+        return CONVERSATION_FLOW
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def compile_flow(config: Dict[str, Any], handlers: Dict[str, Callable],
+                 automatic: Iterable[str] = ()) -> Dict[str, Step]:
+    """Compile a flow definition into a step-name -> Step dispatch table.
+
+    All names are resolved here so that a bad config fails at startup rather
+    than in the middle of a conversation. Steps using one of the automatic
+    handlers are marked to run without waiting for input.
+    """
+    automatic = set(automatic)
+    defaults = config.get("retry_defaults", {})
+    steps = {}
+    for name, spec in config["steps"].items():
+        if spec["handler"] not in handlers:
+            raise ValueError(f"Step '{name}' uses unknown handler '{spec['handler']}'")
+        parser = None
+        if "parser" in spec:
+            if spec["parser"] not in PARSERS:
+                raise ValueError(f"Step '{name}' uses unknown parser '{spec['parser']}'")
+            parser = PARSERS[spec["parser"]]
+        retry = None
+        if "retry" in spec:
+            retry_spec = {**defaults, **spec["retry"]}
+            retry = RetryPolicy(
+                max_attempts=retry_spec["max_attempts"],
+                lockout=timedelta(minutes=retry_spec["lockout_minutes"]),
+                lockout_message=retry_spec["lockout_message"].format(**retry_spec)
+            )
+        steps[name] = Step(
+            name=name,
+            handler=handlers[spec["handler"]],
+            field=spec.get("field"),
+            parser=parser,
+            reply=spec.get("reply", ""),
+            invalid=spec.get("invalid", ""),
+            out_of_range=spec.get("out_of_range", ""),
+            minimum=spec.get("min"),
+            maximum=spec.get("max"),
+            next=spec.get("next"),
+            options=[ChoiceOption(**option) for option in spec.get("options", [])],
+            retry=retry,
+            fields=spec.get("fields", {}),
+            fallback=spec.get("fallback"),
+            fallback_reply=spec.get("fallback_reply", ""),
+            automatic=spec["handler"] in automatic
+        )
+
+    known = set(steps) | {"completed", "locked"}
+    for step in steps.values():
+        targets = [step.next, step.fallback] + [option.next for option in step.options]
+        for target in targets:
+            if target and target not in known:
+                raise ValueError(f"Step '{step.name}' points to unknown step '{target}'")
+    if config["start"] not in steps:
+        raise ValueError(f"Unknown start step '{config['start']}'")
+    return steps
\ No newline at end of file
@@ -1,35 +1,66 @@
+import logging
 import uuid
-import re
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Any
+from app.config.settings import settings
+from app.config.eligibility_rules import IMPROVEMENT_SUGGESTIONS
+from app.services import validation
+from app.data.synthetic_database import SyntheticDatabase, synthetic_db
+from app.services.name_matching import name_tokens
+from app.services.rules_engine import get_rule_set
+from app.services.conversation_flow import Step, compile_flow, load_flow_config, words
+from app.services.session_backends import SessionBackend, SessionVersionConflict, create_session_backend
+
+logger = logging.getLogger(__name__)
 
 class ConversationManager:
-    def __init__(self):
-        self.sessions = {}
-        self.max_attempts = 5
-        self.lockout_time = timedelta(minutes=30)
-        print("ConversationManager initialized")
+    def __init__(self, sessions: SessionBackend = None, flow_config: Dict[str, Any] = None,
+                 customers: SyntheticDatabase = None, prefill: bool = None):
+        self.sessions = sessions or create_session_backend()
+        self.customers = customers or synthetic_db
+        self.prefill = settings.CONVERSATION_PREFILL_ENABLED if prefill is None else prefill
+        self.max_save_retries = 3
+        config = flow_config or load_flow_config(settings.CONVERSATION_FLOW_PATH)
+        self.start_step = config["start"]
+        self.flow = compile_flow(config, {
+            "message": self._handle_message,
+            "choice": self._handle_choice,
+            "field": self._handle_field,
+            "eligibility": self._handle_eligibility,
+            "prefill": self._handle_prefill,
+            "decision": self._handle_decision,
+        }, automatic=("prefill", "decision"))
+        logger.info("ConversationManager initialized")
 
     def process_message(self, message: str, session_id: str = None) -> Dict[str, Any]:
-        print(f"Processing message: '{message}', session_id: {session_id}")
+        logger.debug("Processing message", extra={"session_id": session_id, "user_message": message})
 
-        # Create new session if needed
-        if not session_id or session_id not in self.sessions:
+        # Another worker may have advanced the session concurrently; replay on its latest state
+        for _ in range(self.max_save_retries - 1):
+            try:
+                return self._process_message_once(message, session_id)
+            except SessionVersionConflict:
+                logger.warning("Session was modified concurrently, retrying", extra={"session_id": session_id})
+        return self._process_message_once(message, session_id)
+
+    def _process_message_once(self, message: str, session_id: str = None) -> Dict[str, Any]:
+        # Create new session if needed (unknown, expired or evicted ids start over)
+        record = self.sessions.load(session_id)
+        if record is None:
             session_id = str(uuid.uuid4())
-            self.sessions[session_id] = {
-                "step": "greeting",
+            version = 0
+            session = {
+                "step": self.start_step,
                 "data": {},
                 "attempts": {},
                 "created_at": datetime.now(),
                 "last_message": ""
             }
-            print(f"Created new session: {session_id}")
+            logger.info("Created new session", extra={"session_id": session_id})
         else:
-            print(f"Using existing session: {session_id}, current step: {self.sessions[session_id]['step']}")
+            session, version = record
+            logger.debug("Using existing session", extra={"session_id": session_id, "step": session["step"]})
 
-        session = self.sessions[session_id]
-        user_input = message.strip().lower()
-        response = ""
         current_step = session["step"]
 
         # Check if session is locked
@@ -43,177 +74,18 @@ class ConversationManager:
                 "completed": False
             }
 
-        # --- Conversation Steps ---
-        if current_step == "greeting":
-            response = "Hi 👋 I can help you check your loan eligibility. Please choose: 1️⃣ Personal Loan 2️⃣ Credit Card Loan"
-            session["step"] = "loan_type_selection"
-
-        elif current_step == "loan_type_selection":
-            if "1" in user_input or "personal" in user_input:
-                session["data"]["loan_type"] = "Personal Loan"
-                response = "Great! Let's start with your PAN card number."
-                session["step"] = "pan_input"
-            elif "2" in user_input or "credit card" in user_input:
-                session["data"]["loan_type"] = "Credit Card Loan"
-                response = "Great! Let's start with your PAN card number."
-                session["step"] = "pan_input"
-            else:
-                response = "Please choose: 1️⃣ Personal Loan 2️⃣ Credit Card Loan"
-
-        elif current_step == "pan_input":
-            pan = message.strip().upper()
-            if self.validate_pan(pan):
-                session["data"]["pan"] = pan
-                session["attempts"]["pan"] = 0
-                response = f"Thanks. I've converted it to uppercase: {pan} ✅ Please enter your full name."
-                session["step"] = "name_input"
-            else:
-                attempts = session["attempts"].get("pan", 0) + 1
-                session["attempts"]["pan"] = attempts
-                if attempts >= self.max_attempts:
-                    session["locked_until"] = datetime.now() + self.lockout_time
-                    response = "Too many failed PAN attempts. Please try again after 30 minutes."
-                    session["step"] = "locked"
-                else:
-                    response = f"Invalid PAN format. Please enter a valid PAN number (e.g., ABCDE1234F). Attempt {attempts}/{self.max_attempts}"
-
-        elif current_step == "name_input":
-            name = message.strip().title()
-            session["data"]["name"] = name
-            session["attempts"]["name"] = 0
-            response = f"Registered name: {name} ✅ Please enter your Date of Birth (DD-MM-YYYY)."
-            session["step"] = "dob_input"
-
-        elif current_step == "dob_input":
-            if self.validate_dob_format(message):
-                session["data"]["date_of_birth"] = message.strip()
-                session["attempts"]["dob"] = 0
-                response = "✅ DOB verified. Enter Aadhaar number (12 digits)."
-                session["step"] = "aadhaar_input"
-            else:
-                attempts = session["attempts"].get("dob", 0) + 1
-                session["attempts"]["dob"] = attempts
-                if attempts >= self.max_attempts:
-                    session["locked_until"] = datetime.now() + self.lockout_time
-                    response = "Too many failed DOB attempts. Please try again after 30 minutes."
-                    session["step"] = "locked"
-                else:
-                    response = f"Invalid date format. Please use DD-MM-YYYY. Attempt {attempts}/{self.max_attempts}"
-
-        elif current_step == "aadhaar_input":
-            aadhaar = re.sub(r'\D', '', message)
-            if len(aadhaar) == 12:
-                session["data"]["aadhaar"] = aadhaar
-                session["attempts"]["aadhaar"] = 0
-                response = "✅ Aadhaar verified. Now, we'll collect financial details. What is your monthly income?"
-                session["step"] = "income_input"
-            else:
-                attempts = session["attempts"].get("aadhaar", 0) + 1
-                session["attempts"]["aadhaar"] = attempts
-                if attempts >= self.max_attempts:
-                    session["locked_until"] = datetime.now() + self.lockout_time
-                    response = "Too many failed Aadhaar attempts. Please try again after 30 minutes."
-                    session["step"] = "locked"
-                else:
-                    response = f"Invalid Aadhaar number. Please enter 12 digits. Attempt {attempts}/{self.max_attempts}"
-
-        elif current_step == "income_input":
-            try:
-                income = float(message)
-                session["data"]["monthly_income"] = income
-                response = "How much are your total existing EMIs per month?"
-                session["step"] = "emis_input"
-            except ValueError:
-                response = "Please enter a valid number for monthly income."
-
-        elif current_step == "emis_input":
-            try:
-                emis = float(message)
-                session["data"]["existing_emis"] = emis
-                response = "What is your latest credit score (CIBIL)?"
-                session["step"] = "credit_score_input"
-            except ValueError:
-                response = "Please enter a valid number for existing EMIs."
-
-        elif current_step == "credit_score_input":
-            try:
-                credit_score = int(message)
-                if 300 <= credit_score <= 900:
-                    session["data"]["credit_score"] = credit_score
-                    response = "Are you Salaried or Self-Employed?"
-                    session["step"] = "employment_type_input"
-                else:
-                    response = "Please enter a valid credit score between 300 and 900."
-            except ValueError:
-                response = "Please enter a valid number for credit score."
-
-        elif current_step == "employment_type_input":
-            if "salaried" in user_input:
-                session["data"]["employment_type"] = "Salaried"
-                response = "How many years have you been employed?"
-                session["step"] = "employment_years_input"
-            elif "self" in user_input:
-                session["data"]["employment_type"] = "Self-Employed"
-                response = "How many years have you been in business?"
-                session["step"] = "employment_years_input"
-            else:
-                response = "Please specify: Salaried or Self-Employed?"
-
-        elif current_step == "employment_years_input":
-            try:
-                years = float(message)
-                session["data"]["years_employed"] = years
-                response = "Please enter your current address."
-                session["step"] = "address_input"
-            except ValueError:
-                response = "Please enter a valid number for years employed."
-
-        elif current_step == "address_input":
-            session["data"]["address"] = message.strip()
-            age = self.calculate_age(session["data"]["date_of_birth"])
-            income = session["data"]["monthly_income"]
-            emis = session["data"]["existing_emis"]
-            credit_score = session["data"]["credit_score"]
-            years_employed = session["data"]["years_employed"]
-
-            eligible = True
-            reasons = []
-
-            if age < 21 or age > 58:
-                eligible = False
-                reasons.append(f"Age {age} is outside acceptable range (21-58)")
-
-            if income < 25000:
-                eligible = False
-                reasons.append(f"Income ₹{income} is below minimum requirement (₹25,000)")
-
-            debt_ratio = emis / income if income > 0 else 1
-            if debt_ratio > 0.5:
-                eligible = False
-                reasons.append(f"Debt-to-income ratio {debt_ratio:.2f} exceeds maximum allowed (0.5)")
-
-            if credit_score < 750:
-                eligible = False
-                reasons.append(f"Credit score {credit_score} is below preferred threshold (750)")
-
-            if years_employed < 1:
-                eligible = False
-                reasons.append(f"Employment duration {years_employed} years is below minimum requirement (1 year)")
-
-            if eligible:
-                response = "✅ You are eligible for a Personal Loan\n\nReasons:\n"
-                response += f"- Age: {age} (within 21-58 range)\n"
-                response += f"- Monthly income: ₹{income} (> ₹25,000)\n"
-                response += f"- Existing EMIs: ₹{emis} ({debt_ratio:.0%} of income, < 50%)\n"
-                response += f"- Credit score: {credit_score} (> 750)\n"
-                response += "\nNext Steps:\n- Upload last 6 months' bank statements\n- Upload latest salary slips\n- Proceed to application form"
-            else:
-                response = "❌ You are not eligible for a Personal Loan\n\nReasons:\n"
-                for reason in reasons:
-                    response += f"- {reason}\n"
-                response += "\nSuggestions to improve eligibility:\n- Improve your credit score\n- Reduce your existing debt\n- Maintain stable employment"
-
-            session["step"] = "completed"
+        # Steps outside the table (completed, expired lockouts) have nothing to say
+        step = self.flow.get(current_step)
+        response = step.handler(step, session, message) if step else ""
+
+        # Automatic steps need no input, so run them now rather than a round trip later
+        step = self.flow.get(session["step"])
+        while step and step.automatic:
+            reply = step.handler(step, session, message)
+            response = f"{response} {reply}" if response and reply else response or reply
+            step = self.flow.get(session["step"])
+
+        self.sessions.save(session_id, session, version)
 
         return {
             "message": response,
@@ -222,24 +94,110 @@ class ConversationManager:
             "completed": session["step"] == "completed"
         }
 
+    def get_session_data(self, session_id: str) -> Dict[str, Any]:
+        record = self.sessions.load(session_id)
+        return record[0]["data"] if record else {}
+
+    def _handle_message(self, step: Step, session: Dict[str, Any], message: str) -> str:
+        session["step"] = step.next
+        return step.reply
+
+    def _handle_choice(self, step: Step, session: Dict[str, Any], message: str) -> str:
+        message_words = words(message)
+        matched = [option for option in step.options if option.matches(message_words)]
+        # A reply naming more than one option ("no, that's not correct") is asked again
+        if len(matched) != 1:
+            return step.invalid
+        option = matched[0]
+        if step.field:
+            session["data"][step.field] = option.value
+        session["step"] = option.next
+        return option.reply
+
+    def _handle_field(self, step: Step, session: Dict[str, Any], message: str) -> str:
+        try:
+            value = step.parser(message)
+        except ValueError:
+            return self._handle_invalid(step, session)
+
+        if (step.minimum is not None and value < step.minimum) or (step.maximum is not None and value > step.maximum):
+            return step.out_of_range
+
+        session["data"][step.field] = value
+        if step.retry:
+            session["attempts"][step.field] = 0
+        session["step"] = step.next
+        return step.reply.format(value=value)
+
+    def _handle_invalid(self, step: Step, session: Dict[str, Any]) -> str:
+        if not step.retry:
+            return step.invalid
+
+        attempts = session["attempts"].get(step.field, 0) + 1
+        session["attempts"][step.field] = attempts
+        if attempts >= step.retry.max_attempts:
+            session["locked_until"] = datetime.now() + step.retry.lockout
+            session["step"] = "locked"
+            return step.retry.lockout_message
+        return step.invalid.format(attempts=attempts, max_attempts=step.retry.max_attempts)
+
+    def _handle_prefill(self, step: Step, session: Dict[str, Any], message: str) -> str:
+        """Take the financial details from the customer's record once their identity matches it exactly.
+
+        Stored data is only used when the name matches the record token for
+        token (ignoring case and punctuation) and the details verify, not on
+        a fuzzy name match. Falls back to asking for them when prefill is
+        off, the identity does not match, or the record lacks any of them.
+        Fields without a label are filled in but not shown in the reply.
+        """
+        data = session["data"]
+        customer = None
+        if self.prefill and data.get("pan"):
+            result = self.customers.verify_customer(data["pan"], data.get("name", ""), data.get("date_of_birth", ""),
+                                                    data.get("aadhaar"))
+            customer = result.get("customer") if result["verified"] else None
+        if customer and name_tokens(data.get("name", "")) != name_tokens(customer["name"]):
+            customer = None
+        if not customer or any(customer.get(field) in (None, "") for field in step.fields):
+            session["step"] = step.fallback
+            return step.fallback_reply
+
+        summary = []
+        for field, label in step.fields.items():
+            data[field] = customer[field]
+            if label:
+                summary.append(f"- {label}: {customer[field]}")
+        session["step"] = step.next
+        return step.reply.format(summary="\n".join(summary))
+
+    def _handle_eligibility(self, step: Step, session: Dict[str, Any], message: str) -> str:
+        session["data"][step.field] = message.strip()
+        return self._handle_decision(step, session, message)
+
+    def _handle_decision(self, step: Step, session: Dict[str, Any], message: str) -> str:
+        decision = get_rule_set(session["data"].get("loan_type")).evaluate(session["data"])
+
+        if decision.eligible:
+            response = f"✅ You are eligible for a {decision.loan_type}\n\nReasons:\n"
+            for outcome in decision.passed:
+                response += f"- {outcome.message}\n"
+            response += "\nNext Steps:\n" + "\n".join(f"- {item}" for item in decision.next_steps)
+        else:
+            response = f"❌ You are not eligible for a {decision.loan_type}\n\nReasons:\n"
+            for reason in decision.reasons:
+                response += f"- {reason}\n"
+            response += "\nSuggestions to improve eligibility:\n" + "\n".join(f"- {item}" for item in IMPROVEMENT_SUGGESTIONS)
+
+        session["data"]["eligible"] = decision.eligible
+        session["data"]["reason_codes"] = decision.reason_codes
+        session["step"] = step.next
+        return response
+
     def validate_pan(self, pan: str) -> bool:
-        pattern = r'^[A-Z]{5}[0-9]{4}[A-Z]{1}$'
-        return re.match(pattern, pan) is not None
+        return validation.is_valid_pan(pan, ignore_case=False)
 
     def validate_dob_format(self, dob: str) -> bool:
-        try:
-            datetime.strptime(dob, '%d-%m-%Y')
-            return True
-        except ValueError:
-            return False
+        return validation.is_valid_date(dob)
 
     def calculate_age(self, dob: str) -> int:
-        try:
-            birth_date = datetime.strptime(dob, '%d-%m-%Y')
-            today = datetime.now()
-            age = today.year - birth_date.year
-            if today.month < birth_date.month or (today.month == birth_date.month and today.day < birth_date.day):
-                age -= 1
-            return age
-        except ValueError:
-            return 0
+        return validation.calculate_age(dob)
\ No newline at end of file
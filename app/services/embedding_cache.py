@@ -0,0 +1,65 @@
+import hashlib
+from array import array
+from typing import Any, Dict, List, Optional
+from app.config.settings import settings
+from app.services.cache import LRUCache, SQLiteCache
+
+class EmbeddingCache:
+    """Two-tier cache of embedding vectors keyed by (model, content hash).
+
+    Vectors are stored as packed float32 both in memory and on disk, which is
+    also the precision FAISS indexes them at. The disk tier survives restarts
+    and is shared by all workers on the host.
+    """
+
+    def __init__(self, max_entries: int = 10000, path: str = None):
+        self.memory = LRUCache(max_entries=max_entries)
+        self.disk = SQLiteCache(path, table="embeddings") if path else None
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls) -> Optional["EmbeddingCache"]:
+        if not settings.EMBEDDING_CACHE_ENABLED:
+            return None
+        return cls(max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES, path=settings.EMBEDDING_CACHE_PATH or None)
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = self.key(model, text)
+        vector = self.memory.get(key)
+        if vector is None and self.disk is not None:
+            blob = self.disk.get(key)
+            if blob is not None:
+                vector = array("f")
+                vector.frombytes(blob)
+                self.memory.set(key, vector)
+        if vector is None:
+            self.misses += 1
+            return None
+        return vector.tolist()
+
+    def set(self, model: str, text: str, embedding: List[float]) -> None:
+        # Failed lookups come back as [] and must never be cached
+        if not embedding:
+            return
+        key = self.key(model, text)
+        vector = array("f", embedding)
+        self.memory.set(key, vector)
+        if self.disk is not None:
+            self.disk.set(key, vector.tobytes())
+
+    def stats(self) -> Dict[str, Any]:
+        memory_hits = self.memory.hits
+        disk_hits = self.disk.hits if self.disk is not None else 0
+        lookups = memory_hits + disk_hits + self.misses
+        return {
+            "memory_hits": memory_hits,
+            "disk_hits": disk_hits,
+            "misses": self.misses,
+            "hit_rate": (memory_hits + disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_evictions": self.memory.evictions
+        }
\ No newline at end of file
@@ -1,8 +1,71 @@
-import requests
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterator, List, Optional
+import httpx
 from app.config.settings import settings
+from app.services.embedding_cache import EmbeddingCache
+from app.services.llm_cache import ResponseCache
+from app.services.resilience import GenAIUnavailableError, ResiliencePolicy
+from app.services.singleflight import AsyncSingleFlight, SingleFlight
+
+# Failures that end a request; callers get {"error": ...}, [] or GenAIStreamError
+REQUEST_ERRORS = (httpx.HTTPError, ValueError, GenAIUnavailableError)
+
+class GenAIStreamError(Exception):
+    """Raised when a streamed completion cannot be started or is cut off"""
+
+class SSEDecoder:
+    """Incremental decoder for server-sent events.
+
+    Feed it one line at a time; it returns the event's data once the blank
+    line terminating the event arrives (multi-line data is joined with
+    newlines, comments and other fields are ignored).
+    """
 
-class TCSGenAIClient:
     def __init__(self):
+        self._data = []
+
+    def feed(self, line: str) -> Optional[str]:
+        line = line.rstrip("\r\n")
+        if not line:
+            if not self._data:
+                return None
+            data = "\n".join(self._data)
+            self._data = []
+            return data
+        if line.startswith(":"):
+            return None
+        field, _, value = line.partition(":")
+        if field == "data":
+            self._data.append(value[1:] if value.startswith(" ") else value)
+        return None
+
+def parse_stream_chunk(data: str) -> str:
+    """Extract the content delta from one streamed chat completion chunk"""
+    chunk = json.loads(data)
+    if "error" in chunk:
+        raise GenAIStreamError(str(chunk["error"]))
+    choices = chunk.get("choices") or [{}]
+    return choices[0].get("delta", {}).get("content") or ""
+
+class TCSGenAIClient:
+    """Client for the OpenAI-compatible GenAI endpoints.
+
+    Calls go through persistent, pooled HTTP connections (keep-alive), so only
+    the first request to the host pays for the TCP+TLS handshake. The ``a*``
+    coroutines are safe to await from async routes; the plain methods are thin
+    synchronous wrappers sharing the same request/response handling.
+
+    Identical completion and embedding requests that are in flight at the
+    same time are coalesced into one upstream call whose result every
+    caller shares. Every request goes through a ResiliencePolicy
+    (concurrency limit, retries, circuit breaker, optional hedging).
+    """
+
+    def __init__(self, max_connections: int = None, max_keepalive_connections: int = None,
+                 timeout: float = None, embedding_cache: EmbeddingCache = None,
+                 response_cache: ResponseCache = None, resilience: ResiliencePolicy = None):
         self.api_key = settings.GENAI_API_KEY
         self.base_url = settings.GENAI_BASE_URL
         self.model = settings.GENAI_MODEL
@@ -11,48 +74,345 @@ class TCSGenAIClient:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
-    
-    def chat_completion(self, messages: list, temperature: float = 0.1) -> dict:
-        url = f"{self.base_url}/v1/chat/completions"
-        
+        self.limits = httpx.Limits(
+            max_connections=max_connections or settings.GENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive_connections or settings.GENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.GENAI_KEEPALIVE_EXPIRY_SECONDS
+        )
+        self.timeout = httpx.Timeout(
+            timeout or settings.GENAI_TIMEOUT_SECONDS,
+            connect=settings.GENAI_CONNECT_TIMEOUT_SECONDS
+        )
+        self.embedding_cache = embedding_cache if embedding_cache is not None else EmbeddingCache.from_settings()
+        self.response_cache = response_cache if response_cache is not None else ResponseCache.from_settings()
+        self.resilience = resilience or ResiliencePolicy.from_settings()
+        self._client = None
+        self._async_client = None
+        self._inflight = SingleFlight()
+        self._ainflight = AsyncSingleFlight()
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(
+                headers=self.headers, verify=self.verify_ssl, limits=self.limits, timeout=self.timeout
+            )
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                headers=self.headers, verify=self.verify_ssl, limits=self.limits, timeout=self.timeout
+            )
+        return self._async_client
+
+    def _chat_payload(self, messages: list, temperature: float, max_tokens: int, stream: bool = False) -> dict:
         payload = {
             "model": self.model,
             "messages": messages,
             "temperature": temperature,
-            "max_tokens": 1000
+            "max_tokens": max_tokens
         }
-        
-        try:
-            response = requests.post(
-                url, 
-                headers=self.headers, 
-                json=payload, 
-                timeout=30, 
-                verify=self.verify_ssl
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"error": str(e)}
-    
-    def get_embeddings(self, text: str) -> list:
-        url = f"{self.base_url}/v1/embeddings"
-        
-        payload = {
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _embeddings_payload(self, text) -> dict:
+        return {
             "model": self.model,
             "input": text
         }
-        
-        try:
-            response = requests.post(
-                url, 
-                headers=self.headers, 
-                json=payload, 
-                timeout=30, 
-                verify=self.verify_ssl
+
+    @staticmethod
+    def _chunk_texts(texts: List[str], batch_size: int, max_chars: int) -> List[List[int]]:
+        """Group positions into chunks bounded by item count and total characters"""
+        chunks, current, current_chars = [], [], 0
+        for position, text in enumerate(texts):
+            if current and (len(current) >= batch_size or current_chars + len(text) > max_chars):
+                chunks.append(current)
+                current, current_chars = [], 0
+            current.append(position)
+            current_chars += len(text)
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def _parse_batch_embeddings(result: dict, expected: int) -> List[list]:
+        # The API may return items out of order; "index" refers to the input position
+        items = sorted(result["data"], key=lambda item: item["index"])
+        if len(items) != expected:
+            raise ValueError(f"Expected {expected} embeddings, got {len(items)}")
+        return [item["embedding"] for item in items]
+
+    def _call_timeout(self, timeout: float = None):
+        return httpx.Timeout(timeout, connect=settings.GENAI_CONNECT_TIMEOUT_SECONDS) if timeout else self.timeout
+
+    def _post(self, path: str, payload: dict, timeout: float = None) -> dict:
+        response = self.resilience.call(
+            lambda: self.client.post(f"{self.base_url}{path}", json=payload, timeout=self._call_timeout(timeout))
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _apost(self, path: str, payload: dict, timeout: float = None) -> dict:
+        response = await self.resilience.acall(
+            lambda: self.async_client.post(f"{self.base_url}{path}", json=payload, timeout=self._call_timeout(timeout))
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _use_response_cache(self, temperature: float, use_cache: bool) -> bool:
+        return use_cache and self.response_cache is not None and self.response_cache.cacheable(temperature)
+
+    def chat_completion(self, messages: list, temperature: float = 0.1, max_tokens: int = 1000,
+                        timeout: float = None, use_cache: bool = False) -> dict:
+        """Return the completion, from the response cache when use_cache is set and allowed"""
+        key = ResponseCache.key(self.model, messages, temperature, max_tokens)
+        use_cache = self._use_response_cache(temperature, use_cache)
+        if use_cache:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+        response = self._inflight.do(
+            ("chat", key), lambda: self._post_chat_completion(messages, temperature, max_tokens, timeout)
+        )
+        if use_cache:
+            self.response_cache.set(key, response)
+        return response
+
+    async def achat_completion(self, messages: list, temperature: float = 0.1, max_tokens: int = 1000,
+                               timeout: float = None, use_cache: bool = False) -> dict:
+        key = ResponseCache.key(self.model, messages, temperature, max_tokens)
+        use_cache = self._use_response_cache(temperature, use_cache)
+        if use_cache:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+        response = await self._ainflight.do(
+            ("chat", key), lambda: self._apost_chat_completion(messages, temperature, max_tokens, timeout)
+        )
+        if use_cache:
+            self.response_cache.set(key, response)
+        return response
+
+    def _post_chat_completion(self, messages: list, temperature: float, max_tokens: int,
+                              timeout: float = None) -> dict:
+        try:
+            return self._post("/v1/chat/completions", self._chat_payload(messages, temperature, max_tokens), timeout)
+        except REQUEST_ERRORS as e:
+            return {"error": str(e)}
+
+    async def _apost_chat_completion(self, messages: list, temperature: float, max_tokens: int,
+                                     timeout: float = None) -> dict:
+        try:
+            return await self._apost(
+                "/v1/chat/completions", self._chat_payload(messages, temperature, max_tokens), timeout
             )
-            response.raise_for_status()
-            result = response.json()
+        except REQUEST_ERRORS as e:
+            return {"error": str(e)}
+
+    def stream_chat_completion(self, messages: list, temperature: float = 0.1, max_tokens: int = 1000,
+                               timeout: float = None) -> Iterator[str]:
+        """Yield content deltas as the server produces them"""
+        decoder = SSEDecoder()
+        try:
+            # Streams hold a slot for their whole duration and are not retried
+            # or hedged, since deltas may already have reached the caller
+            with self.resilience.slot(), self.client.stream(
+                "POST",
+                f"{self.base_url}/v1/chat/completions",
+                json=self._chat_payload(messages, temperature, max_tokens, stream=True),
+                timeout=self._call_timeout(timeout)
+            ) as response:
+                self.resilience.record(response)
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    data = decoder.feed(line)
+                    if data is None:
+                        continue
+                    if data == "[DONE]":
+                        return
+                    content = parse_stream_chunk(data)
+                    if content:
+                        yield content
+                # The server closed the stream without finishing the completion
+                raise GenAIStreamError("Stream ended before [DONE]")
+        except REQUEST_ERRORS as e:
+            raise GenAIStreamError(str(e)) from e
+
+    async def astream_chat_completion(self, messages: list, temperature: float = 0.1, max_tokens: int = 1000,
+                                      timeout: float = None, use_cache: bool = False) -> AsyncIterator[str]:
+        """Async version of stream_chat_completion.
+
+        With use_cache a cached completion is replayed as a single delta, and
+        a stream that finishes cleanly is stored for the next caller.
+        """
+        if not self._use_response_cache(temperature, use_cache):
+            async for content in self._astream_chat_completion(messages, temperature, max_tokens, timeout):
+                yield content
+            return
+        cache_key = ResponseCache.key(self.model, messages, temperature, max_tokens)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            yield cached["choices"][0]["message"]["content"]
+            return
+        parts = []
+        async for content in self._astream_chat_completion(messages, temperature, max_tokens, timeout):
+            parts.append(content)
+            yield content
+        self.response_cache.set(cache_key, {"choices": [{"message": {"role": "assistant", "content": "".join(parts)}}]})
+
+    async def _astream_chat_completion(self, messages: list, temperature: float, max_tokens: int,
+                                       timeout: float = None) -> AsyncIterator[str]:
+        decoder = SSEDecoder()
+        try:
+            async with self.resilience.aslot(), self.async_client.stream(
+                "POST",
+                f"{self.base_url}/v1/chat/completions",
+                json=self._chat_payload(messages, temperature, max_tokens, stream=True),
+                timeout=self._call_timeout(timeout)
+            ) as response:
+                self.resilience.record(response)
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    data = decoder.feed(line)
+                    if data is None:
+                        continue
+                    if data == "[DONE]":
+                        return
+                    content = parse_stream_chunk(data)
+                    if content:
+                        yield content
+                # The server closed the stream without finishing the completion
+                raise GenAIStreamError("Stream ended before [DONE]")
+        except REQUEST_ERRORS as e:
+            raise GenAIStreamError(str(e)) from e
+
+    def get_embeddings(self, text: str, timeout: float = None) -> list:
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get(self.model, text)
+            if cached is not None:
+                return cached
+        return self._inflight.do(("embed", text), lambda: self._fetch_and_cache_embeddings(text, timeout))
+
+    async def aget_embeddings(self, text: str, timeout: float = None) -> list:
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get(self.model, text)
+            if cached is not None:
+                return cached
+        return await self._ainflight.do(("embed", text), lambda: self._afetch_and_cache_embeddings(text, timeout))
+
+    def _fetch_and_cache_embeddings(self, text: str, timeout: float = None) -> list:
+        embedding = self._fetch_embeddings(text, timeout)
+        if self.embedding_cache is not None:
+            self.embedding_cache.set(self.model, text, embedding)
+        return embedding
+
+    async def _afetch_and_cache_embeddings(self, text: str, timeout: float = None) -> list:
+        embedding = await self._afetch_embeddings(text, timeout)
+        if self.embedding_cache is not None:
+            self.embedding_cache.set(self.model, text, embedding)
+        return embedding
+
+    def get_embeddings_batch(self, texts: List[str], batch_size: int = None, max_concurrency: int = None,
+                             timeout: float = None) -> List[list]:
+        """Embed many texts with list-input requests, running chunks in parallel.
+
+        Results are returned in input order. Cached and duplicate texts are
+        not sent; a chunk that fails is retried on its own, and texts whose
+        chunk still fails come back as [] like get_embeddings.
+        """
+        embeddings, pending = self._batch_lookup(texts)
+        chunks = self._chunk_texts(pending, batch_size or settings.EMBEDDING_BATCH_SIZE,
+                                   settings.EMBEDDING_BATCH_MAX_CHARS)
+        workers = max(1, min(max_concurrency or settings.EMBEDDING_BATCH_CONCURRENCY, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            fetched = list(pool.map(
+                lambda chunk: self._coalesced_embeddings_chunk([pending[i] for i in chunk], timeout), chunks
+            ))
+        return self._batch_merge(texts, embeddings, pending, chunks, fetched)
+
+    async def aget_embeddings_batch(self, texts: List[str], batch_size: int = None, max_concurrency: int = None,
+                                    timeout: float = None) -> List[list]:
+        """Async version of get_embeddings_batch"""
+        embeddings, pending = self._batch_lookup(texts)
+        chunks = self._chunk_texts(pending, batch_size or settings.EMBEDDING_BATCH_SIZE,
+                                   settings.EMBEDDING_BATCH_MAX_CHARS)
+        semaphore = asyncio.Semaphore(max_concurrency or settings.EMBEDDING_BATCH_CONCURRENCY)
+
+        async def fetch(chunk):
+            async with semaphore:
+                texts_in_chunk = tuple(pending[i] for i in chunk)
+                return await self._ainflight.do(
+                    ("embed_batch", texts_in_chunk),
+                    lambda: self._afetch_embeddings_chunk(list(texts_in_chunk), timeout)
+                )
+
+        fetched = await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+        return self._batch_merge(texts, embeddings, pending, chunks, fetched)
+
+    def _batch_lookup(self, texts: List[str]):
+        embeddings = {}
+        pending = []
+        for text in dict.fromkeys(texts):
+            cached = self.embedding_cache.get(self.model, text) if self.embedding_cache is not None else None
+            if cached is not None:
+                embeddings[text] = cached
+            else:
+                pending.append(text)
+        return embeddings, pending
+
+    def _batch_merge(self, texts, embeddings, pending, chunks, fetched) -> List[list]:
+        for chunk, vectors in zip(chunks, fetched):
+            for position, vector in zip(chunk, vectors):
+                embeddings[pending[position]] = vector
+                if self.embedding_cache is not None:
+                    self.embedding_cache.set(self.model, pending[position], vector)
+        return [embeddings.get(text, []) for text in texts]
+
+    def _coalesced_embeddings_chunk(self, texts: List[str], timeout: float = None) -> List[list]:
+        return self._inflight.do(("embed_batch", tuple(texts)), lambda: self._fetch_embeddings_chunk(texts, timeout))
+
+    def _fetch_embeddings_chunk(self, texts: List[str], timeout: float = None) -> List[list]:
+        try:
+            result = self._post("/v1/embeddings", self._embeddings_payload(texts), timeout)
+            return self._parse_batch_embeddings(result, len(texts))
+        except REQUEST_ERRORS + (KeyError,):
+            return [[] for _ in texts]
+
+    async def _afetch_embeddings_chunk(self, texts: List[str], timeout: float = None) -> List[list]:
+        try:
+            result = await self._apost("/v1/embeddings", self._embeddings_payload(texts), timeout)
+            return self._parse_batch_embeddings(result, len(texts))
+        except REQUEST_ERRORS + (KeyError,):
+            return [[] for _ in texts]
+
+    def _fetch_embeddings(self, text: str, timeout: float = None) -> list:
+        try:
+            result = self._post("/v1/embeddings", self._embeddings_payload(text), timeout)
+            return result['data'][0]['embedding']
+        except REQUEST_ERRORS:
+            return []
+
+    async def _afetch_embeddings(self, text: str, timeout: float = None) -> list:
+        try:
+            result = await self._apost("/v1/embeddings", self._embeddings_payload(text), timeout)
             return result['data'][0]['embedding']
-        except requests.exceptions.RequestException as e:
-            return []
\ No newline at end of file
+        except REQUEST_ERRORS:
+            return []
+
+    def coalescing_stats(self) -> dict:
+        return {"threads": self._inflight.stats(), "async": self._ainflight.stats()}
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
\ No newline at end of file
@@ -1,73 +1,170 @@
+import bisect
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+import faiss
 from langchain_community.vectorstores import FAISS
 from langchain.schema import Document
+from langchain.schema.embeddings import Embeddings
+from app.config.eligibility_rules import ELIGIBILITY_RULES
+from app.config.settings import settings
+from app.services.cache import LRUCache
 from app.services.genai_client import TCSGenAIClient
+from app.services.rules_engine import describe_general_rules, get_rule_set, normalize_loan_type
+
+# Bump when the on-disk layout changes so old indexes are rebuilt
+INDEX_FORMAT_VERSION = "1"
 
 class LoanEligibilityKnowledgeBase:
-    def __init__(self):
-        self.genai_client = TCSGenAIClient()
+    def __init__(self, genai_client: TCSGenAIClient = None, index_dir: str = None):
+        self.genai_client = genai_client or TCSGenAIClient()
         self.rules = self._load_eligibility_rules()
         self.vectorstore = None
+        self.index_dir = Path(index_dir or settings.KB_INDEX_DIR)
+        self.retrieval_cache = LRUCache(
+            max_entries=settings.RETRIEVAL_CACHE_MAX_ENTRIES,
+            ttl=settings.RETRIEVAL_CACHE_TTL_SECONDS
+        )
+        self._corpus_hash = None
+        self._index_lock = threading.Lock()
     
     def _load_eligibility_rules(self) -> list:
-        rules = [
-            Document(page_content="""
-            Personal Loan Eligibility Criteria:
-            - Age: 21 to 58 years
-            - Minimum Income: ₹25,000 per month
-            - Employment: Minimum 2 years in current job/business
-            - Credit Score: Minimum 750 preferred
-            - Debt-to-Income Ratio: Existing EMIs should not exceed 50% of income
-            - Documents Required: PAN, Aadhaar, Address Proof, Income Proof
-            """),
-            Document(page_content="""
-            Credit Card Eligibility Criteria:
-            - Age: 21 to 60 years
-            - Minimum Income: ₹15,000 per month
-            - Employment: Minimum 1 year in current job
-            - Credit Score: Minimum 700
-            - Documents Required: PAN, Aadhaar, Address Proof
-            """),
-            Document(page_content="""
-            Home Loan Eligibility Criteria:
-            - Age: 21 to 65 years
-            - Minimum Income: ₹30,000 per month
-            - Employment: Minimum 3 years in current job/business
-            - Credit Score: Minimum 750
-            - Property Valuation: Required
-            - Documents Required: PAN, Aadhaar, Address Proof, Income Proof, Property Documents
-            """),
-            Document(page_content="""
-            General Eligibility Rules:
-            - No active defaults or serious delinquencies
-            - Stable employment/income history
-            - Valid KYC documents
-            - Indian residency required
-            """)
-        ]
+        # Rendered from the same rule sets the decisions are made with, so the
+        # text the LLM sees can never disagree with the actual thresholds
+        rules = [Document(page_content=get_rule_set(loan_type).describe()) for loan_type in ELIGIBILITY_RULES]
+        rules.append(Document(page_content=describe_general_rules()))
         return rules
     
     def setup_vectorstore(self):
         texts = [doc.page_content for doc in self.rules]
-        embeddings = [self.genai_client.get_embeddings(text) for text in texts]
+        embedding = TCSGenAIEmbeddings(self.genai_client)
+        embeddings = embedding.embed_documents(texts)
+        
+        failed = sum(1 for vector in embeddings if not vector)
+        if failed:
+            raise RuntimeError(f"Could not embed {failed} of {len(texts)} rule documents")
         
         self.vectorstore = FAISS.from_embeddings(
             list(zip(texts, embeddings)),
-            embedding=TCSGenAIEmbeddings(self.genai_client)
+            embedding=embedding
         )
+        self.retrieval_cache.clear()
+    
+    @property
+    def corpus_hash(self) -> str:
+        """Identifies the index: changes whenever the rule text or embedding model does"""
+        if self._corpus_hash is None:
+            digest = hashlib.sha256(f"{INDEX_FORMAT_VERSION}\0{self.genai_client.model}".encode("utf-8"))
+            for doc in self.rules:
+                digest.update(b"\0" + doc.page_content.encode("utf-8"))
+            self._corpus_hash = digest.hexdigest()[:16]
+        return self._corpus_hash
+    
+    def ensure_index(self):
+        """Load or build the index once, however many callers race to use it first"""
+        if self.vectorstore is None:
+            with self._index_lock:
+                if self.vectorstore is None:
+                    self.load_or_build_index()
+    
+    def load_or_build_index(self):
+        """Load the saved index for the current corpus, building and saving it if there is none"""
+        path = self.index_dir / self.corpus_hash
+        if (path / "index.faiss").exists():
+            self.vectorstore = self._load_index(path)
+            return
+        
+        self.setup_vectorstore()
+        self._save_index(path)
+    
+    def _load_index(self, path: Path) -> FAISS:
+        # Memory-map the vectors instead of reading them into every worker
+        index = faiss.read_index(str(path / "index.faiss"), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        with open(path / "index.pkl", "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        return FAISS(TCSGenAIEmbeddings(self.genai_client), index, docstore, index_to_docstore_id)
+    
+    def _save_index(self, path: Path):
+        # Write to a scratch directory and rename it into place, so concurrent
+        # workers never see a half-written index
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        scratch = tempfile.mkdtemp(dir=self.index_dir)
+        try:
+            self.vectorstore.save_local(scratch)
+            os.rename(scratch, path)
+        except OSError:
+            if not (path / "index.faiss").exists():
+                raise
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
     
     def retrieve_relevant_rules(self, query: str, k: int = 3) -> list:
-        if not self.vectorstore:
-            self.setup_vectorstore()
+        # Cosmetic differences (case, spacing) do not change the result
+        key = (self.corpus_hash, " ".join(query.lower().split()), k)
+        cached = self.retrieval_cache.get(key)
+        if cached is not None:
+            return list(cached)
+        
+        self.ensure_index()
         
         docs = self.vectorstore.similarity_search(query, k=k)
-        return [doc.page_content for doc in docs]
+        rules = [doc.page_content for doc in docs]
+        self.retrieval_cache.set(key, tuple(rules))
+        return rules
+    
+    def retrieve_for_applicant(self, loan_type: str, employment_type: str, monthly_income: float, k: int = 3) -> list:
+        """Retrieve rules for an applicant profile.
+        
+        The query is built from a canonical profile (loan type, employment
+        type, income band) rather than raw values, so applicants who differ
+        only in exact income share one cached retrieval.
+        """
+        query = (
+            f"{normalize_loan_type(loan_type)} eligibility for "
+            f"{normalize_employment_type(employment_type)} applicants with monthly income "
+            f"{income_band(monthly_income)}"
+        )
+        return self.retrieve_relevant_rules(query, k)
+
+def normalize_employment_type(employment_type: str) -> str:
+    lowered = (employment_type or "").lower()
+    if "self" in lowered or "business" in lowered:
+        return "Self-Employed"
+    if "salar" in lowered:
+        return "Salaried"
+    return "Other"
+
+@lru_cache(maxsize=1)
+def _income_thresholds() -> tuple:
+    thresholds = {
+        rule["min"]
+        for spec in ELIGIBILITY_RULES.values()
+        for rule in spec["rules"]
+        if rule["fact"] == "monthly_income" and "min" in rule
+    }
+    return tuple(sorted(thresholds))
+
+def income_band(monthly_income: float) -> str:
+    """Bucket income by the thresholds the rule sets actually use"""
+    thresholds = _income_thresholds()
+    position = bisect.bisect_right(thresholds, monthly_income)
+    if position == 0:
+        return f"below ₹{thresholds[0]:,}"
+    if position == len(thresholds):
+        return f"₹{thresholds[-1]:,} and above"
+    return f"₹{thresholds[position - 1]:,} to ₹{thresholds[position]:,}"
 
-class TCSGenAIEmbeddings:
+class TCSGenAIEmbeddings(Embeddings):
     def __init__(self, genai_client):
         self.genai_client = genai_client
     
     def embed_documents(self, texts):
-        return [self.genai_client.get_embeddings(text) for text in texts]
+        return self.genai_client.get_embeddings_batch(list(texts))
     
     def embed_query(self, text):
         return self.genai_client.get_embeddings(text)
\ No newline at end of file
@@ -0,0 +1,80 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+from app.config.settings import settings
+from app.services.cache import LRUCache, SQLiteCache
+
+class ResponseCache:
+    """Exact-match cache of chat completions with a memory and a disk tier.
+
+    Only near-deterministic requests (temperature <= max_temperature) are
+    cached; the key covers everything that affects the output: model,
+    messages, temperature and max_tokens. Both tiers hold the serialized
+    response, so every get() returns a fresh copy callers may modify.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 86400, path: str = None,
+                 max_temperature: float = 0.2):
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.memory = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.disk = SQLiteCache(path, table="chat_completions") if path else None
+        self.misses = 0
+        self.stores = 0
+
+    @classmethod
+    def from_settings(cls) -> Optional["ResponseCache"]:
+        if not settings.LLM_CACHE_ENABLED:
+            return None
+        return cls(
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl=settings.LLM_CACHE_TTL_SECONDS,
+            path=settings.LLM_CACHE_PATH or None,
+            max_temperature=settings.LLM_CACHE_MAX_TEMPERATURE
+        )
+
+    def cacheable(self, temperature: float) -> bool:
+        return temperature <= self.max_temperature
+
+    @staticmethod
+    def key(model: str, messages: list, temperature: float, max_tokens: int) -> str:
+        canonical = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+            sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.memory.get(key)
+        if raw is None and self.disk is not None:
+            raw = self.disk.get(key)
+            if raw is not None:
+                self.memory.set(key, raw)
+        if raw is None:
+            self.misses += 1
+            return None
+        return json.loads(raw)
+
+    def set(self, key: str, response: Dict[str, Any]) -> None:
+        # Errors are transient and must not be replayed
+        if "error" in response:
+            return
+        raw = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        self.memory.set(key, raw)
+        if self.disk is not None:
+            self.disk.set(key, raw, ttl=self.ttl)
+        self.stores += 1
+
+    def stats(self) -> Dict[str, Any]:
+        memory_hits = self.memory.hits
+        disk_hits = self.disk.hits if self.disk is not None else 0
+        lookups = memory_hits + disk_hits + self.misses
+        return {
+            "memory_hits": memory_hits,
+            "disk_hits": disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": (memory_hits + disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_evictions": self.memory.evictions
+        }
\ No newline at end of file
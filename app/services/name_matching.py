@@ -0,0 +1,91 @@
+import re
+from functools import lru_cache
+from typing import FrozenSet, List, Sequence
+
+# Letters only: punctuation in initials ("R.") and stray digits are dropped
+_NAME_TOKEN = re.compile(r"[^\W\d_]+")
+# Score of an initial against a token starting with that letter
+INITIAL_SCORE = 0.9
+_SOUNDEX_CODES = {
+    char: digit
+    for letters, digit in (("BFPV", "1"), ("CGJKQSXZ", "2"), ("DT", "3"), ("L", "4"), ("MN", "5"), ("R", "6"))
+    for char in letters
+}
+
+def name_tokens(name: str) -> List[str]:
+    """Normalized tokens a name is matched and indexed on"""
+    return _NAME_TOKEN.findall(name.upper())
+
+@lru_cache(maxsize=65536)
+def phonetic_key(token: str) -> str:
+    """American Soundex code of an upper-case token; non-ASCII tokens are their own key"""
+    if not token.isascii():
+        return token
+    digits, previous = [], _SOUNDEX_CODES.get(token[0], "")
+    for char in token[1:]:
+        code = _SOUNDEX_CODES.get(char, "")
+        if code and code != previous:
+            digits.append(code)
+            if len(digits) == 3:
+                break
+        if char not in "HW":
+            previous = code
+    return (token[0] + "".join(digits)).ljust(4, "0")
+
+@lru_cache(maxsize=65536)
+def trigrams(token: str) -> FrozenSet[str]:
+    padded = f"${token}$"
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def trigram_similarity(a: str, b: str) -> float:
+    """Dice coefficient of the padded trigram sets"""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+@lru_cache(maxsize=65536)
+def token_similarity(a: str, b: str) -> float:
+    """Similarity of two name tokens in [0, 1].
+
+    Equal tokens score 1, an initial scores INITIAL_SCORE against a token it
+    abbreviates, and other pairs score their trigram similarity, moved
+    halfway towards 1 when they sound alike (same Soundex code), which is
+    what spelling variants such as Anthony/Antony or Sharma/Sarma share.
+    """
+    if a == b:
+        return 1.0
+    if len(a) == 1 or len(b) == 1:
+        return INITIAL_SCORE if a[0] == b[0] else 0.0
+    score = trigram_similarity(a, b)
+    if phonetic_key(a) == phonetic_key(b):
+        score = (1 + score) / 2
+    return score
+
+def token_set_similarity(a: Sequence[str], b: Sequence[str]) -> float:
+    """Score two tokenized names, ignoring token order.
+
+    Each token of the shorter name is paired with a distinct token of the
+    longer one, best pairs first, and the pair scores are averaged. A name
+    whose tokens all occur in the other scores 1, as with the original
+    subset comparison. At least one pair must match two full tokens:
+    initials alone ("R", "R S") say too little about a name and score 0.
+    """
+    if not a or not b:
+        return 0.0
+    shorter, longer = (a, b) if len(a) <= len(b) else (b, a)
+    pairs = sorted(
+        ((token_similarity(s, l), i, j) for i, s in enumerate(shorter) for j, l in enumerate(longer)),
+        reverse=True
+    )
+    used_short, used_long, total = set(), set(), 0.0
+    full_match = False
+    for score, i, j in pairs:
+        if i in used_short or j in used_long:
+            continue
+        used_short.add(i)
+        used_long.add(j)
+        total += score
+        full_match = full_match or (score > 0 and len(shorter[i]) > 1 and len(longer[j]) > 1)
+    return total / len(shorter) if full_match else 0.0
+
+def name_similarity(a: str, b: str) -> float:
+    return token_set_similarity(name_tokens(a), name_tokens(b))
\ No newline at end of file
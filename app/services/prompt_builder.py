@@ -0,0 +1,145 @@
+import json
+import re
+import string
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from app.config.settings import settings
+
+# Rough BPE stand-in: words split into pieces of up to 4 characters, plus
+# each punctuation mark. Within ~10-15% of cl100k_base on English/JSON text.
+_APPROX_TOKEN = re.compile(r"\w{1,4}|[^\w\s]")
+# Per-message framing tokens added by the chat format
+_MESSAGE_OVERHEAD = 4
+_REPLY_PRIMING = 2
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(settings.PROMPT_TOKENIZER_ENCODING)
+    except Exception:
+        # tiktoken is optional (and may be unable to fetch its tables offline)
+        return None
+
+def count_tokens(text: str) -> int:
+    """Count tokens locally, exactly with tiktoken if installed, otherwise approximately"""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return len(_APPROX_TOKEN.findall(text))
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(count_tokens(message["content"]) + _MESSAGE_OVERHEAD for message in messages) + _REPLY_PRIMING
+
+def compact_json(data: Dict[str, Any]) -> str:
+    """Serialize data for a prompt without whitespace or empty values"""
+    return json.dumps(
+        {key: value for key, value in data.items() if value is not None and value != ""},
+        separators=(",", ":"), ensure_ascii=False, default=str
+    )
+
+def fit_context(items: List[str], budget: int, separator: str = "\n") -> str:
+    """Join items in order (most relevant first) until the token budget is spent.
+
+    Items that do not fit are dropped whole; only a first item larger than
+    the whole budget is cut, so the prompt never loses all its context.
+    """
+    kept, used = [], 0
+    separator_tokens = count_tokens(separator)
+    for item in items:
+        tokens = count_tokens(item) + (separator_tokens if kept else 0)
+        if used + tokens > budget:
+            if not kept:
+                kept.append(_truncate(item, budget))
+            break
+        kept.append(item)
+        used += tokens
+    return separator.join(kept)
+
+def _truncate(text: str, budget: int) -> str:
+    # Shrink proportionally until it fits; converges in a step or two
+    while text and count_tokens(text) > budget:
+        text = text[:max(0, len(text) * budget // count_tokens(text) - 1)]
+    return text
+
+class PromptTemplate:
+    """A str.format prompt template parsed once.
+
+    render() joins the pre-split literal parts with the values instead of
+    re-parsing the template each call; dict values are serialized with
+    compact_json. The token count of the fixed text is computed once, so
+    callers can budget the variable parts.
+    """
+
+    def __init__(self, template: str, system: str = None):
+        self.template = template
+        self.system = system
+        self._parts = []
+        self.fields = []
+        for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+            if format_spec or conversion:
+                raise ValueError(f"Prompt field {field_name!r} may not use a format spec or conversion")
+            self._parts.append((literal, field_name))
+            if field_name is not None:
+                self.fields.append(field_name)
+        fixed_text = "".join(literal for literal, _ in self._parts) + (system or "")
+        self.fixed_tokens = count_tokens(fixed_text)
+
+    def render(self, **values: Any) -> str:
+        missing = set(self.fields) - set(values)
+        if missing:
+            raise KeyError(f"Missing prompt fields: {', '.join(sorted(missing))}")
+        pieces = []
+        for literal, field_name in self._parts:
+            pieces.append(literal)
+            if field_name is not None:
+                value = values[field_name]
+                pieces.append(compact_json(value) if isinstance(value, dict) else str(value))
+        return "".join(pieces)
+
+    def messages(self, **values: Any) -> List[Dict[str, str]]:
+        messages = [{"role": "user", "content": self.render(**values)}]
+        if self.system:
+            messages.insert(0, {"role": "system", "content": self.system})
+        return messages
+
+class UsageTracker:
+    """Per-agent token and latency totals for GenAI calls"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, float]] = {}
+
+    def record(self, agent: str, usage: Dict[str, Any]) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(agent, {
+                "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "latency_ms": 0.0
+            })
+            totals["calls"] += 1
+            totals["prompt_tokens"] += usage["prompt_tokens"]
+            totals["completion_tokens"] += usage["completion_tokens"]
+            totals["latency_ms"] += usage["latency_ms"]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                agent: {
+                    **totals,
+                    "latency_ms": round(totals["latency_ms"], 1),
+                    "avg_prompt_tokens": round(totals["prompt_tokens"] / totals["calls"], 1),
+                    "avg_latency_ms": round(totals["latency_ms"] / totals["calls"], 1)
+                }
+                for agent, totals in self._totals.items()
+            }
+
+def call_usage(messages: List[Dict[str, str]], completion: str, latency_ms: float,
+               reported: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Token usage of one call, preferring the counts the API reported"""
+    reported = reported or {}
+    return {
+        "prompt_tokens": reported.get("prompt_tokens") or count_message_tokens(messages),
+        "completion_tokens": reported.get("completion_tokens") or count_tokens(completion),
+        "latency_ms": round(latency_ms, 1),
+        "estimated": not reported
+    }
\ No newline at end of file
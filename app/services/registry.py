@@ -0,0 +1,63 @@
+import threading
+from typing import Any, Dict
+from app.config.settings import settings
+from app.services.genai_client import TCSGenAIClient
+from app.services.knowledge_base import LoanEligibilityKnowledgeBase
+from app.services.prompt_builder import UsageTracker
+
+class ServiceRegistry:
+    """Owns the process-wide shared services.
+
+    There is exactly one GenAI client (and so one connection pool and one
+    embedding cache) and one knowledge base (and so one vector index) per
+    process, however many agents are created. Services are created lazily
+    on first use, or eagerly by startup().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._genai_client = None
+        self._knowledge_base = None
+        self.usage = UsageTracker()
+
+    @property
+    def genai_client(self) -> TCSGenAIClient:
+        if self._genai_client is None:
+            with self._lock:
+                if self._genai_client is None:
+                    self._genai_client = TCSGenAIClient()
+        return self._genai_client
+
+    @property
+    def knowledge_base(self) -> LoanEligibilityKnowledgeBase:
+        if self._knowledge_base is None:
+            genai_client = self.genai_client
+            with self._lock:
+                if self._knowledge_base is None:
+                    self._knowledge_base = LoanEligibilityKnowledgeBase(genai_client=genai_client)
+        return self._knowledge_base
+
+    def startup(self) -> None:
+        """Create the shared services and load the rule index before serving"""
+        knowledge_base = self.knowledge_base
+        if settings.GENAI_BASE_URL:
+            knowledge_base.ensure_index()
+
+    async def shutdown(self) -> None:
+        if self._genai_client is not None:
+            await self._genai_client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        embedding_cache = self.genai_client.embedding_cache
+        response_cache = self.genai_client.response_cache
+        return {
+            "embeddings": embedding_cache.stats() if embedding_cache is not None else None,
+            "llm_responses": response_cache.stats() if response_cache is not None else None,
+            "coalescing": self.genai_client.coalescing_stats(),
+            "resilience": self.genai_client.resilience.stats(),
+            "retrieval": self.knowledge_base.retrieval_cache.stats(),
+            "token_usage": self.usage.stats()
+        }
+
+# Global instance
+registry = ServiceRegistry()
\ No newline at end of file
@@ -0,0 +1,439 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Awaitable, Callable, Dict
+import httpx
+from app.config.settings import settings
+
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+class GenAIUnavailableError(Exception):
+    """Raised instead of calling the upstream when it cannot take the request"""
+
+class CircuitOpenError(GenAIUnavailableError):
+    """The circuit breaker is open: the upstream failed repeatedly and is being given time to recover"""
+
+class ConcurrencyLimitError(GenAIUnavailableError):
+    """No request slot became free within the queue timeout"""
+
+class SlotPool:
+    """A counting semaphore shared by threads and event loops.
+
+    Waiters of either kind queue in one FIFO; a released slot is handed
+    straight to the oldest waiter, so sync and async callers draw on the
+    same budget and none can starve the other.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._free = size
+        self._lock = threading.Lock()
+        self._waiters = deque()
+
+    @property
+    def in_use(self) -> int:
+        return self.size - self._free
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return True
+            return False
+
+    def acquire(self, timeout: float = None) -> bool:
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return True
+            waiter = _SlotWaiter(event=threading.Event())
+            self._waiters.append(waiter)
+        if waiter.event.wait(timeout):
+            return True
+        return self._abandon(waiter)
+
+    async def aacquire(self, timeout: float = None) -> bool:
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return True
+            loop = asyncio.get_running_loop()
+            waiter = _SlotWaiter(future=loop.create_future(), loop=loop)
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return self._abandon(waiter)
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self.release()
+            raise
+
+    def _abandon(self, waiter: "_SlotWaiter") -> bool:
+        # A slot may have been handed over just as the wait ended; keep it then
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                self._free += 1
+                return
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+        if waiter.event is not None:
+            waiter.event.set()
+        else:
+            waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+class _SlotWaiter:
+    __slots__ = ("event", "future", "loop", "granted")
+
+    def __init__(self, event: threading.Event = None, future: asyncio.Future = None,
+                 loop: asyncio.AbstractEventLoop = None):
+        self.event = event
+        self.future = future
+        self.loop = loop
+        self.granted = False
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After failure_threshold failures in a row the circuit opens and calls
+    fail fast for reset_seconds. Then a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError("GenAI service temporarily unavailable")
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError("GenAI service temporarily unavailable")
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Give up a half-open trial call without an outcome"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected
+        }
+
+class ResiliencePolicy:
+    """Client-side protection for calls to the GenAI upstream.
+
+    - at most max_concurrency requests run at once, sync and async callers
+      together; callers queue for a slot for up to queue_timeout seconds,
+      then get ConcurrencyLimitError
+    - transport errors and RETRYABLE_STATUS_CODES are retried up to
+      max_retries times with full-jitter exponential backoff (Retry-After
+      is honoured, capped at backoff_max)
+    - a CircuitBreaker fails calls fast while the upstream is unhealthy
+    - with hedge_after set, an idempotent request still unanswered after that
+      many seconds is sent a second time and the first response wins; the
+      second request takes a slot of its own and is skipped when none is free
+
+    The request function must return the httpx.Response without raising for
+    its status; the final response is returned as-is for the caller to check.
+    """
+
+    def __init__(self, max_concurrency: int = 16, queue_timeout: float = 10, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 8, failure_threshold: int = 5,
+                 reset_seconds: float = 30, hedge_after: float = None):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+        self._slots = SlotPool(max_concurrency)
+        self._hedge_pool = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedges_skipped = 0
+        self.queue_timeouts = 0
+
+    @classmethod
+    def from_settings(cls) -> "ResiliencePolicy":
+        return cls(
+            max_concurrency=settings.GENAI_MAX_CONCURRENCY,
+            queue_timeout=settings.GENAI_QUEUE_TIMEOUT_SECONDS,
+            max_retries=settings.GENAI_MAX_RETRIES,
+            backoff_base=settings.GENAI_BACKOFF_BASE_SECONDS,
+            backoff_max=settings.GENAI_BACKOFF_MAX_SECONDS,
+            failure_threshold=settings.GENAI_BREAKER_FAILURE_THRESHOLD,
+            reset_seconds=settings.GENAI_BREAKER_RESET_SECONDS,
+            hedge_after=settings.GENAI_HEDGE_AFTER_SECONDS or None
+        )
+
+    def backoff(self, attempt: int, response: httpx.Response = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def is_retryable(response: httpx.Response) -> bool:
+        return response.status_code in RETRYABLE_STATUS_CODES
+
+    def record(self, response: httpx.Response) -> None:
+        # Client errors (bad request, auth) say nothing about upstream health
+        if response.status_code >= 500 or response.status_code in (408, 429):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _track(self, delta: int) -> None:
+        with self._lock:
+            self.in_flight += delta
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _take_hedge_slot(self) -> bool:
+        # Hedging is extra load: only with a spare slot, and never for a half-open trial
+        if self.breaker.state == CircuitBreaker.CLOSED and self._slots.try_acquire():
+            self._count("hedges")
+            self._track(1)
+            return True
+        self._count("hedges_skipped")
+        return False
+
+    def _release_hedge_slot(self) -> None:
+        self._track(-1)
+        self._slots.release()
+
+    # Threaded path
+
+    @contextmanager
+    def slot(self):
+        """Hold one concurrency slot for a call the breaker allows.
+
+        The breaker is asked first, so calls fail fast while it is open
+        instead of queueing for a slot they cannot use. Transport errors
+        escaping the block count as upstream failures; the caller records
+        the outcome of a response it got with record().
+        """
+        self.breaker.before_call()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self.breaker.release_trial()
+            self._count("queue_timeouts")
+            raise ConcurrencyLimitError("Too many concurrent GenAI requests")
+        try:
+            self._track(1)
+            try:
+                yield
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                self.breaker.release_trial()
+                raise
+            finally:
+                self._track(-1)
+        finally:
+            self._slots.release()
+
+    def call(self, request: Callable[[], httpx.Response], idempotent: bool = True) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                with self.slot():
+                    if idempotent and self.hedge_after:
+                        response = self._hedged(request)
+                    else:
+                        response = request()
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+                self._count("retries")
+                time.sleep(self.backoff(attempt))
+                continue
+            self.record(response)
+            if last_attempt or not self.is_retryable(response):
+                return response
+            response.close()
+            self._count("retries")
+            time.sleep(self.backoff(attempt, response))
+
+    def _hedged(self, request: Callable[[], httpx.Response]) -> httpx.Response:
+        if self._hedge_pool is None:
+            with self._lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(max_workers=self.max_concurrency * 2)
+        first = self._hedge_pool.submit(request)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done or not self._take_hedge_slot():
+            return first.result()
+        second = self._hedge_pool.submit(request)
+        try:
+            done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+            winner = done.pop()
+            if winner.exception() is not None:
+                other = second if winner is first else first
+                return other.result()
+            return winner.result()
+        finally:
+            # The losing request cannot be stopped; its slot stays taken until it ends
+            running = [future for future in (first, second) if not future.done()]
+            if running:
+                running[0].add_done_callback(lambda _: self._release_hedge_slot())
+            else:
+                self._release_hedge_slot()
+
+    # Async path
+
+    @asynccontextmanager
+    async def aslot(self):
+        """Async version of slot, drawing on the same slots"""
+        self.breaker.before_call()
+        try:
+            acquired = await self._slots.aacquire(timeout=self.queue_timeout)
+        except BaseException:
+            self.breaker.release_trial()
+            raise
+        if not acquired:
+            self.breaker.release_trial()
+            self._count("queue_timeouts")
+            raise ConcurrencyLimitError("Too many concurrent GenAI requests")
+        try:
+            self._track(1)
+            try:
+                yield
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                self.breaker.release_trial()
+                raise
+            finally:
+                self._track(-1)
+        finally:
+            self._slots.release()
+
+    async def acall(self, request: Callable[[], Awaitable[httpx.Response]],
+                    idempotent: bool = True) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                async with self.aslot():
+                    if idempotent and self.hedge_after:
+                        response = await self._ahedged(request)
+                    else:
+                        response = await request()
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+                self._count("retries")
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            self.record(response)
+            if last_attempt or not self.is_retryable(response):
+                return response
+            await response.aclose()
+            self._count("retries")
+            await asyncio.sleep(self.backoff(attempt, response))
+
+    async def _ahedged(self, request: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        first = asyncio.ensure_future(request())
+        done, _ = await asyncio.wait([first], timeout=self.hedge_after)
+        if done or not self._take_hedge_slot():
+            return await first
+
+        async def hedge() -> httpx.Response:
+            try:
+                return await request()
+            finally:
+                self._release_hedge_slot()
+
+        second = asyncio.ensure_future(hedge())
+        pending = {first, second}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            return first.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.stats(),
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedges_skipped": self.hedges_skipped,
+            "queue_timeouts": self.queue_timeouts
+        }
\ No newline at end of file
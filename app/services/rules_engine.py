@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from app.config.eligibility_rules import (
+    DEFAULT_LOAN_TYPE, ELIGIBILITY_RULES, GENERAL_ELIGIBILITY_RULES, LOAN_TYPE_ALIASES, RULE_TEXT
+)
+from app.services.validation import calculate_age
+
+def applicant_facts(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Derive the facts rules are written against from raw applicant data"""
+    income = data["monthly_income"]
+    emis = data["existing_emis"]
+    return {
+        "age": calculate_age(data["date_of_birth"]),
+        "monthly_income": income,
+        "existing_emis": emis,
+        "debt_ratio": emis / income if income > 0 else 1,
+        "credit_score": data["credit_score"],
+        "years_employed": data["years_employed"],
+    }
+
+@dataclass(frozen=True)
+class RuleOutcome:
+    code: str
+    passed: bool
+    message: str
+
+@dataclass
+class EligibilityDecision:
+    loan_type: str
+    eligible: bool
+    failed: List[RuleOutcome]
+    passed: List[RuleOutcome]
+    next_steps: List[str]
+
+    @property
+    def reasons(self) -> List[str]:
+        return [outcome.message for outcome in self.failed]
+
+    @property
+    def reason_codes(self) -> List[str]:
+        return [outcome.code for outcome in self.failed]
+
+@dataclass(frozen=True)
+class CompiledRule:
+    code: str
+    fact: str
+    minimum: Optional[float]
+    maximum: Optional[float]
+    check: Callable[[Any], bool]
+
+    def describe(self, kind: str, value: Any = None) -> str:
+        return RULE_TEXT[self.code][kind].format(value=value, min=self.minimum, max=self.maximum)
+
+def _compile_check(minimum: Optional[float], maximum: Optional[float]) -> Callable[[Any], bool]:
+    if minimum is not None and maximum is not None:
+        return lambda value: minimum <= value <= maximum
+    if minimum is not None:
+        return lambda value: value >= minimum
+    if maximum is not None:
+        return lambda value: value <= maximum
+    return lambda value: True
+
+class CompiledRuleSet:
+    def __init__(self, loan_type: str, spec: Dict[str, Any]):
+        self.loan_type = loan_type
+        self.title = spec["title"]
+        self.documents = spec.get("documents", [])
+        self.notes = spec.get("notes", [])
+        self.next_steps = spec.get("next_steps", [])
+        self.rules: Tuple[CompiledRule, ...] = tuple(
+            CompiledRule(
+                code=rule["code"],
+                fact=rule["fact"],
+                minimum=rule.get("min"),
+                maximum=rule.get("max"),
+                check=_compile_check(rule.get("min"), rule.get("max"))
+            )
+            for rule in spec["rules"]
+        )
+
+    def evaluate(self, data: Dict[str, Any]) -> EligibilityDecision:
+        facts = applicant_facts(data)
+        failed, passed = [], []
+        for rule in self.rules:
+            value = facts[rule.fact]
+            if rule.check(value):
+                passed.append(RuleOutcome(rule.code, True, rule.describe("pass", value)))
+            else:
+                failed.append(RuleOutcome(rule.code, False, rule.describe("fail", value)))
+        return EligibilityDecision(
+            loan_type=self.loan_type,
+            eligible=not failed,
+            failed=failed,
+            passed=passed,
+            next_steps=list(self.next_steps)
+        )
+
+    def evaluate_columns(self, facts: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        """Evaluate every rule over NumPy fact arrays, returning (code, failed mask) pairs"""
+        outcomes = []
+        for rule in self.rules:
+            values = facts[rule.fact]
+            failed = values != values  # NaN never satisfies a rule
+            if rule.minimum is not None:
+                failed = failed | (values < rule.minimum)
+            if rule.maximum is not None:
+                failed = failed | (values > rule.maximum)
+            outcomes.append((rule.code, failed))
+        return outcomes
+
+    def describe(self) -> str:
+        """Render the rule set as knowledge-base text"""
+        lines = [f"{self.title}:"]
+        lines += [f"- {rule.describe('describe')}" for rule in self.rules]
+        lines += [f"- {note}" for note in self.notes]
+        if self.documents:
+            lines.append(f"- Documents Required: {', '.join(self.documents)}")
+        return "\n".join(lines)
+
+def normalize_loan_type(loan_type: Optional[str]) -> str:
+    if not loan_type:
+        return DEFAULT_LOAN_TYPE
+    if loan_type in ELIGIBILITY_RULES:
+        return loan_type
+    lowered = loan_type.strip().lower()
+    for alias, canonical in LOAN_TYPE_ALIASES.items():
+        if lowered.startswith(alias):
+            return canonical
+    raise ValueError(f"Unknown loan type: {loan_type}")
+
+@lru_cache(maxsize=None)
+def _compiled_rule_set(loan_type: str) -> CompiledRuleSet:
+    return CompiledRuleSet(loan_type, ELIGIBILITY_RULES[loan_type])
+
+def get_rule_set(loan_type: Optional[str] = None) -> CompiledRuleSet:
+    """Return the compiled (and cached) rule set for a loan product"""
+    return _compiled_rule_set(normalize_loan_type(loan_type))
+
+def all_reason_codes() -> List[str]:
+    return list(RULE_TEXT)
+
+def describe_general_rules() -> str:
+    return "\n".join(["General Eligibility Rules:"] + [f"- {rule}" for rule in GENERAL_ELIGIBILITY_RULES])
\ No newline at end of file
@@ -1,17 +1,11 @@
-import hashlib
-import re
-from datetime import datetime
+from app.services.anonymizer import anonymize
+from app.services import validation
 
 class DataSecurity:
     @staticmethod
-    def anonymize_pii(text: str) -> str:
-        pan_pattern = r'[A-Z]{5}[0-9]{4}[A-Z]{1}'
-        aadhaar_pattern = r'\d{4}\s?\d{4}\s?\d{4}'
-        
-        text = re.sub(pan_pattern, lambda m: hashlib.sha256(m.group().encode()).hexdigest()[:10], text)
-        text = re.sub(aadhaar_pattern, lambda m: hashlib.sha256(m.group().encode()).hexdigest()[:12], text)
-        
-        return text
+    def anonymize_pii(text: str, ignore_case: bool = False) -> str:
+        # Single pass over both patterns; see app.services.anonymizer for streams and files
+        return anonymize(text, ignore_case)
     
     @staticmethod
     def is_financial_query(query: str) -> bool:
@@ -21,19 +15,12 @@ class DataSecurity:
     
     @staticmethod
     def validate_pan_format(pan: str) -> bool:
-        pattern = r'^[A-Z]{5}[0-9]{4}[A-Z]{1}$'
-        return re.match(pattern, pan.upper()) is not None
+        return validation.is_valid_pan(pan)
     
     @staticmethod
     def validate_aadhaar_format(aadhaar: str) -> bool:
-        # Remove any spaces or hyphens
-        aadhaar_clean = re.sub(r'[\s-]', '', aadhaar)
-        return len(aadhaar_clean) == 12 and aadhaar_clean.isdigit()
+        return validation.is_valid_aadhaar(aadhaar)
     
     @staticmethod
     def validate_date_format(date_str: str) -> bool:
-        try:
-            datetime.strptime(date_str, '%d-%m-%Y')
-            return True
-        except ValueError:
-            return False
\ No newline at end of file
+        return validation.is_valid_date(date_str)
\ No newline at end of file
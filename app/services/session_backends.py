@@ -0,0 +1,287 @@
+import asyncio
+import copy
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from app.config.settings import settings
+from app.services.session_store import SessionStore
+
+class SessionVersionConflict(Exception):
+    """Raised when a session was modified by another worker since it was loaded"""
+
+def serialize_session(session: Dict[str, Any]) -> str:
+    def encode(value):
+        if isinstance(value, datetime):
+            return {"__datetime__": value.isoformat()}
+        raise TypeError(f"Cannot serialize {type(value).__name__} in session")
+    return json.dumps(session, default=encode, separators=(",", ":"))
+
+def deserialize_session(raw) -> Dict[str, Any]:
+    def decode(obj):
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        return obj
+    return json.loads(raw, object_hook=decode)
+
+def session_ttl(session: Dict[str, Any], idle_ttl: float, completed_ttl: float) -> float:
+    """Seconds a freshly saved session should be kept for"""
+    if session.get("step") == "locked" and session.get("locked_until"):
+        return max((session["locked_until"] - datetime.now()).total_seconds(), 1)
+    if session.get("step") == "completed":
+        return completed_ttl
+    return idle_ttl
+
+class SessionBackend(ABC):
+    """Storage for conversation sessions with optimistic versioning.
+
+    ``load`` returns the session together with its version. ``save`` must be
+    given the version that was loaded (0 for a new session) and raises
+    SessionVersionConflict if somebody else saved the session in the meantime.
+    """
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        pass
+
+    @abstractmethod
+    def save(self, session_id: str, session: Dict[str, Any], version: int) -> int:
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    def sweep(self) -> int:
+        return 0
+
+    async def run_sweeper(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.sweep)
+
+class InMemorySessionBackend(SessionBackend):
+    """Process-local backend; only suitable for a single worker"""
+
+    def __init__(self, idle_ttl: float, completed_ttl: float, max_sessions: int):
+        self.store = SessionStore(idle_ttl=idle_ttl, completed_ttl=completed_ttl, max_sessions=max_sessions)
+        self._lock = threading.Lock()
+        self._conflicts = 0
+
+    def load(self, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        record = self.store.get(session_id)
+        if record is None:
+            return None
+        session = copy.deepcopy(record)
+        return session, session.pop("_version")
+
+    def save(self, session_id: str, session: Dict[str, Any], version: int) -> int:
+        with self._lock:
+            current = self.store.get(session_id)
+            current_version = current["_version"] if current is not None else 0
+            if current_version != version:
+                self._conflicts += 1
+                raise SessionVersionConflict(session_id)
+            record = copy.deepcopy(session)
+            record["_version"] = version + 1
+            self.store.put(session_id, record)
+            return version + 1
+
+    def delete(self, session_id: str) -> None:
+        self.store.delete(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "conflicts": self._conflicts, **self.store.stats()}
+
+    def sweep(self) -> int:
+        return self.store.sweep()
+
+    async def run_sweeper(self, interval: float) -> None:
+        await self.store.run_sweeper(interval)
+
+class SQLiteSessionBackend(SessionBackend):
+    """Shared-file backend for several workers on one host (WAL mode)"""
+
+    def __init__(self, path: str, idle_ttl: float, completed_ttl: float, max_sessions: int):
+        self.path = path
+        self.idle_ttl = idle_ttl
+        self.completed_ttl = completed_ttl
+        self.max_sessions = max_sessions
+        self._local = threading.local()
+        self._expired = 0
+        self._evicted = 0
+        self._conflicts = 0
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        if not session_id:
+            return None
+        row = self._connection().execute(
+            "SELECT data, version FROM sessions WHERE session_id = ? AND expires_at > ?",
+            (session_id, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return deserialize_session(row[0]), row[1]
+
+    def save(self, session_id: str, session: Dict[str, Any], version: int) -> int:
+        now = time.time()
+        expires_at = now + session_ttl(session, self.idle_ttl, self.completed_ttl)
+        data = serialize_session(session)
+        conn = self._connection()
+        if version == 0:
+            # A stale expired row with the same id may be replaced
+            cursor = conn.execute(
+                """INSERT INTO sessions (session_id, data, version, expires_at, updated_at)
+                   VALUES (?, ?, 1, ?, ?)
+                   ON CONFLICT (session_id) DO UPDATE SET
+                       data = excluded.data, version = 1,
+                       expires_at = excluded.expires_at, updated_at = excluded.updated_at
+                   WHERE sessions.expires_at <= ?""",
+                (session_id, data, expires_at, now, now)
+            )
+        else:
+            cursor = conn.execute(
+                """UPDATE sessions SET data = ?, version = version + 1, expires_at = ?, updated_at = ?
+                   WHERE session_id = ? AND version = ?""",
+                (data, expires_at, now, session_id, version)
+            )
+        if cursor.rowcount == 0:
+            self._conflicts += 1
+            raise SessionVersionConflict(session_id)
+        return version + 1
+
+    def delete(self, session_id: str) -> None:
+        self._connection().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def sweep(self) -> int:
+        conn = self._connection()
+        expired = conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+        evicted = conn.execute(
+            """DELETE FROM sessions WHERE session_id IN (
+                   SELECT session_id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+               )""",
+            (self.max_sessions,)
+        ).rowcount
+        self._expired += expired
+        self._evicted += evicted
+        return expired + evicted
+
+    def stats(self) -> Dict[str, Any]:
+        live = self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "live": live,
+            "expired": self._expired,
+            "evicted": self._evicted,
+            "conflicts": self._conflicts,
+            "max_sessions": self.max_sessions
+        }
+
+# Compare-and-set: only write if the stored version is the one the caller loaded
+_REDIS_SAVE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'version')
+if (current or '0') ~= ARGV[1] then
+    return -1
+end
+local version = tonumber(ARGV[1]) + 1
+redis.call('HSET', KEYS[1], 'data', ARGV[2], 'version', version)
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return version
+"""
+
+class RedisSessionBackend(SessionBackend):
+    """Backend for any server speaking the Redis protocol; expiry is left to the server"""
+
+    def __init__(self, url: str, idle_ttl: float, completed_ttl: float, key_prefix: str = "session:",
+                 client=None):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.idle_ttl = idle_ttl
+        self.completed_ttl = completed_ttl
+        self.key_prefix = key_prefix
+        self._save_script = self.client.register_script(_REDIS_SAVE_SCRIPT)
+        self._conflicts = 0
+
+    def load(self, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        if not session_id:
+            return None
+        data, version = self.client.hmget(self.key_prefix + session_id, "data", "version")
+        if data is None:
+            return None
+        return deserialize_session(data), int(version)
+
+    def save(self, session_id: str, session: Dict[str, Any], version: int) -> int:
+        ttl_ms = int(session_ttl(session, self.idle_ttl, self.completed_ttl) * 1000)
+        new_version = self._save_script(
+            keys=[self.key_prefix + session_id],
+            args=[str(version), serialize_session(session), ttl_ms]
+        )
+        if new_version == -1:
+            self._conflicts += 1
+            raise SessionVersionConflict(session_id)
+        return new_version
+
+    def delete(self, session_id: str) -> None:
+        self.client.delete(self.key_prefix + session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "conflicts": self._conflicts}
+
+    async def run_sweeper(self, interval: float) -> None:
+        # Keys carry their own TTL, nothing to sweep
+        return None
+
+def create_session_backend() -> SessionBackend:
+    backend = settings.SESSION_BACKEND.lower()
+    if backend == "memory":
+        return InMemorySessionBackend(
+            idle_ttl=settings.SESSION_IDLE_TTL_SECONDS,
+            completed_ttl=settings.SESSION_COMPLETED_TTL_SECONDS,
+            max_sessions=settings.SESSION_MAX_SESSIONS
+        )
+    if backend == "sqlite":
+        return SQLiteSessionBackend(
+            path=settings.SESSION_SQLITE_PATH,
+            idle_ttl=settings.SESSION_IDLE_TTL_SECONDS,
+            completed_ttl=settings.SESSION_COMPLETED_TTL_SECONDS,
+            max_sessions=settings.SESSION_MAX_SESSIONS
+        )
+    if backend == "redis":
+        return RedisSessionBackend(
+            url=settings.SESSION_REDIS_URL,
+            idle_ttl=settings.SESSION_IDLE_TTL_SECONDS,
+            completed_ttl=settings.SESSION_COMPLETED_TTL_SECONDS
+        )
+    raise ValueError(f"Unknown session backend: {settings.SESSION_BACKEND}")
\ No newline at end of file
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+class SessionStore:
+    """Bounded in-memory session store with idle-TTL expiry and LRU eviction.
+
+    Sessions are kept in least-recently-used order. Active sessions expire after
+    ``idle_ttl`` seconds without a message, completed sessions after the shorter
+    ``completed_ttl``, and locked sessions once their lockout has elapsed.
+    """
+
+    def __init__(self, idle_ttl: float = 1800, completed_ttl: float = 300,
+                 max_sessions: int = 10000, sweep_batch_size: int = 500):
+        self.idle_ttl = idle_ttl
+        self.completed_ttl = completed_ttl
+        self.max_sessions = max_sessions
+        self.sweep_batch_size = sweep_batch_size
+        self._sessions = OrderedDict()
+        self._touched = {}
+        self._lock = threading.RLock()
+        self._expired = 0
+        self._evicted = 0
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return a live session and mark it as recently used"""
+        if not session_id:
+            return None
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            now = time.monotonic()
+            if self._is_expired(session, self._touched[session_id], now):
+                self._remove(session_id)
+                self._expired += 1
+                return None
+            self._sessions.move_to_end(session_id)
+            self._touched[session_id] = now
+            return session
+
+    def put(self, session_id: str, session: Dict[str, Any]) -> None:
+        """Insert or replace a session, evicting the least recently used on overflow"""
+        with self._lock:
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            self._touched[session_id] = time.monotonic()
+            while len(self._sessions) > self.max_sessions:
+                oldest_id = next(iter(self._sessions))
+                self._remove(oldest_id)
+                self._evicted += 1
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+
+    def sweep(self) -> int:
+        """Remove every expired session in one go and return how many were removed"""
+        removed = 0
+        for batch in self._batches():
+            removed += self._sweep_batch(batch)
+        return removed
+
+    async def sweep_async(self) -> int:
+        """Like sweep(), but yields to the event loop between batches"""
+        removed = 0
+        for batch in self._batches():
+            removed += self._sweep_batch(batch)
+            await asyncio.sleep(0)
+        return removed
+
+    async def run_sweeper(self, interval: float) -> None:
+        """Periodically sweep expired sessions until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            await self.sweep_async()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "live": len(self._sessions),
+                "expired": self._expired,
+                "evicted": self._evicted,
+                "max_sessions": self.max_sessions
+            }
+
+    def _batches(self):
+        with self._lock:
+            session_ids = list(self._sessions)
+        for start in range(0, len(session_ids), self.sweep_batch_size):
+            yield session_ids[start:start + self.sweep_batch_size]
+
+    def _sweep_batch(self, session_ids: list) -> int:
+        removed = 0
+        now = time.monotonic()
+        with self._lock:
+            for session_id in session_ids:
+                session = self._sessions.get(session_id)
+                if session is not None and self._is_expired(session, self._touched[session_id], now):
+                    self._remove(session_id)
+                    removed += 1
+            self._expired += removed
+        return removed
+
+    def _is_expired(self, session: Dict[str, Any], touched: float, now: float) -> bool:
+        if session.get("step") == "locked":
+            # Keep locked sessions for the whole lockout so it cannot be sidestepped
+            locked_until = session.get("locked_until")
+            return locked_until is None or datetime.now() >= locked_until
+        if session.get("step") == "completed":
+            return now - touched > self.completed_ttl
+        return now - touched > self.idle_ttl
+
+    def _remove(self, session_id: str) -> None:
+        del self._sessions[session_id]
+        del self._touched[session_id]
\ No newline at end of file
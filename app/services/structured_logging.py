@@ -0,0 +1,149 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from app.config.settings import settings
+from app.services.security import DataSecurity
+
+# Attributes every LogRecord has; anything else was passed through extra= and is a field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and any extra= fields.
+
+    With redact set, PAN and Aadhaar numbers in the message, string fields
+    and tracebacks are replaced through DataSecurity.anonymize_pii, matching
+    PANs in any case since raw user input is logged as typed.
+    """
+
+    def __init__(self, redact: bool = True):
+        super().__init__()
+        self.redact = redact
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": self._clean(record.getMessage()),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = self._clean(value) if isinstance(value, str) else value
+        if record.exc_info:
+            entry["exception"] = self._clean(self.formatException(record.exc_info))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+    def _clean(self, text: str) -> str:
+        return DataSecurity.anonymize_pii(text, ignore_case=True) if self.redact else text
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of the records below WARNING, per logger.
+
+    rates maps logger names to the fraction kept; a logger without an entry
+    uses its nearest configured ancestor's rate (all records when none).
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self._resolved.get(record.name)
+        if rate is None:
+            rate = self._resolved[record.name] = self._rate_for(record.name)
+        return rate >= 1 or random.random() < rate
+
+    def _rate_for(self, name: str) -> float:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread without waiting on it.
+
+    Only the message arguments are merged here (in place: the "app" loggers
+    have no other handler); formatting, redaction and I/O all happen on the
+    listener thread. Records arriving while max_size are already waiting
+    are dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, max_size: int):
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+        else:
+            self.queue.put_nowait(record)
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse "logger=rate,logger=rate" into a dict"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+
+def configure_logging(level: str = None, sample_rates: str = None, queue_size: int = None,
+                      redact: bool = None, stream=None) -> None:
+    """Route the "app" loggers through a queue to a JSON writer on a background thread.
+
+    Safe to call more than once; only the first call takes effect. The
+    listener is flushed and stopped at interpreter exit.
+    """
+    global _listener, _handler
+    with _lock:
+        if _listener is not None:
+            return
+        output = logging.StreamHandler(stream)
+        output.setFormatter(JsonFormatter(settings.LOG_REDACT_PII if redact is None else redact))
+        log_queue = queue.SimpleQueue()
+        _handler = NonBlockingQueueHandler(log_queue, settings.LOG_QUEUE_SIZE if queue_size is None else queue_size)
+        _handler.addFilter(SamplingFilter(parse_sample_rates(
+            settings.LOG_SAMPLE_RATES if sample_rates is None else sample_rates
+        )))
+        logger = logging.getLogger("app")
+        logger.setLevel((level or settings.LOG_LEVEL).upper())
+        logger.addHandler(_handler)
+        logger.propagate = False
+        _listener = QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Write out the queued records and stop the listener thread"""
+    global _listener, _handler
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        logging.getLogger("app").removeHandler(_handler)
+        _listener = _handler = None
+
+def logging_stats() -> Dict[str, int]:
+    with _lock:
+        if _handler is None:
+            return {"queued": 0, "dropped": 0}
+        return {"queued": _handler.queue.qsize(), "dropped": _handler.dropped}
\ No newline at end of file
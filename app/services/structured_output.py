@@ -0,0 +1,177 @@
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_CLOSERS = {"{": "}", "[": "]"}
+
+class StructuredOutputError(ValueError):
+    """Raised when model output cannot be turned into a JSON object, even after repair"""
+
+class IncrementalJSONParser:
+    """Parse a JSON object as it streams in, reporting top-level fields as they complete.
+
+    feed() takes arbitrary chunks of text and returns the (key, value) pairs
+    whose values finished in that chunk, so a field generated first (such as
+    the decision) is available long before the object closes. Text before
+    the opening brace (code fences, chatter) is skipped. close() returns the
+    whole object, repairing truncated or slightly malformed output.
+    """
+
+    def __init__(self, max_repairs: int = 3):
+        self.max_repairs = max_repairs
+        self.fields: Dict[str, Any] = {}
+        self._text = []
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._key = None
+        self._key_start = None
+        self._expect_key = True
+        self._value_start = None
+        self._scalar = None
+        self._offset = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        completed = []
+        for char in chunk:
+            if not self._started:
+                if char != "{":
+                    continue
+                self._started = True
+                self._text.append(char)
+                self._offset = 1
+                self._depth = 1
+                continue
+            self._text.append(char)
+            position = self._offset
+            self._offset += 1
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._value_start is not None:
+                        self._finish_value(position + 1, completed)
+                continue
+            if self._depth == 1 and self._value_start is not None:
+                if self._scalar is None and not char.isspace():
+                    self._scalar = char not in '"{['
+                elif self._scalar and (char in ",}" or char.isspace()):
+                    self._finish_value(position, completed)
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._value_start = None
+                    self._key_start = position
+            elif char == ":" and self._depth == 1 and self._key_start is not None:
+                self._key = json.loads("".join(self._text[self._key_start:position]))
+                self._key_start = None
+                self._expect_key = False
+                self._value_start = position + 1
+                self._scalar = None
+            elif char == "," and self._depth == 1:
+                self._expect_key = True
+                self._value_start = None
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    self._finish_value(position + 1, completed)
+        return completed
+
+    def _finish_value(self, end: int, completed: list) -> None:
+        raw = "".join(self._text[self._value_start:end]).strip()
+        self._value_start = None
+        if not raw:
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        self.fields[self._key] = value
+        completed.append((self._key, value))
+
+    @property
+    def text(self) -> str:
+        return "".join(self._text)
+
+    def close(self) -> Dict[str, Any]:
+        if not self._started:
+            raise StructuredOutputError("No JSON object in model output")
+        return parse_json_object(self.text, self.max_repairs)
+
+def parse_json_object(text: str, max_repairs: int = 3) -> Dict[str, Any]:
+    """Parse a JSON object from model output, applying at most max_repairs fixes.
+
+    Repairs, in order: strip code fences and surrounding text, drop trailing
+    commas, and close a truncated object (open string, dangling key or
+    comma, unclosed brackets).
+    """
+    candidates = [text]
+    repairs = [
+        lambda t: _extract_object(_FENCE.sub("", t)),
+        lambda t: _TRAILING_COMMA.sub(r"\1", t),
+        _close_truncated
+    ]
+    for repair in repairs[:max_repairs]:
+        candidates.append(repair(candidates[-1]))
+    for candidate in candidates:
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value
+    raise StructuredOutputError("Model output is not a valid JSON object")
+
+def _extract_object(text: str) -> str:
+    start = text.find("{")
+    if start == -1:
+        return text
+    end = text.rfind("}")
+    # A missing closing brace is left for _close_truncated
+    if end > start and not _scan(text[start:end + 1])[0]:
+        return text[start:end + 1]
+    return text[start:]
+
+def _scan(text: str) -> Tuple[list, bool, int]:
+    """Return the open brackets, whether a string is open, and where the last string started"""
+    stack, in_string, escaped, string_start = [], False, False, -1
+    for position, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+            string_start = position
+        elif char in "{[":
+            stack.append(char)
+        elif char in "}]" and stack:
+            stack.pop()
+    return stack, in_string, string_start
+
+def _close_truncated(text: str) -> str:
+    stack, in_string, string_start = _scan(text)
+    if not stack and not in_string:
+        return text
+    if in_string:
+        text += '"'
+    text = text.rstrip()
+    if text.endswith(":"):
+        text = text[:-1].rstrip()
+        string_start = text.rfind('"', 0, len(text) - 1)
+    if stack and stack[-1] == "{" and text.endswith('"') and text[:string_start].rstrip().endswith(("{", ",")):
+        # Drop a key whose value never arrived
+        text = text[:string_start]
+    text = text.rstrip().rstrip(",")
+    return text + "".join(_CLOSERS[opener] for opener in reversed(stack))
\ No newline at end of file
@@ -0,0 +1,161 @@
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from app.config.settings import settings
+
+DATE_FORMAT = '%d-%m-%Y'
+PAN_PATTERN = re.compile(r'^[A-Z]{5}[0-9]{4}[A-Z]{1}$')
+AADHAAR_SEPARATORS = re.compile(r'[\s-]')
+NON_DIGITS = re.compile(r'\D')
+
+_DIGIT_POSITIONS = [0, 1, 3, 4, 6, 7, 8, 9]
+_MONTH_LENGTHS = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+_PAN_LETTERS = [0, 1, 2, 3, 4, 9]
+_PAN_DIGITS = [5, 6, 7, 8]
+
+# Scalar checks
+
+def is_valid_pan(pan: str, ignore_case: bool = True) -> bool:
+    return PAN_PATTERN.match(pan.upper() if ignore_case else pan) is not None
+
+def is_valid_aadhaar(aadhaar: str) -> bool:
+    """12 digits, optionally grouped with spaces or hyphens"""
+    aadhaar_clean = AADHAAR_SEPARATORS.sub('', aadhaar)
+    return len(aadhaar_clean) == 12 and aadhaar_clean.isdigit()
+
+def aadhaar_digits(text: str) -> Optional[str]:
+    """The 12 digits of an Aadhaar number typed with any separators, or None"""
+    digits = NON_DIGITS.sub('', text)
+    return digits if len(digits) == 12 else None
+
+def parse_dob(value: str) -> Optional[date]:
+    """Parse a DD-MM-YYYY date, returning None when it is not one.
+
+    Accepts exactly what datetime.strptime(value, DATE_FORMAT) accepts;
+    results are memoized since the same dates of birth are checked
+    repeatedly over a conversation.
+    """
+    if not isinstance(value, str):
+        return None
+    return _parse_dob(value)
+
+@lru_cache(maxsize=settings.VALIDATION_CACHE_SIZE)
+def _parse_dob(value: str) -> Optional[date]:
+    # Zero-padded dates are sliced directly; strptime compiles and runs a
+    # regex per call and is only needed for the forms it also accepts
+    # (unpadded fields, a space-padded day)
+    if len(value) == 10 and value[2] == '-' and value[5] == '-' and value.isascii():
+        day, month, year = value[0:2], value[3:5], value[6:10]
+        if day.isdigit() and month.isdigit() and year.isdigit():
+            try:
+                return date(int(year), int(month), int(day))
+            except ValueError:
+                return None
+    try:
+        return datetime.strptime(value, DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+def is_valid_date(value: str) -> bool:
+    return parse_dob(value) is not None
+
+def calculate_age(dob: str, today: date = None) -> int:
+    """Age in whole years on today (default: now); 0 for an invalid date"""
+    if not isinstance(dob, str):
+        return 0
+    today = today or datetime.now()
+    return _age(dob, today.year, today.month, today.day)
+
+@lru_cache(maxsize=settings.VALIDATION_CACHE_SIZE)
+def _age(dob: str, year: int, month: int, day: int) -> int:
+    birth_date = _parse_dob(dob)
+    if birth_date is None:
+        return 0
+    age = year - birth_date.year
+    if month < birth_date.month or (month == birth_date.month and day < birth_date.day):
+        age -= 1
+    return age
+
+# Batch API
+
+def _byte_matrix(values: Sequence, width: int):
+    """Rows of fixed-width ASCII strings as a uint8 matrix, and which rows had that shape"""
+    raw = np.array(
+        [v if isinstance(v, str) and len(v) == width and v.isascii() else "" for v in values], dtype=f"S{width}"
+    )
+    chars = raw.view(np.uint8).reshape(len(values), width) if len(values) else np.zeros((0, width), dtype=np.uint8)
+    return chars, raw != b""
+
+def _is_digit(chars: np.ndarray) -> np.ndarray:
+    return (chars >= ord("0")) & (chars <= ord("9"))
+
+def parse_dates(dates: List[str]):
+    """Parse DD-MM-YYYY strings into (day, month, year, valid) arrays.
+
+    Zero-padded dates are decoded as a byte matrix in one go; anything else
+    (e.g. "5-6-1990") falls back to parse_dob so results match the scalar path.
+    """
+    chars, fixed = _byte_matrix(dates, 10)
+    digits = chars.astype(np.int32) - ord("0")
+    fixed = (
+        fixed
+        & (chars[:, 2] == ord("-")) & (chars[:, 5] == ord("-"))
+        & np.all(_is_digit(chars[:, _DIGIT_POSITIONS]), axis=1)
+    )
+    day = digits[:, 0] * 10 + digits[:, 1]
+    month = digits[:, 3] * 10 + digits[:, 4]
+    year = digits[:, 6] * 1000 + digits[:, 7] * 100 + digits[:, 8] * 10 + digits[:, 9]
+
+    leap = ((year % 4 == 0) & (year % 100 != 0)) | (year % 400 == 0)
+    days_in_month = _MONTH_LENGTHS[np.clip(month, 0, 12)] + ((month == 2) & leap)
+    valid = fixed & (month >= 1) & (month <= 12) & (day >= 1) & (day <= days_in_month) & (year >= 1)
+
+    for i in np.flatnonzero(~fixed):
+        parsed = parse_dob(dates[i])
+        if parsed is not None:
+            day[i], month[i], year[i], valid[i] = parsed.day, parsed.month, parsed.year, True
+    return day, month, year, valid
+
+def ages_on(today: date, day: np.ndarray, month: np.ndarray, year: np.ndarray) -> np.ndarray:
+    before_birthday = (today.month < month) | ((today.month == month) & (today.day < day))
+    return today.year - year - before_birthday
+
+def validate_pans(pans: List[str]) -> np.ndarray:
+    """Vectorized is_valid_pan (case-insensitive) over a column"""
+    chars, fixed = _byte_matrix(pans, 10)
+    letters = chars[:, _PAN_LETTERS] & ~np.uint8(0x20)  # ASCII upper-case
+    valid = (
+        fixed
+        & np.all((letters >= ord("A")) & (letters <= ord("Z")), axis=1)
+        & np.all(_is_digit(chars[:, _PAN_DIGITS]), axis=1)
+    )
+    for i in np.flatnonzero(~fixed):
+        valid[i] = isinstance(pans[i], str) and is_valid_pan(pans[i])
+    return valid
+
+def validate_aadhaars(aadhaars: List[Optional[str]]) -> np.ndarray:
+    """Vectorized is_valid_aadhaar over a column; missing (None) values are valid"""
+    chars, fixed = _byte_matrix(aadhaars, 12)
+    valid = fixed & np.all(_is_digit(chars), axis=1)
+    for i in np.flatnonzero(~fixed):
+        value = aadhaars[i]
+        valid[i] = value is None or (isinstance(value, str) and is_valid_aadhaar(value))
+    return valid
+
+def validate_batch(columns: Dict[str, list]) -> Dict[str, np.ndarray]:
+    """Validate the identity columns of a bulk import at once.
+
+    Takes whichever of "pan", "aadhaar" and "date_of_birth" are present and
+    returns a boolean array per column, plus "valid" for rows passing all of
+    them. Each array agrees element-wise with the scalar checks.
+    """
+    checks = {"pan": validate_pans, "aadhaar": validate_aadhaars, "date_of_birth": lambda d: parse_dates(d)[3]}
+    result = {name: check(columns[name]) for name, check in checks.items() if name in columns}
+    n = len(next(iter(columns.values()))) if columns else 0
+    valid = np.ones(n, dtype=bool)
+    for mask in result.values():
+        valid &= mask
+    result["valid"] = valid
+    return result
\ No newline at end of file
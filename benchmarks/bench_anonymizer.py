@@ -0,0 +1,76 @@
+"""MB/s of PAN/Aadhaar anonymization, in memory and on files.
+
+    python benchmarks/bench_anonymizer.py [--size-mb 64] [--workers N] [--repeat 3]
+
+Builds a synthetic transcript log (chat lines, some carrying a PAN or an
+Aadhaar number) and times anonymize() on it as one string, then
+anonymize_file and anonymize_file_parallel on it as a file. The best of
+--repeat runs is reported.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.services.anonymizer import anonymize, anonymize_file, anonymize_file_parallel
+
+LINES = [
+    "user: hi, I would like to check my eligibility for a personal loan",
+    "bot: Please enter your PAN number (e.g., ABCDE1234F):",
+    "user: my pan is {pan}",
+    "bot: Please enter your Aadhaar number (12 digits):",
+    "user: {aadhaar}",
+    "bot: What is your monthly income?",
+    "user: around 75000 a month, with 5000 in existing EMIs",
+]
+
+def make_text(size: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    lines, length = [], 0
+    while length < size:
+        line = rng.choice(LINES).format(
+            pan="".join(rng.choices(letters, k=5)) + f"{rng.randint(0, 9999):04d}" + rng.choice(letters),
+            aadhaar=" ".join(f"{rng.randint(0, 9999):04d}" for _ in range(3)),
+        )
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = make_text(int(args.size_mb * (1 << 20)))
+    megabytes = len(text) / (1 << 20)
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "transcripts.log")
+        destination = os.path.join(directory, "anonymized.log")
+        with open(source, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        cases = [
+            ("anonymize", lambda: anonymize(text)),
+            ("anonymize_file", lambda: anonymize_file(source, destination)),
+            (f"anonymize_file_parallel x{args.workers}",
+             lambda: anonymize_file_parallel(source, destination, workers=args.workers)),
+        ]
+        for name, func in cases:
+            seconds = best_of(args.repeat, func)
+            print(f"{name:30} {megabytes:7.1f} MB  {seconds:7.2f} s  {megabytes / seconds:8.1f} MB/s")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
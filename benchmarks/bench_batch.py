@@ -0,0 +1,62 @@
+"""Rows per second of the batch eligibility scorer.
+
+    python benchmarks/bench_batch.py [--rows 10000 1000000] [--repeat 3]
+
+Times evaluate_batch (the result dict), evaluate_batch serialized the way
+JSONResponse does it, and evaluate_batch_json (the bytes
+/check-eligibility/batch returns) on synthetic columnar input mixing loan
+types and a few invalid rows. The best of --repeat runs is reported.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.services.batch_eligibility import evaluate_batch, evaluate_batch_json
+
+LOAN_TYPES = ["personal", "home", "credit card", None]
+
+def make_columns(rows: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    return {
+        "date_of_birth": [
+            f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{rng.randint(1950, 2006)}"
+            if rng.random() > 0.01 else "not a date"
+            for _ in range(rows)
+        ],
+        "monthly_income": [rng.randint(10000, 300000) for _ in range(rows)],
+        "existing_emis": [rng.randint(0, 80000) for _ in range(rows)],
+        "credit_score": [rng.randint(300, 900) for _ in range(rows)],
+        "years_employed": [rng.randint(0, 30) for _ in range(rows)],
+        "pan": [f"ABCDE{i % 10000:04d}F" for i in range(rows)],
+        "loan_type": [rng.choice(LOAN_TYPES) for _ in range(rows)],
+    }
+
+def evaluate_batch_then_dumps(columns: dict) -> bytes:
+    return json.dumps(evaluate_batch(columns), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def best_of(repeat: int, func, columns) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(columns)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        columns = make_columns(rows)
+        for func in (evaluate_batch, evaluate_batch_then_dumps, evaluate_batch_json):
+            seconds = best_of(args.repeat, func, columns)
+            print(f"{func.__name__:26} {rows:>9} rows  {seconds * 1e3:9.1f} ms  {rows / seconds:>12,.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""Per-turn latency of ConversationManager.process_message over a scripted conversation.
+
+    python benchmarks/bench_conversation.py [--conversations 2000] [--root PATH]
+
+--root imports the app from another checkout, e.g. one made with
+"git worktree add /tmp/before <commit>", to compare before and after.
+The script uses a customer that is not in the customer store, so every
+version runs the same twelve turns.
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+SCRIPT = [
+    "hi", "1", "PQRST6789U", "asha verma", "01-02-1990", "9999 8888 7777",
+    "60000", "5000", "780", "salaried", "4", "12 Park Street, Kolkata"
+]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(__file__), ".."))
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.root))
+    os.environ.setdefault("SESSION_BACKEND", "memory")
+    from app.services.conversation_manager import ConversationManager
+
+    # Older versions print on every turn; that is part of their cost, but not of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager = ConversationManager()
+    turns = []
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        for _ in range(args.conversations):
+            session_id = None
+            for message in SCRIPT:
+                started = time.perf_counter()
+                response = manager.process_message(message, session_id)
+                turns.append(time.perf_counter() - started)
+                session_id = response["session_id"]
+            sink.seek(0)
+            sink.truncate()
+    if not response["completed"]:
+        raise SystemExit(f"Scripted conversation did not complete: {response['message']!r}")
+
+    turns.sort()
+    print(f"{args.conversations} conversations x {len(SCRIPT)} turns")
+    print(f"mean   {statistics.mean(turns) * 1e6:8.1f} us/turn")
+    print(f"p50    {turns[len(turns) // 2] * 1e6:8.1f} us/turn")
+    print(f"p99    {turns[int(len(turns) * 0.99)] * 1e6:8.1f} us/turn")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,12 @@
+import threading
+import pytest
+from fake_genai import FakeGenAIServer
+
+@pytest.fixture
+def genai_server():
+    server = FakeGenAIServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
\ No newline at end of file
@@ -0,0 +1,122 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class Reply:
+    """What the fake server does with one request.
+
+    status other than 200 is sent with an error body (and Retry-After when
+    given); drop closes the connection without answering. A streamed
+    request gets chunks as SSE events, chunk_delay apart, followed by
+    "data: [DONE]" unless done is unset; cut closes the connection
+    mid-body instead of ending it.
+    """
+
+    def __init__(self, content: str = "ok", status: int = 200, delay: float = 0, drop: bool = False,
+                 retry_after: str = None, chunks: list = None, chunk_delay: float = 0, done: bool = True,
+                 cut: bool = False):
+        self.content = content
+        self.status = status
+        self.delay = delay
+        self.drop = drop
+        self.retry_after = retry_after
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.done = done
+        self.cut = cut
+
+class FakeGenAIServer(ThreadingHTTPServer):
+    """OpenAI-compatible /v1/chat/completions on localhost with scripted latency and faults.
+
+    Requests take the queued replies in order, then the default one.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.replies = []
+        self.default = Reply()
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def script(self, *replies: Reply) -> None:
+        with self.lock:
+            self.replies.extend(replies)
+
+    def next_reply(self, payload: dict) -> Reply:
+        with self.lock:
+            self.requests.append(payload)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            return self.replies.pop(0) if self.replies else self.default
+
+    def done(self) -> None:
+        with self.lock:
+            self.active -= 1
+
+    def handle_error(self, request, client_address) -> None:
+        # Hedged and cancelled requests close their connection before the reply
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        reply = self.server.next_reply(payload)
+        try:
+            time.sleep(reply.delay)
+            if reply.drop:
+                self.close_connection = True
+            elif reply.status != 200:
+                self._send_json(reply.status, {"error": {"message": "injected fault"}}, reply.retry_after)
+            elif payload.get("stream"):
+                self._send_stream(reply)
+            else:
+                self._send_json(200, {
+                    "choices": [{"message": {"role": "assistant", "content": reply.content}}],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 2}
+                })
+        finally:
+            self.server.done()
+
+    def _send_json(self, status: int, body: dict, retry_after: str = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if retry_after:
+            self.send_header("Retry-After", retry_after)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, reply: Reply) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunks = reply.chunks if reply.chunks is not None else [reply.content]
+        events = [
+            f"data: {json.dumps({'choices': [{'delta': {'content': chunk}}]})}\n\n" for chunk in chunks
+        ]
+        if reply.done and not reply.cut:
+            events.append("data: [DONE]\n\n")
+        for event in events:
+            data = event.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+            time.sleep(reply.chunk_delay)
+        if reply.cut:
+            self.close_connection = True
+        else:
+            self.wfile.write(b"0\r\n\r\n")
\ No newline at end of file
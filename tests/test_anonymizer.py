@@ -0,0 +1,18 @@
+import pytest
+from app.services.anonymizer import anonymize, anonymize_file, anonymize_file_parallel
+
+@pytest.mark.parametrize("separator", [" ", "\t", "\x1c", "\x1f"])
+def test_parallel_shards_do_not_split_a_match(tmp_path, separator):
+    # Everything from the middle of the file up to the Aadhaar number can be
+    # part of a match, so the shard boundary is pushed to its separators
+    aadhaar = separator.join(["1234", "5678", "9012"])
+    text = "Z" * 1000 + aadhaar + " end\n"
+    source = tmp_path / "source.txt"
+    source.write_text(text, newline="")
+
+    anonymize_file_parallel(str(source), str(tmp_path / "parallel.txt"), workers=2)
+    anonymize_file(str(source), str(tmp_path / "serial.txt"))
+    expected = anonymize(text)
+    assert aadhaar not in expected
+    assert (tmp_path / "parallel.txt").read_bytes().decode() == expected
+    assert (tmp_path / "serial.txt").read_bytes().decode() == expected
\ No newline at end of file
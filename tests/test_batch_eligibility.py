@@ -0,0 +1,23 @@
+import json
+import pytest
+from app.services.batch_eligibility import BatchInputError, evaluate_batch, evaluate_batch_json
+
+def columns(**overrides):
+    base = {
+        "date_of_birth": ["15-06-1985", "01-01-1990"],
+        "monthly_income": [75000, 20000],
+        "existing_emis": [5000, 0],
+        "credit_score": [780, 650],
+        "years_employed": [5, 1],
+    }
+    base.update(overrides)
+    return base
+
+@pytest.mark.parametrize("value", [None, float("nan"), float("inf"), float("-inf")])
+def test_non_finite_numbers_are_rejected(value):
+    with pytest.raises(BatchInputError, match="monthly_income"):
+        evaluate_batch(columns(monthly_income=[75000, value]))
+
+def test_json_matches_evaluate_batch():
+    batch = columns(loan_type=["personal", "home"], pan=["ABCDE1234F", None])
+    assert json.loads(evaluate_batch_json(batch)) == evaluate_batch(batch)
\ No newline at end of file
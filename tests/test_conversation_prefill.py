@@ -0,0 +1,59 @@
+import pytest
+from app.data.customer_store import CustomerStore
+from app.data.synthetic_database import SYNTHETIC_CUSTOMERS, SyntheticDatabase
+from app.services.conversation_manager import ConversationManager
+from app.services.session_backends import InMemorySessionBackend
+
+@pytest.fixture
+def manager():
+    customers = SyntheticDatabase(store=CustomerStore.from_records(SYNTHETIC_CUSTOMERS))
+    sessions = InMemorySessionBackend(idle_ttl=60, completed_ttl=60, max_sessions=100)
+    return ConversationManager(sessions=sessions, customers=customers, prefill=True)
+
+def identify(manager, name):
+    session_id = None
+    for message in ["hi", "1", "abcde1234f", name, "15-06-1985", "1234 5678 9012"]:
+        response = manager.process_message(message, session_id)
+        session_id = response["session_id"]
+    return response
+
+@pytest.mark.parametrize("name", ["R", "R S", "R Sharma", "Rahul", "Rahul Sharmaa"])
+def test_fuzzy_names_are_asked_for_details(manager, name):
+    response = identify(manager, name)
+    assert response["current_step"] == "income_input"
+    assert "75000" not in response["message"]
+
+def test_exact_name_prefills_without_echoing_credit_score_or_address(manager):
+    response = identify(manager, "rahul  sharma.")
+    assert response["current_step"] == "prefill_confirm"
+    assert "75000" in response["message"]
+    assert "780" not in response["message"]
+    assert "Main Street" not in response["message"]
+
+    result = manager.process_message("yes", response["session_id"])
+    assert result["completed"]
+    assert manager.get_session_data(response["session_id"])["credit_score"] == 780
+
+@pytest.mark.parametrize("reply", ["incorrect", "No", "no, change them"])
+def test_negative_replies_ask_for_details(manager, reply):
+    response = identify(manager, "Rahul Sharma")
+    result = manager.process_message(reply, response["session_id"])
+    assert result["current_step"] == "income_input"
+    assert not result["completed"]
+
+@pytest.mark.parametrize("reply", ["no, that's not correct", "yes no", "nothing"])
+def test_ambiguous_or_unknown_replies_are_asked_again(manager, reply):
+    response = identify(manager, "Rahul Sharma")
+    result = manager.process_message(reply, response["session_id"])
+    assert result["current_step"] == "prefill_confirm"
+    assert result["message"].startswith("Please reply YES")
+
+@pytest.mark.parametrize("reply, employment_type", [("Self-employed", "Self-Employed"), ("I am salaried", "Salaried")])
+def test_keywords_match_whole_words_in_longer_replies(manager, reply, employment_type):
+    session_id = None
+    for message in ["hi", "personal loan", "PQRST6789U", "Asha Verma", "01-02-1990", "9999 8888 7777",
+                    "60000", "5000", "780", reply]:
+        response = manager.process_message(message, session_id)
+        session_id = response["session_id"]
+    assert response["current_step"] == "employment_years_input"
+    assert manager.get_session_data(session_id)["employment_type"] == employment_type
\ No newline at end of file
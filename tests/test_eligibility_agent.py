@@ -0,0 +1,78 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.agents.eligibility_agent import EligibilityAgent
+from app.config.settings import settings
+from app.services.resilience import CircuitBreaker
+
+APPLICANT = {
+    "pan": "ABCDE1234F", "name": "Rahul Sharma", "date_of_birth": "15-06-1985", "address": "123 Main Street",
+    "monthly_income": 75000, "employment_type": "Salaried", "years_employed": 5, "existing_emis": 15000,
+    "credit_score": 780
+}
+
+class FlakyClient:
+    """Fails the first `failures` calls, then answers"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+        self.resilience = SimpleNamespace(breaker=SimpleNamespace(state=CircuitBreaker.CLOSED))
+
+    def chat_completion(self, messages, temperature=0.1, use_cache=False):
+        self.calls += 1
+        if self.calls <= self.failures:
+            return {"error": "upstream unavailable"}
+        return {"choices": [{"message": {"content": "Your income comfortably covers the EMI."}}]}
+
+@pytest.fixture
+def make_agent(monkeypatch):
+    monkeypatch.setattr(settings, "GENAI_BASE_URL", "http://genai.invalid")
+    knowledge_base = SimpleNamespace(retrieve_for_applicant=lambda *args: [])
+
+    def make(mode, failures):
+        client = FlakyClient(failures)
+        return EligibilityAgent(genai_client=client, knowledge_base=knowledge_base, mode=mode), client
+    return make
+
+def test_failed_explanation_is_retried_by_the_next_check(make_agent):
+    agent, client = make_agent("sync", failures=1)
+    assert agent.process(APPLICANT).explanation_status == "failed"
+    response = agent.process(APPLICANT)
+    assert response.explanation_status == "complete"
+    assert response.explanation == "Your income comfortably covers the EMI."
+    assert client.calls == 2
+
+def test_failed_explanation_is_retried_when_fetched(make_agent):
+    agent, client = make_agent("lazy", failures=1)
+    explanation_id = agent.process(APPLICANT).explanation_id
+    assert agent.get_explanation(explanation_id)["status"] == "failed"
+    assert agent.get_explanation(explanation_id)["status"] == "complete"
+    assert agent.get_explanation(explanation_id)["status"] == "complete"
+    assert client.calls == 2
+class StreamingClient(FlakyClient):
+    def __init__(self, chunks):
+        super().__init__(failures=0)
+        self.chunks = chunks
+
+    async def astream_chat_completion(self, messages, temperature=0.1, use_cache=False):
+        for chunk in self.chunks:
+            yield chunk
+
+async def collect(agent):
+    return [event async for event in agent.astream_assessment(APPLICANT)]
+
+@pytest.mark.parametrize("chunks, sent, eligible", [
+    # Broken after the decision: the streamed fields stand
+    (['{"eligible": false, "confidence": 0.9, ', '"reasons": [1, , ,'], [False], False),
+    # A decision that is not a boolean is never sent; the rules engine decides
+    (['{"eligible": "no", "confidence": 0.9}'], [], True),
+])
+def test_streamed_decision_and_result_agree(make_agent, chunks, sent, eligible):
+    agent, _ = make_agent("llm", failures=0)
+    agent.genai_client = StreamingClient(chunks)
+    events = asyncio.run(collect(agent))
+    decisions = [data["value"] for event, data in events if event == "field" and data["name"] == "eligible"]
+    assert decisions == sent
+    assert events[-1][0] == "result"
+    assert events[-1][1]["eligible"] is eligible
\ No newline at end of file
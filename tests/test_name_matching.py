@@ -0,0 +1,55 @@
+import random
+import pytest
+from app.data.customer_store import CustomerStore
+from app.data.synthetic_database import SYNTHETIC_CUSTOMERS, SyntheticDatabase
+from app.services.name_matching import name_similarity
+
+@pytest.fixture(scope="module")
+def db():
+    return SyntheticDatabase(store=CustomerStore.from_records(SYNTHETIC_CUSTOMERS))
+
+@pytest.mark.parametrize("name", ["R", "r", "R S", "R. S.", "S R"])
+def test_initials_only_never_match(name):
+    assert name_similarity(name, "Rahul Sharma") == 0.0
+
+@pytest.mark.parametrize("name", ["R", "r", "R S"])
+def test_initials_only_do_not_verify(db, name):
+    result = db.verify_customer("ABCDE1234F", name, "15-06-1985", "1234 5678 9012")
+    assert not result["verified"]
+    assert result["customer"] is None
+
+@pytest.mark.parametrize("name", ["Rahul Sharma", "sharma rahul", "R Sharma", "Rahul S", "Rahul"])
+def test_names_with_a_full_token_verify(db, name):
+    assert db.verify_customer("ABCDE1234F", name, "15-06-1985", "1234 5678 9012")["verified"]
+
+def test_initials_only_search_finds_nothing(db):
+    assert db.find_similar_names("R S") == []
+
+def random_store(size=400, seed=3):
+    rng = random.Random(seed)
+    first = ["Rahul", "Rahool", "Priya", "Priyah", "Amit", "Amith", "Anthony", "Antony", "R", "P", "K"]
+    last = ["Sharma", "Sarma", "Sharmaa", "Verma", "Kumar", "Kumaar", "Singh", "Sing", "Patel"]
+    records = []
+    for i in range(size):
+        tokens = rng.sample(first, rng.randint(0, 2)) + rng.sample(last, rng.randint(1, 2))
+        rng.shuffle(tokens)
+        records.append({"pan": f"ABCDE{i:04d}F", "name": " ".join(tokens)})
+    return CustomerStore.from_records(records)
+
+@pytest.mark.parametrize("threshold", [0.6, 0.8, 0.9])
+@pytest.mark.parametrize("query", [
+    "Rahul Kumar Sharma", "Rahul Sharma", "Sharma", "R K Sharma", "R P K Sarma", "Priya Singh Patel Verma",
+    "Antony", "Amit Kumaar Singh", "Sharma Sharma", "R S"
+])
+def test_search_finds_what_brute_force_scoring_finds(query, threshold):
+    store = random_store()
+    expected = {}
+    for row in range(len(store)):
+        score = name_similarity(query, store.record(row)["name"])
+        if score >= threshold:
+            expected[row] = score
+    found = dict(store.search_name(query, threshold, limit=len(store), max_candidates=len(store)))
+    assert found == pytest.approx(expected)
+
+def test_longer_query_finds_shorter_name(db):
+    assert [match["customer"]["name"] for match in db.find_similar_names("Rahul Kumar Sharma")] == ["Rahul Sharma"]
\ No newline at end of file
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.config.settings import settings
+from app.services.genai_client import TCSGenAIClient
+from app.services.resilience import CircuitBreaker, ResiliencePolicy
+from fake_genai import Reply
+
+@pytest.fixture
+def make_client(genai_server, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_ENABLED", False)
+    clients = []
+
+    def make(**policy) -> TCSGenAIClient:
+        options = {"backoff_base": 0.01, "backoff_max": 1, "queue_timeout": 5, **policy}
+        client = TCSGenAIClient(resilience=ResiliencePolicy(**options))
+        client.base_url = genai_server.url
+        clients.append(client)
+        return client
+    yield make
+    for client in clients:
+        client.close()
+
+def ask(client, text="hi"):
+    return client.chat_completion([{"role": "user", "content": text}])
+
+async def aask(client, text="hi"):
+    try:
+        return await client.achat_completion([{"role": "user", "content": text}])
+    finally:
+        await client.aclose()
+
+def content(response):
+    return response["choices"][0]["message"]["content"]
+
+def test_server_errors_and_dropped_connections_are_retried(genai_server, make_client):
+    genai_server.script(Reply(status=503), Reply(drop=True))
+    client = make_client(max_retries=2)
+    assert content(ask(client)) == "ok"
+    assert len(genai_server.requests) == 3
+    assert client.resilience.retries == 2
+
+def test_async_retries(genai_server, make_client):
+    genai_server.script(Reply(status=502))
+    client = make_client(max_retries=1)
+    assert content(asyncio.run(aask(client))) == "ok"
+    assert len(genai_server.requests) == 2
+
+def test_retry_after_is_honoured(genai_server, make_client):
+    genai_server.script(Reply(status=429, retry_after="0.3"))
+    client = make_client(max_retries=1)
+    started = time.perf_counter()
+    assert content(ask(client)) == "ok"
+    assert time.perf_counter() - started >= 0.3
+
+def test_breaker_opens_and_fails_fast(genai_server, make_client):
+    genai_server.script(Reply(status=500), Reply(status=500))
+    client = make_client(max_retries=0, failure_threshold=2)
+    assert "error" in ask(client, "one")
+    assert "error" in ask(client, "two")
+    assert client.resilience.breaker.state == CircuitBreaker.OPEN
+    assert "temporarily unavailable" in ask(client, "three")["error"]
+    assert len(genai_server.requests) == 2
+
+def test_open_breaker_does_not_queue_for_a_slot(genai_server, make_client):
+    genai_server.script(Reply(delay=0.5))
+    client = make_client(max_concurrency=1, max_retries=0, failure_threshold=1)
+    holder = threading.Thread(target=ask, args=(client, "slow"))
+    holder.start()
+    while not genai_server.active:
+        time.sleep(0.01)
+    client.resilience.breaker.record_failure()
+
+    started = time.perf_counter()
+    assert "temporarily unavailable" in ask(client, "sync")["error"]
+    assert "temporarily unavailable" in asyncio.run(aask(client, "async"))["error"]
+    assert time.perf_counter() - started < 0.2
+    holder.join()
+
+def test_half_open_trial_is_given_back_when_no_slot_frees_up(genai_server, make_client):
+    client = make_client(max_concurrency=1, max_retries=0, queue_timeout=0.05,
+                         failure_threshold=1, reset_seconds=0.05)
+    with client.resilience.slot():
+        client.resilience.breaker.record_failure()
+        time.sleep(0.06)
+        assert "Too many concurrent" in ask(client, "queued")["error"]
+    # The trial was not used up by the call that never got a slot
+    assert content(ask(client, "trial")) == "ok"
+    assert client.resilience.breaker.state == CircuitBreaker.CLOSED
+    assert len(genai_server.requests) == 1
+
+def test_slow_request_is_hedged(genai_server, make_client):
+    genai_server.script(Reply(delay=1.0, content="slow"))
+    client = make_client(hedge_after=0.05)
+    started = time.perf_counter()
+    assert content(ask(client)) == "ok"
+    assert time.perf_counter() - started < 0.5
+    assert client.resilience.hedges == 1
+
+def test_sync_and_async_callers_share_the_concurrency_limit(genai_server, make_client):
+    genai_server.default = Reply(delay=0.1)
+    client = make_client(max_concurrency=2)
+    results = []
+
+    async def async_callers():
+        try:
+            return await asyncio.gather(*(
+                client.achat_completion([{"role": "user", "content": f"async {i}"}]) for i in range(3)
+            ))
+        finally:
+            await client.aclose()
+
+    threads = [threading.Thread(target=lambda i=i: results.append(ask(client, f"sync {i}"))) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    results.extend(asyncio.run(async_callers()))
+    for thread in threads:
+        thread.join()
+
+    assert [content(result) for result in results] == ["ok"] * 6
+    assert genai_server.max_active <= 2
+    assert client.resilience.in_flight == 0
\ No newline at end of file
@@ -0,0 +1,68 @@
+import time
+import pytest
+from app.services.conversation_manager import ConversationManager
+from app.services.session_backends import (
+    InMemorySessionBackend, RedisSessionBackend, SessionVersionConflict, SQLiteSessionBackend
+)
+
+TTL = 0.2
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return InMemorySessionBackend(idle_ttl=TTL, completed_ttl=TTL, max_sessions=100)
+    if request.param == "sqlite":
+        return SQLiteSessionBackend(str(tmp_path / "sessions.db"), idle_ttl=TTL, completed_ttl=TTL, max_sessions=100)
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisSessionBackend("redis://fake", idle_ttl=TTL, completed_ttl=TTL, client=fakeredis.FakeRedis())
+
+def test_save_and_load_round_trip(backend):
+    assert backend.load("s1") is None
+    assert backend.save("s1", {"step": "pan_input", "data": {"pan": "ABCDE1234F"}}, 0) == 1
+    session, version = backend.load("s1")
+    assert session == {"step": "pan_input", "data": {"pan": "ABCDE1234F"}}
+    assert version == 1
+
+def test_conflicting_saves(backend):
+    backend.save("s1", {"step": "pan_input"}, 0)
+    first, version = backend.load("s1")
+    second, _ = backend.load("s1")
+    backend.save("s1", {**first, "step": "name_input"}, version)
+    with pytest.raises(SessionVersionConflict):
+        backend.save("s1", {**second, "step": "dob_input"}, version)
+    with pytest.raises(SessionVersionConflict):
+        backend.save("s1", {"step": "pan_input"}, 0)
+    assert backend.load("s1") == ({"step": "name_input"}, 2)
+
+def test_sessions_expire_after_ttl(backend):
+    backend.save("s1", {"step": "pan_input"}, 0)
+    time.sleep(TTL * 2)
+    assert backend.load("s1") is None
+    # An expired id can be started over
+    assert backend.save("s1", {"step": "pan_input"}, 0) == 1
+
+def test_conversation_replays_on_conflict(backend):
+    manager = ConversationManager(sessions=backend, prefill=False)
+    session_id = manager.process_message("hi")["session_id"]
+
+    # Another worker advances the session between this worker's load and save
+    original_load = backend.load
+    raced = []
+
+    def racing_load(sid):
+        record = original_load(sid)
+        if not raced:
+            raced.append(True)
+            session, version = record
+            backend.save(sid, {**session, "data": {**session["data"], "loan_type": "Home Loan"}}, version)
+        return record
+
+    backend.load = racing_load
+    response = manager.process_message("1", session_id)
+    backend.load = original_load
+
+    assert raced
+    assert response["current_step"] == "pan_input"
+    session, version = backend.load(session_id)
+    assert session["data"]["loan_type"] == "Personal Loan"
+    assert version == 3
\ No newline at end of file
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+import app.main as main
+from app.agents.base_agent import BaseAgent
+from app.config.settings import settings
+from app.services.conversation_manager import ConversationManager
+from app.services.genai_client import GenAIStreamError, SSEDecoder, TCSGenAIClient
+from app.services.resilience import ResiliencePolicy
+from app.services.session_backends import InMemorySessionBackend
+from fake_genai import Reply
+
+def decode(lines):
+    decoder = SSEDecoder()
+    return [data for data in map(decoder.feed, lines) if data is not None]
+
+def test_decoder_joins_multi_line_data():
+    assert decode(["data: first", "data: second", "", "data: third", ""]) == ["first\nsecond", "third"]
+
+def test_decoder_ignores_comments_and_other_fields():
+    lines = [": keep-alive", "", "event: delta", "id: 7", "retry: 1000", "data: {\"a\": 1}", ""]
+    assert decode(lines) == ['{"a": 1}']
+
+def test_decoder_handles_crlf_and_no_space_after_colon():
+    assert decode(["data:x\r\n", "data:  y\r\n", "\r\n"]) == ["x\n y"]
+
+def test_decoder_returns_done_marker():
+    assert decode(["data: {}", "", "data: [DONE]", ""]) == ["{}", "[DONE]"]
+
+def test_decoder_drops_an_event_cut_off_before_its_blank_line():
+    assert decode(["data: complete", "", "data: cut off"]) == ["complete"]
+
+@pytest.fixture
+def client(genai_server, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_ENABLED", False)
+    client = TCSGenAIClient(resilience=ResiliencePolicy(max_retries=0))
+    client.base_url = genai_server.url
+    yield client
+    client.close()
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+def test_stream_yields_deltas_in_order(genai_server, client):
+    genai_server.script(Reply(chunks=["Keep ", "EMIs ", "low."]))
+    assert list(client.stream_chat_completion(MESSAGES)) == ["Keep ", "EMIs ", "low."]
+
+@pytest.mark.parametrize("reply", [Reply(chunks=["Keep "], cut=True), Reply(chunks=["Keep "], done=False)])
+def test_stream_cut_off_before_done_raises(genai_server, client, reply):
+    genai_server.script(reply)
+    received = []
+    with pytest.raises(GenAIStreamError):
+        for content in client.stream_chat_completion(MESSAGES):
+            received.append(content)
+    assert received == ["Keep "]
+
+def test_async_stream_cut_off_before_done_raises(genai_server, client):
+    genai_server.script(Reply(chunks=["Keep "], done=False))
+
+    async def consume():
+        try:
+            return [content async for content in client.astream_chat_completion(MESSAGES)]
+        finally:
+            await client.aclose()
+
+    with pytest.raises(GenAIStreamError):
+        asyncio.run(consume())
+
+def parse_events(body: str):
+    events = []
+    for block in filter(None, body.split("\n\n")):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+CONVERSATION = [
+    "hi", "1", "PQRST6789U", "asha verma", "01-02-1990", "9999 8888 7777",
+    "60000", "5000", "780", "salaried", "4", "12 Park Street, Kolkata"
+]
+
+@pytest.fixture
+def api(genai_server, client, monkeypatch):
+    monkeypatch.setattr(settings, "GENAI_BASE_URL", genai_server.url)
+    monkeypatch.setattr(main.guidance_agent, "genai_client", client)
+    sessions = InMemorySessionBackend(idle_ttl=60, completed_ttl=60, max_sessions=100)
+    monkeypatch.setattr(main, "conversation_manager", ConversationManager(sessions=sessions, prefill=False))
+    return TestClient(main.app)
+
+def converse(api):
+    session_id = None
+    for message in CONVERSATION:
+        response = api.post("/chat/stream", json={"message": message, "session_id": session_id})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.text)
+        session_id = events[0][1]["session_id"]
+    return events
+
+def test_chat_stream_sends_guidance_tokens_after_the_final_message(genai_server, api):
+    genai_server.script(Reply(chunks=["Keep ", "EMIs ", "low."]))
+    events = converse(api)
+    assert events[0][0] == "message" and events[0][1]["completed"]
+    assert events[1:] == [
+        ("token", {"content": "Keep "}), ("token", {"content": "EMIs "}), ("token", {"content": "low."}),
+        ("done", {})
+    ]
+    assert len(genai_server.requests) == 1
+    assert genai_server.requests[0]["stream"] is True
+
+def test_chat_stream_cut_off_ends_with_the_fallback_message(genai_server, api):
+    genai_server.script(Reply(chunks=["Keep "], cut=True))
+    events = converse(api)
+    assert events[1:] == [
+        ("token", {"content": "Keep "}), ("token", {"content": BaseAgent.fallback_message}), ("done", {})
+    ]
\ No newline at end of file
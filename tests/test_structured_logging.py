@@ -0,0 +1,20 @@
+import json
+import logging
+from app.services.anonymizer import anonymize
+from app.services.structured_logging import JsonFormatter
+
+def format_record(message: str, **fields) -> dict:
+    record = logging.LogRecord("app.test", logging.DEBUG, __file__, 1, message, None, None)
+    record.__dict__.update(fields)
+    return json.loads(JsonFormatter(redact=True).format(record))
+
+def test_pan_is_redacted_in_any_case():
+    entry = format_record("PAN abcde1234f given", user_message="my pan is AbCdE1234f")
+    assert "1234" not in entry["message"]
+    assert "1234" not in entry["user_message"]
+    # The same PAN hashes the same however it was typed
+    assert entry["message"] == f"PAN {anonymize('ABCDE1234F')} given"
+
+def test_aadhaar_is_redacted():
+    entry = format_record("Processing message", user_message="1234 5678 9012")
+    assert entry["user_message"] == anonymize("1234 5678 9012")
\ No newline at end of file